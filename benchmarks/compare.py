@@ -0,0 +1,190 @@
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import run as bench
+
+#Performance regression harness: runs a fixed matrix of convert/doctor scenarios and compares
+#per-stage timings and peak memory against a stored baseline.
+#  python benchmarks/compare.py record --baseline bench/baseline.json
+#  python benchmarks/compare.py check  --baseline bench/baseline.json --threshold 0.25
+#Stage names are the ones recorded by `--profile` (see docs/profiling.md), so a regression points at
+#e.g. `timestamp_parse`, `segments` or `metric:revenue` rather than just "convert got slower".
+
+#name -> (target, rows at --scale 1, synth overrides, command arg overrides)
+SCENARIOS = {
+    "events_base": ("events", 200_000, {}, {}),
+    "events_mixed_time": ("events", 200_000, {"time_format": "mixed"}, {}),
+    "events_dirty_segments": ("events", 200_000, {"dirty_segments": 0.05, "segment_cardinality": 500}, {"segment_fix": True}),
+    "events_heavy_tail": ("events", 200_000, {"events_sigma": 2.0, "value_format": "messy"}, {}),
+    "unit_base": ("unit", 200_000, {}, {}),
+    "unit_dedupe": ("unit", 200_000, {"duplicate_rate": 0.02, "dirty_segments": 0.05}, {"dedupe": "first", "segment_fix": True}),
+    "doctor_base": ("doctor", 200_000, {}, {}),
+    "doctor_wide": ("doctor", 50_000, {"n_metrics": 100}, {}),
+}
+
+
+def _run_scenario(name: str, in_path: str, out_dir: str) -> dict:
+    #Runs in a fresh worker process (see bench.in_worker), so peak_rss_mb belongs to this scenario alone
+    target, _, _, arg_overrides = SCENARIOS[name]
+    out_dir = Path(out_dir)
+    wall, prof = bench.run_target(target, Path(in_path), out_dir / f"out_{name}{Path(in_path).suffix}", out_dir / f"prof_{name}.json", **arg_overrides)
+    return {"wall_s": wall, "peak_rss_mb": prof.get("peak_rss_mb"), "stages": prof.get("stages", [])}
+
+
+def _stage_times(stages: list[dict]) -> dict[str, float]:
+    out: dict[str, float] = {}
+    for s in stages:
+        out[s["stage"]] = out.get(s["stage"], 0.0) + float(s["wall_s"])
+    return out
+
+
+def measure(names: list[str], scale: float = 1.0, repeat: int = 3, fmt: str = "auto", seed: int = 0) -> dict:
+    #Best-of-`repeat` per stage (minimum is the least noisy estimate of the true cost); peak memory is the max
+    suffix = bench._input_suffix(fmt)
+    scenarios = {}
+    with tempfile.TemporaryDirectory(prefix="abx_compare_") as tmp:
+        for name in names:
+            target, rows, synth_overrides, _ = SCENARIOS[name]
+            n = max(1000, int(rows * scale))
+            in_path = Path(tmp) / f"{name}{suffix}"
+            bench.in_worker(bench.generate_input, target, in_path, n, seed=seed, **synth_overrides)
+
+            runs = [bench.in_worker(_run_scenario, name, str(in_path), tmp) for _ in range(repeat)]
+
+            stages: dict[str, float] = {}
+            for r in runs:
+                for k, v in _stage_times(r["stages"]).items():
+                    stages[k] = min(stages.get(k, v), v)
+            peaks = [r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None]
+            scenarios[name] = {
+                "target": target,
+                "rows": n,
+                "input_format": suffix.lstrip("."),
+                "wall_s": round(min(r["wall_s"] for r in runs), 6),
+                "peak_rss_mb": round(max(peaks), 2) if peaks else None,
+                "stages": {k: round(v, 6) for k, v in stages.items()},
+            }
+            print(f"{name:<24} rows={n:<9} wall_s={scenarios[name]['wall_s']:.3f} peak_rss_mb={scenarios[name]['peak_rss_mb']}")
+
+    return {
+        "meta": {
+            **bench.environment(),
+            "scale": scale,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.25, memory_threshold: float = 0.25, min_seconds: float = 0.05) -> list[dict]:
+    #One row per (scenario, metric). A metric regresses when current > baseline * (1 + threshold);
+    #stages faster than min_seconds in the baseline are reported but never fail (timer noise).
+    rows = []
+    for name, cur in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            rows.append({"scenario": name, "metric": "(new scenario)", "base": None, "now": cur["wall_s"], "ratio": None, "status": "new"})
+            continue
+
+        timed = [("wall_s", base["wall_s"], cur["wall_s"])]
+        timed += [(f"stage:{k}", base["stages"].get(k), v) for k, v in cur["stages"].items()]
+        for metric, b, c in timed:
+            if b is None:
+                rows.append({"scenario": name, "metric": metric, "base": None, "now": c, "ratio": None, "status": "new"})
+                continue
+            ratio = c / b if b > 0 else None
+            if b < min_seconds and c < min_seconds:
+                status = "noise"
+            elif ratio is not None and ratio > 1.0 + threshold:
+                status = "REGRESSED"
+            elif ratio is not None and ratio < 1.0 - threshold:
+                status = "improved"
+            else:
+                status = "ok"
+            rows.append({"scenario": name, "metric": metric, "base": b, "now": c, "ratio": ratio, "status": status})
+
+        b, c = base.get("peak_rss_mb"), cur.get("peak_rss_mb")
+        if b and c:
+            ratio = c / b
+            status = "REGRESSED" if ratio > 1.0 + memory_threshold else ("improved" if ratio < 1.0 - memory_threshold else "ok")
+            rows.append({"scenario": name, "metric": "peak_rss_mb", "base": b, "now": c, "ratio": ratio, "status": status})
+    return rows
+
+
+def format_rows(rows: list[dict], show_all: bool = False) -> str:
+    def num(v):
+        return "" if v is None else f"{v:.3f}"
+
+    header = f"{'scenario':<24} {'metric':<36} {'base':>10} {'now':>10} {'ratio':>7}  status"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        if not show_all and r["status"] in ("ok", "noise"):
+            continue
+        lines.append(f"{r['scenario']:<24} {r['metric'][:36]:<36} {num(r['base']):>10} {num(r['now']):>10} {num(r['ratio']):>7}  {r['status']}")
+    if len(lines) == 2:
+        lines.append("(no changes beyond threshold)")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="abx performance regression harness")
+    parser.add_argument("mode", choices=["record", "check"], help="record: write a new baseline; check: compare against it")
+    parser.add_argument("--baseline", default="bench/baseline.json", help="Baseline JSON path")
+    parser.add_argument("--scenarios", default=None, help=f"Comma-separated subset of: {','.join(SCENARIOS)}")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every scenario's row count (keep equal between record and check)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the fastest is kept")
+    parser.add_argument("--format", choices=["auto", "csv", "parquet"], default="auto", help="Input file format (auto: parquet if pyarrow is installed)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown per stage/total (0.25 = +25%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.25, help="Allowed relative peak memory growth")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Stages faster than this in both runs never fail")
+    parser.add_argument("--out", default=None, help="check: also save the current measurements as JSON")
+    parser.add_argument("--all", action="store_true", help="check: print every stage, not only changes")
+    args = parser.parse_args()
+
+    names = list(SCENARIOS) if not args.scenarios else [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    bad = [s for s in names if s not in SCENARIOS]
+    if bad:
+        raise SystemExit(f"Unknown scenarios: {bad}. Use: {list(SCENARIOS)}")
+
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if args.mode == "check":
+        if not baseline_path.exists():
+            raise SystemExit(f"Baseline not found: {baseline_path}. Create it with: python benchmarks/compare.py record --baseline {baseline_path}")
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        if baseline.get("meta", {}).get("scale") != args.scale:
+            print(f"[compare] warning: baseline scale={baseline.get('meta', {}).get('scale')} but --scale={args.scale}")
+
+    current = measure(names, scale=args.scale, repeat=args.repeat, fmt=args.format, seed=args.seed)
+
+    if args.mode == "record":
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+        print(f"[compare] baseline saved: {baseline_path}")
+        return
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+        print(f"[compare] saved: {out}")
+
+    rows = compare(baseline, current, threshold=args.threshold, memory_threshold=args.memory_threshold, min_seconds=args.min_seconds)
+    print()
+    print(format_rows(rows, show_all=args.all))
+    regressed = [r for r in rows if r["status"] == "REGRESSED"]
+    if regressed:
+        print(f"\n[compare] {len(regressed)} regression(s) beyond threshold")
+        raise SystemExit(1)
+    print("\n[compare] no regressions")
+
+
+if __name__ == "__main__":
+    main()
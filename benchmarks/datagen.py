@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+#Synthetic inputs for benchmarks that `abx synth` does not cover.
+#  canonical: one row per user, already converted (what `ab doctor` reads)
+#Event logs and unit tables come from `abx synth events|unit` (see run.py).
+
+
+def _variants(n_variants: int) -> np.ndarray:
+    names = ["control"] + [f"treatment_{i}" for i in range(1, n_variants)]
+    return np.array(names[:n_variants], dtype=object)
+
+
+def _segment_values(prefix: str, cardinality: int) -> np.ndarray:
+    return np.array([f"{prefix}_{i:04d}" for i in range(max(1, cardinality))], dtype=object)
+
+
+def make_canonical(n_users: int, n_metrics: int = 10, n_variants: int = 2, missing_rate: float = 0.1, segment_cardinality: int = 50, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    variants = _variants(n_variants)
+    countries = _segment_values("country", segment_cardinality)
+    data = {
+        "user_id": np.char.add("u", np.char.zfill(np.arange(n_users).astype(str), 9)).astype(object),
+        "variant": variants[rng.integers(0, n_variants, size=n_users)],
+        "country": countries[rng.integers(0, len(countries), size=n_users)],
+    }
+    for i in range(n_metrics):
+        kind = i % 3
+        if kind == 0:
+            x = (rng.random(n_users) < 0.1).astype("float64")
+        elif kind == 1:
+            x = rng.poisson(2.0, size=n_users).astype("float64")
+        else:
+            x = rng.lognormal(3.0, 1.0, size=n_users)
+        x[rng.random(n_users) < missing_rate] = np.nan
+        data[f"m{i:03d}"] = x
+    return pd.DataFrame(data)
@@ -0,0 +1,241 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+import pandas as pd
+
+import abx
+from abx.cli.convert_cmd import _run_events, _run_unit
+from abx.cli.doctor_cmd import _run_doctor
+from abx.cli.synth_cmd import _run_synth_events, _run_synth_unit
+from datagen import _variants, make_canonical
+
+#Benchmark runner: times `_run_events`, `_run_unit` and `_run_doctor` on synthetic data and writes JSON.
+#  python benchmarks/run.py --sizes 1e5,1e6 --out bench/results.json
+#Every run (and every input generation) happens in its own process, so each result's peak_rss_mb is that run's alone;
+#each result also carries the per-stage profile of the run, so results can be compared stage by stage.
+
+TARGETS = ("events", "unit", "doctor")
+
+EVENT_METRICS = [
+    "conversion=binary:event_exists(purchase)",
+    "purchases=count:count_event(purchase)",
+    "revenue=continuous:sum_value(purchase)",
+    "active_days=count:unique_event_days(view)",
+    "tt_purchase=time:time_to_event(purchase, unit=h)",
+]
+
+
+def _parse_sizes(raw: str) -> list[int]:
+    out = []
+    for p in raw.split(","):
+        p = p.strip()
+        if p:
+            out.append(int(float(p)))
+    return out
+
+
+def _input_suffix(fmt: str) -> str:
+    if fmt == "auto":
+        try:
+            import pyarrow  # noqa: F401
+            return ".parquet"
+        except ImportError:
+            return ".csv"
+    return "." + fmt
+
+
+def _write(df: pd.DataFrame, path: Path) -> None:
+    if path.suffix == ".csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_parquet(path, index=False)
+
+
+def _synth_args(out_path: Path, n_variants: int, segment_cardinality: int, seed: int, **kwargs) -> argparse.Namespace:
+    args = argparse.Namespace(
+        out=str(out_path), users=None, variants=",".join(_variants(n_variants)), allocation="equal", srm=None,
+        value_dist="lognormal", value_mean=40.0, value_format="currency", segment_cardinality=segment_cardinality,
+        dirty_segments=0.0, seed=seed, chunk_users=200_000,
+    )
+    for k, v in kwargs.items():
+        setattr(args, k, v)
+    return args
+
+
+def _events_args(in_path: Path, out_path: Path, prof_path: Path) -> argparse.Namespace:
+    return argparse.Namespace(
+        data=str(in_path), user="user", variant="variant", time="ts", event="event", value="amount",
+        exposure="exposed", window="7d", multiexposure="first", multivariant="error", unassigned="error",
+        metric=list(EVENT_METRICS), segment=["country", "device"], segment_rule="first", segment_fix=False, segment_fix_opt=None,
+        out=str(out_path), preview=False, save_config=None, config=None, profile=str(prof_path),
+    )
+
+
+def _unit_args(in_path: Path, out_path: Path, prof_path: Path) -> argparse.Namespace:
+    return argparse.Namespace(
+        data=str(in_path), user="user", variant="variant", outcome=None,
+        metric=["converted=binary:fix(converted)", "revenue=continuous:fix(revenue)"], keep="",
+        segment=["country"], segment_rule="error", segment_fix=False, segment_fix_opt=None, dedupe="error",
+        out=str(out_path), preview=False, save_config=None, config=None, profile=str(prof_path),
+    )
+
+
+def _doctor_args(in_path: Path, prof_path: Path) -> argparse.Namespace:
+    return argparse.Namespace(
+        data=str(in_path), user=None, variant=None, metrics=None, ignore=None, allocation="equal", alpha=None,
+        min_n=None, min_n_metric=100, only=None, fail_on=None, no_exit=True, preview=False,
+        report=None, check=None, skip=None, save_config=None, config=None, profile=str(prof_path),
+    )
+
+
+def _time_call(func, args: argparse.Namespace) -> float:
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            func(args)
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                raise
+    return time.perf_counter() - t0
+
+
+def environment() -> dict:
+    return {
+        "abx": getattr(abx, "__version__", None),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def generate_input(target: str, in_path: Path, n: int, n_metrics: int = 10, events_per_user: float = 20.0, events_sigma: float = 1.0, event_skew: float = 1.2, n_variants: int = 2, multi_exposure_rate: float = 0.05, segment_cardinality: int = 50, seed: int = 0, **synth_overrides) -> None:
+    #events/unit inputs come from `abx synth`; synth_overrides set any other synth option (e.g. time_format="mixed")
+    with contextlib.redirect_stdout(io.StringIO()):
+        if target == "events":
+            args = _synth_args(
+                in_path, n_variants, segment_cardinality, seed, rows=n, events_per_user=events_per_user, events_sigma=events_sigma,
+                event_skew=event_skew, exposure_event="exposed", multi_exposure_rate=multi_exposure_rate, days=14, time_format="iso_z",
+            )
+            for k, v in synth_overrides.items():
+                setattr(args, k, v)
+            _run_synth_events(args)
+        elif target == "unit":
+            args = _synth_args(in_path, n_variants, segment_cardinality, seed, users=n, conversion_rate=0.10, duplicate_rate=0.0)
+            for k, v in synth_overrides.items():
+                setattr(args, k, v)
+            _run_synth_unit(args)
+        else:
+            _write(make_canonical(n, n_metrics=n_metrics, n_variants=n_variants, segment_cardinality=segment_cardinality, seed=seed), in_path)
+
+
+def run_target(target: str, in_path: Path, out_path: Path, prof_path: Path, **arg_overrides) -> tuple[float, dict]:
+    #Runs one command on in_path with --profile; arg_overrides replace CLI args (e.g. dedupe="first"). Returns (wall_s, profile dict).
+    if target == "events":
+        func, args = _run_events, _events_args(in_path, out_path, prof_path)
+    elif target == "unit":
+        func, args = _run_unit, _unit_args(in_path, out_path, prof_path)
+    else:
+        func, args = _run_doctor, _doctor_args(in_path, prof_path)
+    for k, v in arg_overrides.items():
+        setattr(args, k, v)
+    wall = _time_call(func, args)
+    return wall, json.loads(prof_path.read_text(encoding="utf-8"))
+
+
+def in_worker(func, *args, **kwargs):
+    #Runs func in a fresh spawned process. On Linux a child's ru_maxrss starts from the parent's high-water mark,
+    #so inputs are generated in workers too and the parent never holds data: peak_rss_mb then belongs to one run.
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(func, *args, **kwargs).result()
+
+
+def run_benchmarks(sizes: list[int], targets: list[str], repeat: int = 1, fmt: str = "auto", n_metrics: int = 10, events_per_user: float = 20.0, events_sigma: float = 1.0, event_skew: float = 1.2, n_variants: int = 2, multi_exposure_rate: float = 0.05, segment_cardinality: int = 50, seed: int = 0) -> dict:
+    suffix = _input_suffix(fmt)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="abx_bench_") as tmp:
+        tmp = Path(tmp)
+        for n in sizes:
+            for target in targets:
+                in_path = tmp / f"{target}_{n}{suffix}"
+                in_worker(
+                    generate_input, target, in_path, n, n_metrics=n_metrics, events_per_user=events_per_user, events_sigma=events_sigma, event_skew=event_skew,
+                    n_variants=n_variants, multi_exposure_rate=multi_exposure_rate, segment_cardinality=segment_cardinality, seed=seed,
+                )
+
+                for rep in range(repeat):
+                    prof_path = tmp / f"prof_{target}_{n}_{rep}.json"
+                    out_path = tmp / f"out_{target}_{n}{suffix}"
+                    wall, prof = in_worker(run_target, target, in_path, out_path, prof_path)
+                    results.append({
+                        "target": target,
+                        "rows": n,
+                        "repeat": rep,
+                        "input_format": suffix.lstrip("."),
+                        "wall_s": round(wall, 6),
+                        "peak_rss_mb": prof.get("peak_rss_mb"),
+                        "stages": prof.get("stages", []),
+                    })
+                    print(f"{target:<7} rows={n:<11} rep={rep} wall_s={wall:.3f}")
+
+    return {
+        "meta": {
+            **environment(),
+            "params": {
+                "n_metrics": n_metrics, "events_per_user": events_per_user, "events_sigma": events_sigma, "event_skew": event_skew, "n_variants": n_variants,
+                "multi_exposure_rate": multi_exposure_rate, "segment_cardinality": segment_cardinality, "seed": seed,
+            },
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="abx benchmark runner (synthetic data)")
+    parser.add_argument("--sizes", default="1e5,1e6", help="Comma-separated row counts (events rows / unit rows / doctor users). Example: 1e5,1e6,1e7")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="Comma-separated subset of: events,unit,doctor")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per (target, size)")
+    parser.add_argument("--format", choices=["auto", "csv", "parquet"], default="auto", help="Input file format (auto: parquet if pyarrow is installed)")
+    parser.add_argument("--metrics", type=int, default=10, help="Metric columns in the doctor input")
+    parser.add_argument("--events-per-user", type=float, default=20.0)
+    parser.add_argument("--events-sigma", type=float, default=1.0, help="Heavy tail of events per user (lognormal sigma; 0 = Poisson)")
+    parser.add_argument("--event-skew", type=float, default=1.2, help="Zipf exponent of the event-type mix (0 = uniform)")
+    parser.add_argument("--variants", type=int, default=2)
+    parser.add_argument("--multi-exposure-rate", type=float, default=0.05)
+    parser.add_argument("--segment-cardinality", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench/results.json", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    bad = [t for t in targets if t not in TARGETS]
+    if bad:
+        raise SystemExit(f"Unknown targets: {bad}. Use: {list(TARGETS)}")
+
+    payload = run_benchmarks(
+        _parse_sizes(args.sizes), targets, repeat=args.repeat, fmt=args.format, n_metrics=args.metrics,
+        events_per_user=args.events_per_user, events_sigma=args.events_sigma, event_skew=args.event_skew, n_variants=args.variants,
+        multi_exposure_rate=args.multi_exposure_rate, segment_cardinality=args.segment_cardinality, seed=args.seed,
+    )
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    print(f"[bench] saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,16 @@
-__all__ = ["__version__"]
+__all__ = ["__version__", "convert_unit", "convert_events", "doctor", "AbxError", "SpecError", "ConvertError", "DoctorError"]
 __version__ = "0.0.1"
+
+_API = {"convert_unit", "convert_events", "doctor"}
+_ERRORS = {"AbxError", "SpecError", "ConvertError", "DoctorError"}
+
+
+#The API imports pandas, so it is loaded on first attribute access: `import abx` and the CLI stay light
+def __getattr__(name: str):
+    if name in _API:
+        from abx import api
+        return getattr(api, name)
+    if name in _ERRORS:
+        from abx import errors
+        return getattr(errors, name)
+    raise AttributeError(f"module 'abx' has no attribute {name!r}")
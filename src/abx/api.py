@@ -0,0 +1,151 @@
+import argparse
+import contextlib
+import io
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from abx.cli.convert_cmd import _convert_events_df, _convert_unit_df, _events_defaults, _resolve_sampling, _unit_defaults, _user_hash_mask, _validate_events_args, _validate_unit_args
+from abx.cli.doctor_cmd import _doctor_checks, _doctor_column_defaults, _doctor_defaults, _require_columns
+from abx.cli.parsers import add_convert_subcommand, add_doctor_subcommand
+from abx.errors import ConvertError, DoctorError, SpecError
+
+#In-process API: the same conversion/doctor cores as the CLI, on DataFrames or Arrow tables instead of files.
+#  users = abx.convert_events(events_df, "cfg/events.json")
+#  report = abx.doctor(users, checks=["integrity", "allocation"], allocation="equal")
+#A spec is a dict (or a path to a JSON file) with the same keys as a `--save-config` file; keyword options override it.
+
+#Keys that only matter to the CLI (paths, printing, exit codes, profiling). Accepted so that --save-config files
+#can be passed unchanged, then ignored.
+_CLI_ONLY_KEYS = {
+    "cmd", "convert_cmd", "run_cmd", "func", "data", "out", "preview", "preview_sample", "examples", "save_config", "config",
+    "report", "doctor_config", "chunk_rows", "metadata_only", "write_stats", "use_stats", "only", "fail_on", "no_exit", "profile", "profile_memory", "trace",
+}
+#Repeatable CLI options: a single string is accepted as a one-item list
+_LIST_KEYS = ("metric", "segment", "segment_fix_opt")
+
+
+def _load_spec(spec) -> dict:
+    if spec is None:
+        return {}
+    if isinstance(spec, dict):
+        return dict(spec)
+    if isinstance(spec, (str, Path)):
+        path = Path(spec)
+        if not path.exists():
+            raise SpecError(f"Config file not found: {path}")
+        try:
+            cfg = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError as e:
+            raise SpecError(f"Invalid JSON in config file {path}: {e}") from None
+        if not isinstance(cfg, dict):
+            raise SpecError(f"Config file must contain a JSON object: {path}")
+        return cfg
+    raise SpecError(f"spec must be a dict, a path to a JSON config, or None (got {type(spec).__name__})")
+
+
+def _build_args(argv: list[str], spec, options: dict) -> argparse.Namespace:
+    #Start from the CLI parser's defaults so the API and the CLI can never disagree on them
+    parser = argparse.ArgumentParser(prog="abx")
+    subparsers = parser.add_subparsers(dest="cmd")
+    add_convert_subcommand(subparsers)
+    add_doctor_subcommand(subparsers)
+    args = parser.parse_args(argv)
+
+    for key, val in {**_load_spec(spec), **options}.items():
+        key = str(key).replace("-", "_")
+        if key in _CLI_ONLY_KEYS:
+            continue
+        if not hasattr(args, key):
+            raise SpecError(f"Unknown option '{key}' for {' '.join(argv)}.")
+        setattr(args, key, val)
+    for key in _LIST_KEYS:
+        if isinstance(getattr(args, key, None), str):
+            setattr(args, key, [getattr(args, key)])
+    return args
+
+
+def _to_pandas(data) -> tuple[pd.DataFrame, bool]:
+    #Returns (frame, input_was_arrow). Shallow copy: the cores replace columns, never the caller's.
+    if isinstance(data, pd.DataFrame):
+        return data.copy(deep=False), False
+    if type(data).__module__.split(".")[0] == "pyarrow" and hasattr(data, "to_pandas"):
+        return data.to_pandas(), True
+    raise SpecError(f"data must be a pandas DataFrame or a pyarrow Table (got {type(data).__name__})")
+
+
+def _to_arrow(df: pd.DataFrame):
+    import pyarrow as pa
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _call(error_cls, verbose: bool, func, *a):
+    #Cores report problems as SystemExit(message) for the CLI; the API turns them into typed exceptions
+    try:
+        if verbose:
+            return func(*a)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*a)
+    except SystemExit as e:
+        raise error_cls(str(e.code)) from None
+
+
+def _sample(df: pd.DataFrame, args: argparse.Namespace) -> pd.DataFrame:
+    sampling = _resolve_sampling(args)
+    if sampling is None:
+        return df
+    _require_columns(df, [args.user])
+    return df[_user_hash_mask(df[args.user], sampling[0], salt=sampling[1])]
+
+
+def _convert_unit(df: pd.DataFrame, args: argparse.Namespace) -> pd.DataFrame:
+    _unit_defaults(args)
+    _validate_unit_args(args, ["user", "variant"])
+    return _convert_unit_df(_sample(df, args), args)
+
+
+def _convert_events(df: pd.DataFrame, args: argparse.Namespace) -> pd.DataFrame:
+    _events_defaults(args)
+    _validate_events_args(args, ["user", "variant", "time", "event"])
+    return _convert_events_df(_sample(df, args), args)
+
+
+def convert_unit(data, spec=None, *, verbose: bool = False, **options):
+    #Unit-level data (one row per user) -> canonical user-level table. Same options as `ab convert unit`.
+    df, arrow = _to_pandas(data)
+    args = _build_args(["convert", "unit"], spec, options)
+    out = _call(ConvertError, verbose, _convert_unit, df, args)
+    return _to_arrow(out) if arrow else out
+
+
+def convert_events(data, spec=None, *, verbose: bool = False, **options):
+    #Event log (one row per event) -> one row per user with metric columns. Same options as `ab convert events`.
+    df, arrow = _to_pandas(data)
+    args = _build_args(["convert", "events"], spec, options)
+    out = _call(ConvertError, verbose, _convert_events, df, args)
+    return _to_arrow(out) if arrow else out
+
+
+def _doctor(df: pd.DataFrame, args: argparse.Namespace, max_rows: int) -> list[dict]:
+    _doctor_column_defaults(args)
+    df.columns = df.columns.str.strip()
+    _doctor_defaults(df, args)
+    if args.by:
+        from abx.cli.doctor_groups import _doctor_checks_by
+        return _doctor_checks_by(df, args, max_rows=max_rows)
+    return _doctor_checks(df, args, max_rows=max_rows)
+
+
+def doctor(data, checks=None, spec=None, *, examples: bool = True, verbose: bool = False, **options) -> dict:
+    #Runs doctor checks on a converted table. Returns {"findings", "errors", "warnings", "ready"};
+    #findings have the same shape as a JSON report. Problems in the data are findings, never exceptions.
+    #examples=False leaves every finding's `examples` as None and skips selecting example rows.
+    df, _ = _to_pandas(data)
+    if checks is not None:
+        options["check"] = checks if isinstance(checks, str) else ",".join(checks)
+    args = _build_args(["doctor"], spec, options)
+    findings = _call(DoctorError, verbose, _doctor, df, args, 30 if examples else 0)
+    n_err = sum(1 for x in findings if x.get("severity") == "ERROR")
+    n_wrn = sum(1 for x in findings if x.get("severity") == "WARN")
+    return {"findings": findings, "errors": n_err, "warnings": n_wrn, "ready": n_err == 0}
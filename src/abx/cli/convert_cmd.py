@@ -1,60 +1,12 @@
 import argparse
+import hashlib
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import json
-_EVENTS_METRIC_EXAMPLES_TEXT = Path(__file__).with_name("EVENTS_METRIC_EXAMPLES_TEXT.txt")
-_UNIT_METRIC_EXAMPLES_TEXT = Path(__file__).with_name("UNIT_METRIC_EXAMPLES_TEXT.txt")
-
-def add_convert_subcommand(subparsers: argparse._SubParsersAction) -> None:
-    convert_parser = subparsers.add_parser( "convert", help="| Convert data to canonical user-level format")
-    convert_subparsers = convert_parser.add_subparsers(dest="convert_cmd", required=True)
-
-    #ab convert unit
-    unit_parser = convert_subparsers.add_parser("unit", help="| Manual conversion/standardization for unit-level data (one row per user)")
-    unit_parser.add_argument("--data", metavar="PATH", default=None, help="| Path to CSV or Parquet file")
-    unit_parser.add_argument("--user", metavar="COL", default=None, help="| User/unit id column name")
-    unit_parser.add_argument("--variant", metavar="COL", default=None, help="| Treatment/variant column name")
-    unit_parser.add_argument("--outcome", metavar="COL", default=None, help="| Outcome/metric column name")
-    unit_parser.add_argument("--metric", metavar="SPEC", action="append", default=None, help="| Metric spec (repeatable). Unit: NAME=TYPE:fix(COL). See: ab convert unit --examples")
-    unit_parser.add_argument("--examples",action="store_true",help="| Print metric DSL examples and exit")
-    unit_parser.add_argument("--segment", metavar="COL", action="append", default=None, help="| Segment column (repeatable). Example: --segment country --segment device")
-    unit_parser.add_argument("--segment-rule", choices=["error", "first", "last", "mode"], default="error", help="| How to resolve inconsistent segment values per user (default: error)")
-    unit_parser.add_argument("--segment-fix", action="store_true", help="| Apply string standardization to all segment columns before resolving.")
-    unit_parser.add_argument("--segment-fix-opt", action="append", default=None, metavar="KEY=VAL", help="| Segment fix option (repeatable). Example: --segment-fix-opt lower=1 --segment-fix-opt spaces=underscore")
-    unit_parser.add_argument("--keep", metavar="COL,COL",default=None, help="| Comma-separated extra columns to keep (optional)")
-    unit_parser.add_argument("--dedupe", choices=["error", "first", "last"], default=None, help="| What to do if multiple rows per user exist")
-    unit_parser.add_argument("--out", metavar="PATH", help="| Output path (.csv or .parquet) (either --preview or --out)")
-    unit_parser.add_argument("--preview", action="store_true", help="| Preview converted data without outputing (either --preview or --out)")
-    unit_parser.add_argument("--save-config", metavar="PATH", default=None, help="| Write merged arguments to a JSON config file (optional, should end in .json)")
-    unit_parser.add_argument("--config", metavar="PATH", default=None, help="| Load arguments from a JSON config file (optional, should end in .json)")
-    unit_parser.set_defaults(func=_run_unit)
-
-    #ab convert event
-    events_parser = convert_subparsers.add_parser("events", help="| Manual conversion for event-level data (one row per event)")
-    events_parser.add_argument("--data", metavar = "PATH", default=None, help="| Path to CSV or Parquet file")
-    events_parser.add_argument("--user", metavar = "COL", default=None, help="| User/unit id column name")
-    events_parser.add_argument("--variant", metavar = "COL", default=None, help="| Treatment/variant column name")
-    events_parser.add_argument("--time", metavar = "COL", default=None, help="| Event timestamp column name")
-    events_parser.add_argument("--event", metavar = "COL", default=None, help="| Event type/category column name")
-    events_parser.add_argument("--value", metavar = "COL", default=None, help="| Event numeric value column name (like purchase amount)")
-    events_parser.add_argument("--exposure", metavar = "VALUE", default=None, help="| Value in Event type column identifying exposure. Users without exposure are dropped")
-    events_parser.add_argument("--multiexposure", choices=["error", "first", "last"], default=None, help="| A fallback if there are multiple exposure event per user (default: first)")
-    events_parser.add_argument("--unassigned", choices=["error", "drop", "keep"], default=None, help="| What to do if a user has no assigned variant after conversion (default: error)")
-    events_parser.add_argument("--multivariant", choices=["error", "first", "last", "mode", "from_exposure"], default=None, help="| A fallback if there are multiple variants per user (default: error)")
-    events_parser.add_argument("--window", metavar = "DURATION", default=None, help="| Outcome window after exposure (e.g., 7d, 24h). Only used when exposure-event is provided")
-    events_parser.add_argument("--metric", metavar="SPEC", action="append", default=None, help="| Metric spec (repeatable). Events: NAME=TYPE:RULE(EVENT[, key=value ...]). See: ab convert events --examples")
-    events_parser.add_argument("--examples",action="store_true",help="| Print metric DSL examples and exit")
-    events_parser.add_argument("--segment", metavar="COL", action="append", default=None, help="| Segment column (repeatable). Example: --segment country --segment device")
-    events_parser.add_argument("--segment-rule", choices=["error", "first", "last", "mode", "from_exposure"], default="error", help="| How to resolve inconsistent segment values per user (default: error). from_exposure requires --exposure.")
-    events_parser.add_argument("--segment-fix", action="store_true", help="| Apply string standardization to all segment columns before resolving.")
-    events_parser.add_argument("--segment-fix-opt", action="append", default=None, metavar="KEY=VAL", help="| Segment fix option (repeatable). Example: --segment-fix-opt lower=1 --segment-fix-opt spaces=underscore")
-    events_parser.add_argument("--out", metavar="PATH", help="| Output path (.csv or .parquet) (either --preview or --out)")
-    events_parser.add_argument("--preview", action="store_true", help="| Preview converted data without outputing (either --preview or --out)")
-    events_parser.add_argument("--save-config", metavar="PATH", default=None, help="| Write merged arguments to a JSON config file (optional, should end in .json)")
-    events_parser.add_argument("--config", metavar="PATH", default=None, help="| Load arguments from a JSON config file (optional, should end in .json)")
-    events_parser.set_defaults(func=_run_events)
-################################################################################################################
-################################################################################################################
+from abx.cli.profiling import Profiler, finish_profile, make_profiler
+from abx.cli.parsers import _EVENTS_METRIC_EXAMPLES_TEXT, _UNIT_METRIC_EXAMPLES_TEXT
+
 
 def _load_df(path: Path) -> pd.DataFrame:
     if not path.exists():
@@ -69,6 +21,97 @@ def _load_df(path: Path) -> pd.DataFrame:
     raise SystemExit("Unsupported file type. Use .csv or .parquet")
 
 
+def _parse_fraction(raw, flag: str) -> float:
+    #Accept 0.001 or 0.1%
+    s = str(raw).strip()
+    is_pct = s.endswith("%")
+    if is_pct:
+        s = s[:-1].strip()
+    try:
+        x = float(s)
+    except Exception:
+        raise SystemExit(f"Bad {flag} '{raw}'. Use a fraction (0.001) or a percentage (0.1%).")
+    if is_pct:
+        x = x / 100.0
+    if not (0.0 < x <= 1.0):
+        raise SystemExit(f"Bad {flag} '{raw}'. Fraction must be in (0, 1] (or (0%, 100%]).")
+    return x
+
+
+def _fmt_fraction(x: float) -> str:
+    return f"{100.0 * x:.4g}%"
+
+
+def _print_sampling(sampling: tuple[float, str], n_rows: int) -> None:
+    frac, salt = sampling
+    salt_txt = f", salt={salt!r}" if salt else ""
+    print(f"[sample] {_fmt_fraction(frac)} of users (stable user hash{salt_txt}): {n_rows} rows")
+
+
+def _parse_sample_users(raw) -> tuple[float, str]:
+    #FRACTION[,SALT] -> (fraction, salt)
+    s = str(raw).strip()
+    frac_raw, _, salt = s.partition(",")
+    return _parse_fraction(frac_raw, "--sample-users"), salt.strip()
+
+
+def _resolve_sampling(args: argparse.Namespace) -> tuple[float, str] | None:
+    #--preview-sample is a preview-only shortcut for --sample-users with the default salt
+    preview_sample = getattr(args, "preview_sample", None)
+    sample_users = getattr(args, "sample_users", None)
+    if preview_sample is not None and sample_users is not None:
+        raise SystemExit("Use either --preview-sample or --sample-users, not both.")
+    if preview_sample is not None:
+        args.preview = True
+        return _parse_fraction(preview_sample, "--preview-sample"), ""
+    if sample_users is not None:
+        return _parse_sample_users(sample_users)
+    return None
+
+
+def _user_hash_mask(s: pd.Series, fraction: float, salt: str = "") -> pd.Series:
+    #Stable per-user selection: hash the cleaned user id (same cleaning as conversion), keep the lowest `fraction` of the hash space.
+    #Every row of a selected user is kept, so per-user metrics stay correct for the sample.
+    x = s.astype("string").str.strip()
+    key = hashlib.blake2b(str(salt).encode("utf-8"), digest_size=8).hexdigest()
+    h = pd.util.hash_array(x.fillna("").to_numpy(dtype=object), hash_key=key, categorize=True)
+    u = (h >> np.uint64(11)).astype("float64") / float(1 << 53)
+    return pd.Series(u < fraction, index=s.index) & x.notna() & (x != "")
+
+
+def _load_df_sampled(path: Path, user_col: str, fraction: float, salt: str = "", columns: list[str] | None = None, chunksize: int = 1_000_000) -> pd.DataFrame:
+    #Read chunk by chunk and keep only sampled users, so memory follows the sample size, not the file size.
+    #Only `columns` are read when given (missing names are left for _require_columns to report).
+    if not path.exists():
+        raise SystemExit(f"File not found: {path}")
+
+    suf = path.suffix.lower()
+    if suf == ".csv":
+        available = list(pd.read_csv(path, nrows=0).columns)
+        _require_columns(pd.DataFrame(columns=available), [user_col])
+        read_cols = [c for c in dict.fromkeys(columns) if c in available] if columns else available
+        chunks = pd.read_csv(path, usecols=read_cols, chunksize=chunksize)
+    elif suf in (".parquet", ".pq"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            df = pd.read_parquet(path)
+            _require_columns(df, [user_col])
+            return df[_user_hash_mask(df[user_col], fraction, salt)].reset_index(drop=True)
+        pf = pq.ParquetFile(path)
+        available = list(pf.schema_arrow.names)
+        _require_columns(pd.DataFrame(columns=available), [user_col])
+        read_cols = [c for c in dict.fromkeys(columns) if c in available] if columns else available
+        chunks = (b.to_pandas() for b in pf.iter_batches(batch_size=chunksize, columns=read_cols))
+    else:
+        raise SystemExit("Unsupported file type. Use .csv or .parquet")
+
+    parts = [c[_user_hash_mask(c[user_col], fraction, salt)] for c in chunks]
+    if not parts:
+        return pd.DataFrame(columns=read_cols)
+    return pd.concat(parts, ignore_index=True)
+
+
 def _write_df(df: pd.DataFrame, out_path: Path) -> None:
     suf = out_path.suffix.lower()
     if suf == ".csv":
@@ -80,6 +123,16 @@ def _write_df(df: pd.DataFrame, out_path: Path) -> None:
     raise SystemExit("Unsupported output type. Use .csv or .parquet")
 
 
+def _maybe_write_stats(df: pd.DataFrame, out_path: Path, args: argparse.Namespace, prof) -> None:
+    #--write-stats: doctor statistics sidecar next to the written table (see stats_sidecar.py)
+    if not getattr(args, "write_stats", False):
+        return
+    from abx.cli.stats_sidecar import _write_stats_sidecar
+    with prof.stage("write_stats", rows_in=len(df)):
+        path = _write_stats_sidecar(df, out_path, args)
+    print(f"[stats] saved: {path}")
+
+
 def _require_columns(df: pd.DataFrame, cols: list[str]) -> None:
     missing = [c for c in cols if c not in df.columns]
     if missing:
@@ -409,6 +462,39 @@ def _resolve_segments(df: pd.DataFrame, user_col: str, seg_cols: list[str], rule
 
     raise SystemExit(f"[Stopped] Bad --segment-rule '{rule}'.")
 
+def _load_unit_input(args: argparse.Namespace, sampling: tuple[float, str] | None) -> pd.DataFrame:
+    if sampling is None:
+        return _load_df(Path(args.data))
+    #Only read the columns the conversion uses
+    needed = [args.user, args.variant] + ([args.outcome] if args.outcome else []) + _parse_keep(args.keep) + (getattr(args, "segment", None) or [])
+    if getattr(args, "metric", None):
+        needed += [m_col for (_n, _t, _r, m_col, _k) in _deconstruct_metric(args.metric, lower_first=False).values()]
+    df = _load_df_sampled(Path(args.data), args.user, sampling[0], salt=sampling[1], columns=needed)
+    _print_sampling(sampling, len(df))
+    return df
+
+
+def _load_events_input(args: argparse.Namespace, sampling: tuple[float, str] | None) -> pd.DataFrame:
+    if sampling is None:
+        return _load_df(Path(args.data))
+    #Only read the columns the conversion uses
+    needed = [args.user, args.variant, args.time, args.event] + ([args.value] if args.value else []) + (getattr(args, "segment", None) or [])
+    needed += [str(k["value"]).strip() for (_n, _t, _r, _e, k) in _deconstruct_metric(args.metric).values() if k.get("value")]
+    df = _load_df_sampled(Path(args.data), args.user, sampling[0], salt=sampling[1], columns=needed)
+    _print_sampling(sampling, len(df))
+    return df
+
+
+def _print_converted(kind: str, in_path: Path, out_path: Path | None, out: pd.DataFrame) -> None:
+    print(f"=== Converted ({kind}) ===")
+    print(f"input:  {in_path}")
+    print(f"output: {out_path if out_path is not None else '(preview only)'}")
+    print(f"rows:   {len(out)}")
+    print(f"cols:   {list(out.columns)}")
+    print("\nhead(30):")
+    print(out.head(30).to_string(index=False))
+
+
 ################################################################################################################
 ################################################################################################################
 def _run_unit(args: argparse.Namespace) -> None:
@@ -424,18 +510,48 @@ def _run_unit(args: argparse.Namespace) -> None:
             if hasattr(args, key) and getattr(args, key) is None:
                 setattr(args, key, val)
 
-    #Defaults
-    if args.keep is None:
-        args.keep = ""
-    if args.dedupe is None:
-        args.dedupe = "error"
+    _unit_defaults(args)
+    sampling = _resolve_sampling(args)
     if args.preview and args.out:
         raise SystemExit("Use either --preview or --out, not both.")
     if not args.preview and not args.out:
         raise SystemExit("Missing output. Provide --out or use --preview.")
 
-    #Validate required ARGS
-    required_args = ["data", "user", "variant"]
+    _validate_unit_args(args, ["data", "user", "variant"])
+
+    #Save config if needed
+    if args.save_config:
+        _save_config(args, Path(args.save_config))
+        print(f"[config] saved: {args.save_config}")
+
+    prof = make_profiler(args, "convert unit")
+
+    #Load data
+    in_path = Path(args.data)
+    out_path = Path(args.out) if args.out else None
+    prof.start("load")
+    df = _load_unit_input(args, sampling)
+    prof.stop(rows_out=len(df))
+
+    out = _convert_unit_df(df, args, prof)
+    _print_converted("unit", in_path, out_path, out)
+
+    if not args.preview:
+        prof.start("write", rows_in=len(out))
+        _write_df(out, out_path)
+        prof.stop()
+        _maybe_write_stats(out, out_path, args, prof)
+    finish_profile(prof, args)
+
+
+def _unit_defaults(args: argparse.Namespace) -> None:
+    if args.keep is None:
+        args.keep = ""
+    if args.dedupe is None:
+        args.dedupe = "error"
+
+
+def _validate_unit_args(args: argparse.Namespace, required_args: list[str]) -> None:
     missing = [k for k in required_args if not getattr(args, k)]
     if missing:
         raise SystemExit(
@@ -445,26 +561,25 @@ def _run_unit(args: argparse.Namespace) -> None:
     if getattr(args, "metric", None) and args.outcome:
         raise SystemExit("Use either --outcome (legacy single-metric) or --metric (new multi-metric), not both.")
 
-    #Save config if needed
-    if args.save_config:
-        _save_config(args, Path(args.save_config))
-        print(f"[config] saved: {args.save_config}")
 
-    #Load data
-    in_path = Path(args.data)
-    out_path = Path(args.out) if args.out else None
-    df = _load_df(in_path)
+#Conversion core for unit-level data: loaded input frame in, canonical user-level frame out (no file I/O).
+#Shared by `ab convert unit` and the Python API (abx.convert_unit).
+def _convert_unit_df(df: pd.DataFrame, args: argparse.Namespace, prof: Profiler | None = None) -> pd.DataFrame:
+    if prof is None:
+        prof = Profiler("convert unit")
+    keep_cols = _parse_keep(args.keep)
+    segment_cols = getattr(args, "segment", None) or []
 
     #Clean user + variant
+    prof.start("clean", rows_in=len(df))
     df[args.user] = df[args.user].astype("string").str.strip()
     df[args.variant] = df[args.variant].astype("string").str.strip().str.lower()
     df = df[df[args.user].notna() & (df[args.user] != "")]
-
-    keep_cols = _parse_keep(args.keep)
-    segment_cols = args.segment or []
+    prof.stop(rows_out=len(df))
 
 
     #If using the unit metric DSL, compute metric columns from existing columns
+    prof.start("metrics", rows_in=len(df))
     if getattr(args, "metric", None):
         metrics = _deconstruct_metric(args.metric, lower_first=False)
 
@@ -494,6 +609,7 @@ def _run_unit(args: argparse.Namespace) -> None:
 
         #Apply fixes
         for _, (m_name, m_type, m_rule, m_col, m_kwargs) in metrics.items():
+            prof.start(f"metric:{m_name}", rows_in=len(out))
             s = out[m_col]
 
             # ------------------------
@@ -626,6 +742,7 @@ def _run_unit(args: argparse.Namespace) -> None:
                 out[m_name] = x
             else:
                 raise SystemExit(f"Unsupported unit metric type: {m_name}={m_type}:{m_rule}(...). Try binary/continuous/count/string with :fix(COL).")
+            prof.stop(rows_out=len(out))
 
         #Drop source columns unless user asked to keep them
         for _, (m_name, _t, _r, m_col, _k) in metrics.items():
@@ -658,8 +775,10 @@ def _run_unit(args: argparse.Namespace) -> None:
         #Select + rename into canonical df
         out = df[required_cols].copy()
         out = out.rename(columns={args.user: "user_id", args.variant: "variant", args.outcome: "outcome"})
+    prof.stop(rows_out=len(out))
 
     #Handle duplicates
+    prof.start("dedupe", rows_in=len(out))
     dup_mask = out["user_id"].duplicated(keep=False)
     if dup_mask.any():
         n_dup_rows = int(dup_mask.sum())
@@ -672,9 +791,11 @@ def _run_unit(args: argparse.Namespace) -> None:
             out = out.sort_index().drop_duplicates(subset=["user_id"], keep="first")
         elif args.dedupe == "last":
             out = out.sort_index().drop_duplicates(subset=["user_id"], keep="last")
+    prof.stop(rows_out=len(out))
 
     #Resolve segments if requested
     if segment_cols:
+        prof.start("segments", rows_in=len(df))
         _require_columns(df, segment_cols)
 
         segment_fix_kwargs = None
@@ -684,19 +805,9 @@ def _run_unit(args: argparse.Namespace) -> None:
         seg_tbl = _resolve_segments(df=df[[args.user] + segment_cols].copy(), user_col=args.user, seg_cols=segment_cols, rule=args.segment_rule, time_col=None, segment_fix_kwargs=segment_fix_kwargs)
         seg_tbl = seg_tbl.rename(columns={args.user: "user_id"})
         out = out.merge(seg_tbl, on="user_id", how="left")
+        prof.stop(rows_out=len(out))
 
-    print("=== Converted (unit) ===")
-    print(f"input:  {in_path}")
-    print(f"output: {out_path if out_path is not None else '(preview only)'}")
-    print(f"rows:   {len(out)}")
-    print(f"cols:   {list(out.columns)}")
-    print("\nhead(30):")
-    print(out.head(30).to_string(index=False))
-
-    if args.preview:
-        return
-
-    _write_df(out, out_path)
+    return out
 
 #------------------------------------------------------------------------------------------
 
@@ -712,7 +823,41 @@ def _run_events(args: argparse.Namespace) -> None:
             if hasattr(args, key) and getattr(args, key) is None:
                 setattr(args, key, val)
 
-    #Defaults
+    _events_defaults(args)
+    sampling = _resolve_sampling(args)
+
+    if args.preview and args.out:
+        raise SystemExit("Use either --preview or --out, not both.")
+    if not args.preview and not args.out:
+        raise SystemExit("Missing output. Provide --out or use --preview.")
+    _validate_events_args(args, ["data", "user", "variant", "time", "event"])
+
+    #Save config if needed
+    if args.save_config:
+        _save_config(args, Path(args.save_config))
+        print(f"[config] saved: {args.save_config}")
+
+    prof = make_profiler(args, "convert events")
+
+    #Load df
+    in_path = Path(args.data)
+    out_path = Path(args.out) if args.out else None
+    prof.start("load")
+    df = _load_events_input(args, sampling)
+    prof.stop(rows_out=len(df))
+
+    users_tbl = _convert_events_df(df, args, prof)
+    _print_converted("events", in_path, out_path, users_tbl)
+
+    if not args.preview:
+        prof.start("write", rows_in=len(users_tbl))
+        _write_df(users_tbl, out_path)
+        prof.stop()
+        _maybe_write_stats(users_tbl, out_path, args, prof)
+    finish_profile(prof, args)
+
+
+def _events_defaults(args: argparse.Namespace) -> None:
     if args.multiexposure is None:
         args.multiexposure = "first"
     if args.multivariant is None:
@@ -720,47 +865,30 @@ def _run_events(args: argparse.Namespace) -> None:
     if args.unassigned is None:
         args.unassigned = "error"
 
-    if args.exposure:
-        after_exposure = True
-    else:
-        after_exposure = False
-
-    if args.window:
-        within_window = True
-    else:
-        within_window = False
 
-    if args.preview and args.out:
-        raise SystemExit("Use either --preview or --out, not both.")
-    if not args.preview and not args.out:
-        raise SystemExit("Missing output. Provide --out or use --preview.")
+def _validate_events_args(args: argparse.Namespace, required_args: list[str]) -> None:
     if args.window and not args.exposure:
         raise SystemExit("--window requires --exposure (window is defined relative to exposure_time).")
-
-
-    #Validate required ARGS
-    required_args = ["data", "user", "variant", "time", "event"]
     missing = [k for k in required_args if not getattr(args, k)]
     if missing:
         raise SystemExit(f"Missing required arguments: {missing}. Provide them on CLI or via --config.")
-
     if not args.metric:
         raise SystemExit("Provide at least one --metric. Example: --metric conversion=binary:event_exists(purchase)")
 
-    #Save config if needed
-    if args.save_config:
-        _save_config(args, Path(args.save_config))
-        print(f"[config] saved: {args.save_config}")
 
-    #Load df
-    in_path = Path(args.data)
-    out_path = Path(args.out) if args.out else None
-    df = _load_df(in_path)
+#Conversion core for event logs: loaded event frame in, one row per user out (no file I/O).
+#Shared by `ab convert events` and the Python API (abx.convert_events).
+def _convert_events_df(df: pd.DataFrame, args: argparse.Namespace, prof: Profiler | None = None) -> pd.DataFrame:
+    if prof is None:
+        prof = Profiler("convert events")
+    after_exposure = bool(args.exposure)
+    within_window = bool(args.window)
 
     required_cols = [args.user, args.variant, args.time, args.event]
     _require_columns(df, required_cols)
 
     #Clean columns
+    prof.start("clean", rows_in=len(df))
     df[args.user] = df[args.user].astype("string").str.strip()
     df[args.variant] = df[args.variant].astype("string").str.strip().str.lower()
     df[args.event] = df[args.event].astype("string").str.strip().str.lower()
@@ -788,20 +916,26 @@ def _run_events(args: argparse.Namespace) -> None:
             s = df[col].astype("string").str.strip()
             s = s.str.replace(r"[^0-9\.\-]+", "", regex=True)
             df[col] = pd.to_numeric(s, errors="coerce")
+    prof.stop(rows_out=len(df))
 
-    segment_cols = args.segment or []
+    segment_cols = getattr(args, "segment", None) or []
     if segment_cols:
         _require_columns(df, segment_cols)
     if segment_cols and args.segment_rule == "from_exposure" and not args.exposure:
         raise SystemExit("[Stopped] --segment-rule from_exposure requires --exposure.")
 
     #Timestamp to datetime
+    prof.start("timestamp_parse", rows_in=len(df))
     df[args.time] = pd.to_datetime(df[args.time], errors="coerce", utc=True, format="mixed")
     df = df.dropna(subset=[args.time])
+    prof.stop(rows_out=len(df))
     #Sort by user - time
+    prof.start("sort", rows_in=len(df))
     df = df.sort_values([args.user, args.time])
+    prof.stop(rows_out=len(df))
 
     #Check if variants are consistent (with multivariant handling)
+    prof.start("variant_resolution", rows_in=len(df))
     per_user_nvars = df.groupby(args.user)[args.variant].nunique(dropna=True)
     if (per_user_nvars > 1).any():
         bad = per_user_nvars[per_user_nvars > 1].index[:10].tolist()
@@ -841,9 +975,11 @@ def _run_events(args: argparse.Namespace) -> None:
 
         else:
             raise SystemExit(f"[Stopped] Bad --multivariant '{args.multivariant}'. Use error/first/last/mode/from_exposure.")
+    prof.stop(rows_out=len(df))
 
     #Multiexposure
     if args.exposure:
+        prof.start("exposure", rows_in=len(df))
         exposure = args.exposure.strip().lower()
         exp_df = df[df[args.event] == exposure].copy()
         if exp_df.empty:
@@ -877,8 +1013,10 @@ def _run_events(args: argparse.Namespace) -> None:
                 except Exception:
                     raise SystemExit(f"Bad --window '{args.window}'. Examples: 7d, 24h, 30m")
                 exposure_tbl["window_end"] = exposure_tbl["exposure_time"] + window
+        prof.stop(rows_out=len(exposure_tbl))
 
     #Base users table (one row per user)
+    prof.start("scoping", rows_in=len(df))
     if args.exposure:
         users_tbl = exposure_tbl.copy()
         df_scoped = df.copy()
@@ -894,20 +1032,25 @@ def _run_events(args: argparse.Namespace) -> None:
     else:
         users_tbl = (df[[args.user, args.variant]].drop_duplicates(subset=[args.user]).rename(columns={args.user: "user_id", args.variant: "variant"}).reset_index(drop=True))
         df_scoped = df.copy()
+    prof.stop(rows_out=len(df_scoped))
 
     if segment_cols:
+        prof.start("segments", rows_in=len(df))
         segment_fix_kwargs = None
         if getattr(args, "segment_fix", False):
             segment_fix_kwargs = _parse_kv_list(getattr(args, "segment_fix_opt", None))
 
         seg_tbl = _resolve_segments(df=df, user_col=args.user, seg_cols=segment_cols, rule=args.segment_rule, time_col=args.time, exposure_value=args.exposure, event_col=args.event, multiexposure = args.multiexposure, segment_fix_kwargs=segment_fix_kwargs).rename(columns={args.user: "user_id"})
         users_tbl = users_tbl.merge(seg_tbl, on="user_id", how="left")
+        prof.stop(rows_out=len(users_tbl))
 
 
     #Deconstruct atributes and compute metrics
     metrics = _deconstruct_metric(args.metric)
 
+    prof.start("metrics", rows_in=len(df_scoped))
     for _, (m_name, m_type, m_rule, m_event, m_kwargs) in metrics.items():
+        prof.start(f"metric:{m_name}", rows_in=len(df_scoped))
         target = m_event.strip().lower()
         # ------------------------
         # binary: event_exists(...)
@@ -1113,6 +1256,8 @@ def _run_events(args: argparse.Namespace) -> None:
                 "| time:last_time(event)\n"
                 "| time:time_to_event(event, unit=s|m|h|d)   (requires --exposure)\n"
                 "| time:time_to_nth_event(event, n=INT, unit=s|m|h|d) (requires --exposure)\n")
+        prof.stop(rows_out=len(users_tbl))
+    prof.stop(rows_out=len(users_tbl))
 
     #Unassigned variant handling
     v = users_tbl["variant"].astype("string")
@@ -1133,16 +1278,5 @@ def _run_events(args: argparse.Namespace) -> None:
             print(f"[Unassigned] kept: {n_bad} (set variant='unassigned')")
 
 
-    print("=== Converted (events) ===")
-    print(f"input:  {in_path}")
-    print(f"output: {out_path if out_path is not None else '(preview only)'}")
-    print(f"rows:   {len(users_tbl)}")
-    print(f"cols:   {list(users_tbl.columns)}")
-    print("\nhead(30):")
-    print(users_tbl.head(30).to_string(index=False))
-
-    if args.preview:
-        return
-
-    _write_df(users_tbl, out_path)
+    return users_tbl
 
@@ -0,0 +1,136 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from abx.cli.doctor_cmd import _doctor_exit_code, _doctor_file, _save_config, _save_report
+from abx.cli.profiling import Profiler, finish_profile, make_profiler
+
+#Batch doctor: `ab doctor --data 'outputs/*.parquet' --workers 8 --report reports/index.md` checks every matching table.
+#Tables are spread over a pool of N worker processes, each importing pandas once and checking many tables (single-threaded
+#checks per table). Every table gets its own report next to the index (reports/<table file name>.md), and the index
+#(.md or .json) summarises readiness across all of them. Without --report only the index is printed.
+
+_INPUT_SUFFIXES = (".csv", ".parquet", ".pq")
+_READINESS = {0: "ready", 1: "warnings", 2: "not ready"}
+
+
+def _batch_inputs(pattern: str) -> list[Path]:
+    paths = sorted(Path(p) for p in glob.glob(pattern, recursive=True) if p.lower().endswith(_INPUT_SUFFIXES))
+    if not paths:
+        raise SystemExit(f"No .csv or .parquet files match {pattern}")
+    names = [p.name for p in paths]
+    if len(set(names)) != len(names):
+        raise SystemExit(f"{pattern} matches several files with the same name; per-file reports would overwrite each other")
+    return paths
+
+
+def _doctor_one(options: dict, path: str, report: str | None) -> dict:
+    #Runs in a worker process. Problems in the data are findings; a table doctor cannot check (missing file/columns,
+    #unreadable data) is recorded as failed instead of stopping the batch.
+    args = argparse.Namespace(**options)
+    args.data = path
+    args.report = report
+    t0 = time.perf_counter()
+    out = {"input": path, "errors": None, "warnings": None, "info": None, "readiness": "failed", "exit_code": 2, "report": report, "failure": None}
+    try:
+        #Each table's console output (e.g. [stats]/[cache] lines) would interleave across processes
+        with contextlib.redirect_stdout(io.StringIO()):
+            report_items = _doctor_file(args, Profiler("doctor"))
+            if report is not None:
+                _save_report(report_items, Path(report))
+    except SystemExit as e:
+        out["failure"] = str(e.code).replace("\n", " ")
+    except Exception as e:
+        out["failure"] = f"{type(e).__name__}: {e}"
+    else:
+        n_err = sum(1 for x in report_items if x.get("severity") == "ERROR")
+        n_wrn = sum(1 for x in report_items if x.get("severity") == "WARN")
+        out.update({
+            "errors": n_err,
+            "warnings": n_wrn,
+            "info": sum(1 for x in report_items if x.get("severity") == "INFO"),
+            "readiness": _READINESS[2 if n_err else (1 if n_wrn else 0)],
+            "exit_code": _doctor_exit_code(report_items, argparse.Namespace(fail_on=args.fail_on)),
+        })
+    out["seconds"] = round(time.perf_counter() - t0, 3)
+    return out
+
+
+def _readiness_counts(rows: list[dict]) -> dict:
+    return {k: sum(1 for r in rows if r["readiness"] == k) for k in ("ready", "warnings", "not ready", "failed")}
+
+
+def _save_index(rows: list[dict], pattern: str, out_path: Path) -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    counts = _readiness_counts(rows)
+    suf = out_path.suffix.lower()
+    if suf == ".json":
+        payload = {"pattern": pattern, "inputs": len(rows), "readiness": counts, "tables": rows}
+        out_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        return
+    if suf == ".md":
+        lines = ["# ab doctor batch report\n", f"`{pattern}`: {len(rows)} table(s)\n"]
+        lines.append(f"**Summary:** {counts['ready']} ready, {counts['warnings']} with warnings, {counts['not ready']} not ready, {counts['failed']} failed.\n")
+        lines.append("| table | readiness | errors | warnings | exit code | report |")
+        lines.append("| --- | --- | --- | --- | --- | --- |")
+        for r in rows:
+            link = f"[{Path(r['report']).name}]({Path(r['report']).name})" if r["report"] and r["failure"] is None else ""
+            note = r["failure"].replace("|", "\\|").replace("\n", " ") if r["failure"] else r["readiness"]
+            n_err = "" if r["errors"] is None else r["errors"]
+            n_wrn = "" if r["warnings"] is None else r["warnings"]
+            lines.append(f"| {Path(r['input']).name} | {note} | {n_err} | {n_wrn} | {r['exit_code']} | {link} |")
+        out_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return
+    raise SystemExit("Unsupported report type. Use .json or .md")
+
+
+def _run_doctor_batch(args: argparse.Namespace) -> None:
+    if getattr(args, "chunk_rows", None) is not None and args.chunk_rows <= 0:
+        raise SystemExit("--chunk-rows must be a positive number of rows")
+    paths = _batch_inputs(args.data)
+    index_path = Path(args.report) if args.report is not None else None
+    if index_path is not None and index_path.suffix.lower() not in (".md", ".json"):
+        raise SystemExit("Unsupported report type. Use .json or .md")
+    workers = getattr(args, "workers", None) or 1
+    if workers < 1:
+        raise SystemExit("--workers must be at least 1")
+
+    if args.save_config:
+        _save_config(args, Path(args.save_config))
+        print(f"[config] saved: {args.save_config}")
+
+    #Options shared by every table; defaults that depend on the data (metrics, segments, ...) are taken per table
+    options = {k: v for k, v in vars(args).items() if k != "func"}
+    options.update({"config": None, "save_config": None, "preview": False, "no_exit": True, "workers": None, "profile": None, "profile_memory": False, "trace": None})
+    reports = [str(index_path.with_name(p.name + index_path.suffix)) if index_path is not None else None for p in paths]
+
+    prof = make_profiler(args, "doctor")
+    print(f"[batch] {len(paths)} table(s) matching {args.data}, {min(workers, len(paths))} worker process(es)")
+    with prof.stage("batch", rows_in=len(paths)):
+        if workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+                rows = list(pool.map(_doctor_one, [options] * len(paths), [str(p) for p in paths], reports))
+        else:
+            rows = [_doctor_one(options, str(p), r) for p, r in zip(paths, reports)]
+
+    if index_path is not None:
+        with prof.stage("write_report"):
+            _save_index(rows, args.data, index_path)
+        print(f"Report saved in {index_path} (+ {sum(1 for r in rows if r['failure'] is None)} per-table report(s))")
+    for r in rows:
+        if r["failure"] is not None:
+            print(f"  FAILED     {r['input']}: {r['failure']}")
+        else:
+            print(f"  {r['readiness']:<10} {r['input']} ({r['errors']} errors, {r['warnings']} warnings)")
+    counts = _readiness_counts(rows)
+    print(f"Summary: {counts['ready']} ready, {counts['warnings']} with warnings, {counts['not ready']} not ready, {counts['failed']} failed")
+    finish_profile(prof, args)
+
+    exit_code = max((r["exit_code"] for r in rows), default=0)
+    if exit_code != 0 and not getattr(args, "no_exit", False):
+        raise SystemExit(exit_code)
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from abx.cli.doctor_stats import _BY_VARIANT_COLS, MetricStats, _example_mask, _first_rows, _numeric_column, _outlier_bounds, _outlier_rows, _take
+from abx.cli.stats_sidecar import _json_default
+
+#Incremental doctor (`--cache DIR`): every checked column gets a content fingerprint, and results are cached per
+#fingerprint so a rerun only recomputes what changed.
+#
+#  DIR/frame/KEY.json    findings of one frame check (integrity/variants/consistency/allocation),
+#                        keyed by check name + user/variant fingerprints + the check's options + max_rows
+#  DIR/metric/KEY.json   fused statistics of one metric (overall row, per-variant rows, IQR outlier count),
+#                        keyed by metric + metric/variant fingerprints
+#
+#Metric findings are re-derived from the (cached + fresh) statistics on every run, so summaries across metrics are
+#always complete; example rows of cached metrics are selected lazily from the loaded frame, as usual.
+#Entries are never updated in place (a changed column gets a new key); delete DIR to reclaim space.
+
+_CACHE_VERSION = 1
+
+
+def _column_fingerprint(s: pd.Series) -> str:
+    #Name, dtype, length and a 64-bit hash per value, digested
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{s.name}\0{s.dtype}\0{len(s)}".encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(s, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _stats_entry(stats: MetricStats, m: str) -> dict:
+    o = stats.overall.loc[m]
+    per = stats.metric(m)
+    entry = {
+        "overall": o.to_dict(),
+        "by_variant": {"columns": list(per.columns), "data": per.to_numpy(dtype=object).tolist()},
+        "outliers": None,
+    }
+    bounds = _outlier_bounds(float(o["q1"]), float(o["q3"])) if stats.quantiles else None
+    if bounds is not None:
+        entry["outliers"] = [bounds[0], bounds[1], stats.outlier_count(m, *bounds)[0]]
+    return entry
+
+
+class DoctorCache:
+    def __init__(self, path) -> None:
+        self.path = Path(path)
+        self.fingerprints: dict[str, str] = {}
+        #(reused, total) per kind, for the run summary
+        self.reused = {"frame": 0, "metric": 0}
+        self.total = {"frame": 0, "metric": 0}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, df: pd.DataFrame, cols: list[str]) -> None:
+        for c in dict.fromkeys(cols):
+            if c not in self.fingerprints:
+                self.fingerprints[c] = _column_fingerprint(df[c])
+
+    def _file(self, kind: str, parts: list) -> Path:
+        key = hashlib.sha256(json.dumps([_CACHE_VERSION, kind] + parts, default=str).encode("utf-8")).hexdigest()[:32]
+        return self.path / kind / f"{key}.json"
+
+    def _read(self, path: Path):
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path: Path, payload, default=None) -> None:
+        try:
+            text = json.dumps(payload, ensure_ascii=False, default=default)
+        except (TypeError, ValueError):
+            #Not JSON-representable (e.g. odd example values): just not cached
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+
+    def frame_check(self, name: str, cols: list[str], params: list, max_rows: int, check, items: list[dict]) -> None:
+        #Runs check(items) unless the findings for these columns and options are cached
+        path = self._file("frame", [name, [[c, self.fingerprints[c]] for c in cols], params, max_rows])
+        hit = self._read(path)
+        reuse = isinstance(hit, dict) and isinstance(hit.get("findings"), list)
+        #Frame checks may run on --workers threads
+        with self._lock:
+            self.total["frame"] += 1
+            self.reused["frame"] += int(reuse)
+        if reuse:
+            items.extend(hit["findings"])
+            return
+        check(items)
+        self._write(path, {"findings": items})
+
+    def metric_stats(self, df: pd.DataFrame, user: str, variant: str, metrics: list[str], quantiles: bool, prof, pool=None, workers: int = 1) -> "CachedStats":
+        metrics = list(dict.fromkeys(metrics))
+        files = {m: self._file("metric", [m, self.fingerprints[m], variant, self.fingerprints[variant], quantiles]) for m in metrics}
+        cached = {}
+        for m in metrics:
+            entry = self._read(files[m])
+            if isinstance(entry, dict) and {"overall", "by_variant", "outliers"} <= set(entry):
+                cached[m] = entry
+        self.total["metric"] += len(metrics)
+        self.reused["metric"] += len(cached)
+
+        fresh = None
+        todo = [m for m in metrics if m not in cached]
+        if todo:
+            with prof.stage("stats", rows_in=len(df)):
+                fresh = MetricStats(df, user, variant, todo, quantiles=quantiles, pool=pool, workers=workers)
+            for m in todo:
+                self._write(files[m], _stats_entry(fresh, m), default=_json_default)
+        return CachedStats(df, user, variant, metrics, cached, fresh)
+
+    def summary(self) -> str:
+        return (
+            f"reused {self.reused['metric']}/{self.total['metric']} metric columns, "
+            f"{self.reused['frame']}/{self.total['frame']} frame checks ({self.path})"
+        )
+
+
+class CachedStats:
+    #Same interface as doctor_stats.MetricStats: cached metrics from their entries, the rest from a fresh MetricStats
+    approximate = False
+
+    def __init__(self, df: pd.DataFrame, user: str, variant: str, metrics: list[str], cached: dict, fresh: MetricStats | None) -> None:
+        self.df = df
+        self.user = user
+        self.variant = variant
+        self.metrics = list(dict.fromkeys(metrics))
+        self._cached = cached
+        self._fresh = fresh
+        rows = [cached[m]["overall"] if m in cached else fresh.overall.loc[m].to_dict() for m in self.metrics]
+        self.overall = pd.DataFrame(rows, index=pd.Index(self.metrics, name="metric"))
+        parts = [self.metric(m).assign(metric=m) for m in self.metrics]
+        by_variant = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=[variant, *_BY_VARIANT_COLS, "metric"])
+        #Cached rows come back from JSON as Python objects; same dtypes as MetricStats.by_variant
+        dtypes = {c: "int64" if c in ("users", "missing", "count", "nonfinite") else "float64" for c in _BY_VARIANT_COLS}
+        self.by_variant = by_variant[["metric", variant, *_BY_VARIANT_COLS]].astype(dtypes)
+
+    def metric(self, m: str) -> pd.DataFrame:
+        if m not in self._cached:
+            return self._fresh.metric(m)
+        per = self._cached[m]["by_variant"]
+        return pd.DataFrame(per["data"], columns=per["columns"])
+
+    def examples(self, kind: str, m: str):
+        if m not in self._cached:
+            return self._fresh.examples(kind, m)
+        cols = [self.user, self.variant, m]
+        if kind == "head":
+            return lambda n: _take(self.df, np.arange(min(n, len(self.df))), cols)
+        return lambda n: _first_rows(self.df, _example_mask(self.df[m], _numeric_column(self.df[m]), kind), cols)(n)
+
+    def outlier_count(self, m: str, lo: float, hi: float) -> tuple[int, bool]:
+        if m not in self._cached:
+            return self._fresh.outlier_count(m, lo, hi)
+        stored = self._cached[m]["outliers"]
+        if stored is not None and stored[0] == lo and stored[1] == hi:
+            return int(stored[2]), False
+        x = _numeric_column(self.df[m])
+        return int(((x < lo) | (x > hi)).sum()), False
+
+    def outlier_examples(self, m: str, lo: float, hi: float):
+        if m not in self._cached:
+            return self._fresh.outlier_examples(m, lo, hi)
+        return lambda n: _outlier_rows(self.df, _numeric_column(self.df[m]), lo, hi, [self.user, self.variant, m], n)
@@ -1,41 +1,28 @@
 import argparse
+import heapq
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from abx.cli.doctor_stats import MetricStats, _first_rows, _take, _variant_rows
+from abx.cli.profiling import Profiler, finish_profile, make_profiler
 _FGUIDE_PATH = Path(__file__).with_name("FINDING_GUIDE.txt")
 
 
-def add_doctor_subcommand(subparsers: argparse._SubParsersAction) -> None:
-    doctor_parser = subparsers.add_parser( "doctor", help="| Validate converted datasets, check if ready to be analysed")
-    doctor_parser.add_argument("--data", metavar="PATH", default=None, help="| Path to converted CSV or Parquet file")
-    doctor_parser.add_argument("--user", metavar="COL", default=None, help="| User/unit id column name in converted data (default: user_id)")
-    doctor_parser.add_argument("--variant", metavar="COL", default=None, help="| Treatment/variant column name in converted data (default: variant)")
-    doctor_parser.add_argument("--metrics", metavar="COL,COL", default=None, help="| Comma-separated metric columns to check (default: numeric columns except user/variant)")
-    doctor_parser.add_argument("--ignore", metavar="COL,COL", default=None, help="| Comma-separated columns to ignore (e.g., keep cols like device,country)")
-    doctor_parser.add_argument("--allocation", metavar="SPEC", default=None, help="| Expected allocation: 'equal' or 'A=0.5,B=0.3,C=0.2' (optional)")
-    doctor_parser.add_argument("--alpha", metavar="FLOAT", type=float, default=None, help="| Alpha for allocation/SRM-style checks (default: 0.01)")
-    doctor_parser.add_argument("--min-n", metavar="N", type=int, default=None, help="| Warn if any variant has fewer than N users (optional)")
-    doctor_parser.add_argument("--min-n-metric", metavar="N", type=int, default=None, help="| Warn if any metric has < N non-missing users in any variant (optional)")
-    doctor_parser.add_argument("--only", choices=["errors", "warnings", "all"], default=None, help="| What to report: errors, warnings, or all (default: all)")
-    doctor_parser.add_argument("--fail-on", choices=["error", "warn"], default=None, help="| Exit nonzero on errors only (default) or errors+warnings")
-    doctor_parser.add_argument("--no-exit", action="store_true", help="| Always exit 0 (still prints report)")
-    doctor_parser.add_argument("--preview", action="store_true", help="| Preview problem rows/examples")
-    doctor_parser.add_argument("--report", metavar="PATH", default=None, help="| Write report to file (.md ot .json) (optional)")
-    doctor_parser.add_argument("--check", metavar="NAME,NAME", default=None, help="| Comma-separated checks to run ---(e.g., integrity,variants,missingness,allocation,metrics,consistency)")
-    doctor_parser.add_argument("--skip", metavar="NAME,NAME", default=None, help="| Comma-separated checks to skip")
-    doctor_parser.add_argument("--save-config", metavar="PATH", default=None, help="| Write merged arguments to a JSON config file (optional, should end in .json)")
-    doctor_parser.add_argument("--config", metavar="PATH", default=None, help="| Load arguments from a JSON config file (optional, should end in .json)")
-    doctor_parser.set_defaults(func=_run_doctor)
-
-#############################################################################################################################
-#############################################################################################################################
-
-def _load_df(path: Path) -> pd.DataFrame:
+def _load_df(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    #columns: CSV only, stripped names to read (others are skipped while parsing)
     if not path.exists():
         raise SystemExit(f"File not found: {path}")
 
     suf = path.suffix.lower()
     if suf == ".csv":
+        if columns is not None:
+            keep = set(columns)
+            return pd.read_csv(path, usecols=lambda c: c.strip() in keep)
         return pd.read_csv(path)
     if suf in (".parquet", ".pq"):
         return pd.read_parquet(path)
@@ -56,6 +43,8 @@ def _fmt_pp(x: float, digits: int = 1) -> str:
         return str(x)
 
 
+#Read on first use, not at import: most runs never print an explanation
+@lru_cache(maxsize=1)
 def _load_finding_guide() -> dict:
     if not _FGUIDE_PATH.exists():
         return {}
@@ -65,10 +54,8 @@ def _load_finding_guide() -> dict:
     except Exception:
         return {}
 
-_FINDING_GUIDE = _load_finding_guide()
-
 def _explain_finding(code: str) -> dict | None:
-    return _FINDING_GUIDE.get(code, None)
+    return _load_finding_guide().get(code, None)
 
 def _format_diagnostics(meta: dict | None) -> str:
     if meta is None or not isinstance(meta, dict) or not meta:
@@ -192,7 +179,9 @@ def _print_preview(report_items: list[dict], only: str = "all", max_example_rows
             cnt = f.get("count", 0)
             meta = f.get("meta", None)
 
-            print(f"  - [{code}] (count={cnt}) {msg}")
+            #--by: findings of one experiment
+            where = f"experiment={f['experiment']}, " if "experiment" in f else ""
+            print(f"  - [{code}] ({where}count={cnt}) {msg}")
 
             explain = _format_explain_text(code, meta)
             if explain:
@@ -250,9 +239,12 @@ def _write_report(report_items: list[dict], finding: dict, max_rows: int = 30) -
     if meta is not None and not isinstance(meta, dict):
         raise SystemExit(f"Finding '{code}' meta must be a dict if provided")
 
+    #examples_df is a frame or a lazy selector (n -> frame, see doctor_stats._first_rows); max_rows=0 skips examples
     examples_df = finding.get("examples_df", None)
     examples = None
-    if examples_df is not None:
+    if callable(examples_df):
+        examples_df = examples_df(max_rows) if max_rows > 0 else None
+    if examples_df is not None and max_rows > 0:
         if not isinstance(examples_df, pd.DataFrame):
             raise SystemExit(f"Finding '{code}' examples_df is not a DataFrame")
         ex = examples_df.head(max_rows).copy()
@@ -334,7 +326,7 @@ def _save_report(report_items: list[dict], out_path: Path) -> None:
             return "\n".join(out)
 
         def _guide_text(code: str) -> str:
-            g = _FINDING_GUIDE.get(code, None)
+            g = _explain_finding(code)
             if not g:
                 return ""
 
@@ -362,6 +354,8 @@ def _save_report(report_items: list[dict], out_path: Path) -> None:
                 lines.append(f"\n## {current}\n")
 
             lines.append(f"### {f['code']}\n")
+            if "experiment" in f:
+                lines.append(f"- **Experiment:** {md_escape(f['experiment'])}\n")
             lines.append(f"- **Count:** {f['count']}\n")
 
             lines.append("\n> **Finding**\n")
@@ -422,64 +416,203 @@ def _require_columns(df: pd.DataFrame, cols: list[str]) -> None:
         raise SystemExit(f"Missing columns: {missing}\nAvailable columns: {list(df.columns)}")
     
 #--------------------- TESTS ---------------------
-def _integrity(df: pd.DataFrame, user: str, variant:str, report_items: list[dict], max_rows: int = 30) -> None:
+#Each check is split into a summary (counts + example rows, computed from a frame) and a report (findings from the summary).
+#The chunked doctor (doctor_stream.py) builds the same summaries from merged per-chunk state and reuses the reports.
+#
+#User and variant columns are checked through their distinct values (_StringView): strip/lower/compare run once per
+#distinct value and reach the rows through factorize codes, so a 3-valued variant column costs 3 string operations,
+#not one per row. The frame checks of one run share the views (_StringViews).
+class _StringView:
+    def __init__(self, s: pd.Series) -> None:
+        #codes: row -> distinct value (-1 = missing), counts: rows per distinct value
+        self.codes, self.uniques = pd.factorize(s)
+        self.counts = np.bincount(self.codes[self.codes >= 0], minlength=len(self.uniques))
+        self.n_missing = int(len(self.codes) - self.counts.sum())
+        self.raw = pd.Series(self.uniques).astype("string").reset_index(drop=True)
+        self.stripped = self.raw.str.strip()
+        self.clean = self.stripped.str.lower()
+        self._normalized = None
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def rows(self, flags) -> np.ndarray:
+        #Flags per distinct value -> row mask (missing rows False)
+        flags = np.asarray(flags, dtype=bool)
+        if not len(flags):
+            return np.zeros(len(self.codes), dtype=bool)
+        return (self.codes >= 0) & flags[np.maximum(self.codes, 0)]
+
+    def count(self, flags) -> int:
+        return int(self.counts[np.asarray(flags, dtype=bool)].sum()) if len(self.counts) else 0
+
+    def blank(self) -> np.ndarray:
+        #Missing or whitespace-only
+        return (self.codes < 0) | self.rows(_flags(self.stripped == ""))
+
+    def value_counts(self, labels: pd.Series, name: str, keep=None, dropna: bool = False) -> pd.Series:
+        #value_counts() of the column mapped through `labels` (one per distinct value; rows of values outside `keep`
+        #dropped): values that map to the same label are summed. Same values, order and dtype as value_counts on the rows.
+        keep = np.ones(len(self), dtype=bool) if keep is None else np.asarray(keep, dtype=bool)
+        labels = labels.reset_index(drop=True)
+        counts = self.counts
+        if self.n_missing and not dropna:
+            #Missing values take their first-seen position, like every other value
+            at = int(self.codes[:np.argmax(self.codes < 0)].max(initial=-1)) + 1
+            labels = pd.concat([labels[:at], pd.Series([pd.NA], dtype="string"), labels[at:]], ignore_index=True)
+            counts = np.insert(counts, at, self.n_missing)
+            keep = np.insert(keep, at, True)
+        return _label_counts(labels[keep], counts[keep], name)
+
+    def normalized(self) -> tuple[np.ndarray, np.ndarray]:
+        #Codes of the normalized (strip + lower) value per row, -1 for blanks, and the normalized labels
+        if self._normalized is None:
+            norm_codes, labels = pd.factorize(self.clean.mask(self.clean == "", pd.NA))
+            codes = np.where(self.codes >= 0, norm_codes[np.maximum(self.codes, 0)] if len(norm_codes) else -1, -1)
+            self._normalized = (codes, np.asarray(labels, dtype=object))
+        return self._normalized
+
+
+class _StringViews:
+    #Lazily built _StringView per column of one frame; thread-safe, since frame checks run on a pool with --workers
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.df = df
+        self._views: dict[str, _StringView] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, col: str) -> _StringView:
+        with self._lock:
+            if col not in self._views:
+                self._views[col] = _StringView(self.df[col])
+            return self._views[col]
+
+
+def _label_counts(labels: pd.Series, counts: np.ndarray, name: str) -> pd.Series:
+    #Counts per label given in first-seen order (equal labels summed), ordered and typed like value_counts()
+    out = pd.Series(counts, index=pd.Index(labels, dtype="string", name=name))
+    out = out.groupby(level=0, sort=False, dropna=False).sum()
+    return out.astype("Int64").rename("count").sort_values(ascending=False)
+
+
+def _flags(mask: pd.Series) -> np.ndarray:
+    #Nullable boolean -> numpy (NA is False)
+    return mask.to_numpy(dtype=bool, na_value=False)
+
+
+def _duplicate_users(df: pd.DataFrame, user: str, variant: str, view: _StringView) -> dict:
+    #Duplicates from the factorized user column (a hash table with exact equality checks, so hash collisions never
+    #merge two ids): rows per id > 1. No row-level duplicated() and no second pass over the duplicated rows.
+    dup = view.counts > 1
+    #Missing ids duplicate each other like in DataFrame.duplicated (only the missing rows are compared)
+    null_pos = np.empty(0, dtype="int64")
+    if view.n_missing > 1:
+        null_pos = np.flatnonzero(view.codes < 0)
+        null_pos = null_pos[df[user].iloc[null_pos].duplicated(keep=False).to_numpy()]
+
+    def rows(n: int) -> pd.DataFrame:
+        #Duplicated rows ordered by user id (stable, missing last). Every duplicated id has 2+ rows, so the rows of the
+        #n smallest ids are enough: only the duplicated distinct ids are sorted, never all duplicated rows.
+        dup_codes = np.flatnonzero(dup)
+        ids = pd.Series(view.uniques[dup_codes])
+        if ids.dtype == object or isinstance(ids.dtype, pd.StringDtype):
+            #n smallest string ids without sorting millions of them (same result as sorted(...)[:n])
+            ids = ids.to_numpy(dtype=object)
+            first = dup_codes[heapq.nsmallest(n, range(len(ids)), key=ids.__getitem__)]
+        else:
+            first = dup_codes[ids.sort_values(kind="stable").index.to_numpy()[:n]]
+        rank = np.full(len(view), -1)
+        rank[first] = np.arange(len(first))
+        r = np.where(view.codes >= 0, rank[np.maximum(view.codes, 0)] if len(rank) else -1, -1)
+        pos = np.flatnonzero(r >= 0)
+        pos = np.concatenate([pos[np.argsort(r[pos], kind="stable")], null_pos])
+        return _take(df, pos[:n], [user, variant])
+
+    return {
+        "dup_users": int(dup.sum()),
+        "dup_rows": int(view.counts[dup].sum()) + len(null_pos),
+        "dup_examples": rows,
+    }
+
+
+def _integrity_summary(df: pd.DataFrame, user: str, variant: str, views: _StringViews | None = None) -> dict:
+    views = _StringViews(df) if views is None else views
+    bad_user = views[user].blank()
+    bad_var = views[variant].blank()
+    return {
+        "n_rows": int(len(df)),
+        "n_users": len(views[user]),
+        "bad_user": int(bad_user.sum()),
+        "bad_user_examples": _first_rows(df, bad_user, [user, variant]),
+        "bad_variant": int(bad_var.sum()),
+        "bad_variant_examples": _first_rows(df, bad_var, [user, variant]),
+        **_duplicate_users(df, user, variant, views[user]),
+    }
+
+
+def _integrity_report(s: dict, user: str, variant: str, report_items: list[dict], max_rows: int = 30) -> None:
+    n_rows = s["n_rows"]
+    n_users = s["n_users"]
     #Null/empty user
-    u = df[user]
-    u_str = u.astype("string")
-    bad_user = u_str.isna() | (u_str.str.strip() == "")
-    if bad_user.any():
+    if s["bad_user"] > 0:
         _write_report(report_items, {
             "severity": "ERROR",
             "code": "INTEGRITY_BAD_USER",
             "message": f"Found missing/empty values in '{user}'. Canonical data must have a valid user_id per row.",
-            "count": int(bad_user.sum()),
-            "meta": {"n_rows": int(len(df)), "n_users": int(df[user].nunique(dropna=True))},
-            "examples_df": df.loc[bad_user, [user, variant]].copy(),
+            "count": s["bad_user"],
+            "meta": {"n_rows": n_rows, "n_users": n_users},
+            "examples_df": s["bad_user_examples"],
         }, max_rows=max_rows)
 
     #Null/empty variant
-    v = df[variant]
-    v_str = v.astype("string")
-    bad_var = v_str.isna() | (v_str.str.strip() == "")
-    if bad_var.any():
+    if s["bad_variant"] > 0:
         _write_report(report_items, {
             "severity": "ERROR",
             "code": "INTEGRITY_BAD_VARIANT",
             "message": f"Found missing/empty values in '{variant}'. Canonical data must have a variant per row.",
-            "count": int(bad_var.sum()),
-            "meta": {"n_rows": int(len(df)), "n_users": int(df[user].nunique(dropna=True))},
-            "examples_df": df.loc[bad_var, [user, variant]].copy(),
+            "count": s["bad_variant"],
+            "meta": {"n_rows": n_rows, "n_users": n_users},
+            "examples_df": s["bad_variant_examples"],
         }, max_rows=max_rows)
 
     #Duplicate user_id rows
-    dup_mask = df.duplicated(subset=[user], keep=False)
-    if dup_mask.any():
-        dup_users = int(df.loc[dup_mask, user].nunique(dropna=True))
-        dup_rows = int(dup_mask.sum())
+    if s["dup_rows"] > 0:
+        dup_users = s["dup_users"]
+        dup_rows = s["dup_rows"]
         _write_report(report_items, {
             "severity": "ERROR",
             "code": "INTEGRITY_DUP_USER",
             "message": f"Duplicate '{user}' rows found. Canonical data must have exactly 1 row per user. (dup_users={dup_users}, dup_rows={dup_rows})",
             "count": dup_rows,
-            "meta": {"n_rows": int(len(df)), "n_users": int(df[user].nunique(dropna=True)), "dup_users": dup_users, "dup_rows": dup_rows},
-            "examples_df": df.loc[dup_mask, [user, variant]].sort_values(user).copy(),
+            "meta": {"n_rows": n_rows, "n_users": n_users, "dup_users": dup_users, "dup_rows": dup_rows},
+            "examples_df": s["dup_examples"],
         }, max_rows=max_rows)
 
     #Total rows/users
-    n_rows = len(df)
-    n_users = df[user].nunique(dropna=True)
     _write_report(report_items, {
         "severity": "INFO",
         "code": "INTEGRITY_SUMMARY",
         "message": f"Rows={n_rows}, unique_users={n_users}.",
         "count": n_rows,
-        "meta": {"n_rows": int(n_rows), "n_users": int(n_users)},
+        "meta": {"n_rows": n_rows, "n_users": n_users},
         "examples_df": None,
     }, max_rows=max_rows)
+
+
+def _integrity(df: pd.DataFrame, user: str, variant:str, report_items: list[dict], max_rows: int = 30, views: _StringViews | None = None) -> None:
+    _integrity_report(_integrity_summary(df, user, variant, views), user, variant, report_items, max_rows=max_rows)
 #---------------------
-def _variant_check(df: pd.DataFrame, user: str, variant:str, min_n: int, report_items: list[dict], max_rows: int = 30) -> None:
-    tmp = df[variant].astype("string").str.strip()
-    counts = tmp.value_counts(dropna=False).reset_index()
+def _variant_summary(df: pd.DataFrame, user: str, variant: str, views: _StringViews | None = None) -> dict:
+    #Users per stripped variant value (missing included)
+    views = _StringViews(df) if views is None else views
+    v = views[variant]
+    return {
+        "counts": v.value_counts(v.stripped, variant),
+        "n_users": len(views[user]),
+    }
+
+
+def _variant_report(s: dict, variant: str, min_n: int, report_items: list[dict], max_rows: int = 30) -> None:
+    counts = s["counts"].rename_axis(variant).reset_index()
     counts.columns = [variant, "n_users"]
     total = float(counts["n_users"].sum()) if len(counts) else 0.0
     counts["pct"] = counts["n_users"].apply(lambda x: (float(x) / total) if total else 0.0)
@@ -490,19 +623,19 @@ def _variant_check(df: pd.DataFrame, user: str, variant:str, min_n: int, report_
         "code": "VARIANT_COUNTS",
         "message": "Variant counts (users per variant).",
         "count": int(len(counts)),
-        "meta": {"n_users": int(df[user].nunique(dropna=True))},
+        "meta": {"n_users": s["n_users"]},
         "examples_df": counts,
     }, max_rows=max_rows)
 
     #Warn if only one variant
-    n_var = df[variant].astype("string").str.strip().nunique(dropna=True)
+    n_var = int(s["counts"].index.notna().sum())
     if n_var <= 1:
         _write_report(report_items, {
             "severity": "WARN",
             "code": "VARIANT_SINGLE_ARM",
             "message": "Only one non-null variant detected. This may not be a real experiment (A/B/n).",
             "count": int(n_var),
-            "meta": {"n_users": int(df[user].nunique(dropna=True))},
+            "meta": {"n_users": s["n_users"]},
             "examples_df": counts,
         }, max_rows=max_rows)
 
@@ -525,96 +658,147 @@ def _variant_check(df: pd.DataFrame, user: str, variant:str, min_n: int, report_
                 "meta": {"min_n": int(min_n), "note": note},
                 "examples_df": tiny,
             }, max_rows=max_rows)
+
+
+def _variant_check(df: pd.DataFrame, user: str, variant:str, min_n: int, report_items: list[dict], max_rows: int = 30, views: _StringViews | None = None, summary: dict | None = None) -> None:
+    summary = _variant_summary(df, user, variant, views) if summary is None else summary
+    _variant_report(summary, variant, min_n, report_items, max_rows=max_rows)
 #---------------------
-def _missingness(df: pd.DataFrame, user: str, variant: str, metrics: list[str], report_items: list[dict], max_rows: int = 30, high_missing_warn: float = 0.95, gap_warn: float = 0.20) -> None:
-    n_total = int(len(df))
-    rows = []
-    highlight_lines = []
+#Wide tables: when more than this many metrics get the same per-metric finding, they are reported as one finding with a
+#per-metric table instead of one finding each (a 2,000-column feature table would otherwise produce thousands of items)
+_COMPACT_METRIC_FINDINGS = 20
+_COMPACT_MESSAGES = {
+    "METRIC_ALL_MISSING": "entirely missing. They are not usable for analysis.",
+    "METRIC_HIGH_MISSING": "have high missingness.",
+    "METRIC_MISSING_IMBALANCE": "have missingness that differs across variants.",
+    "METRIC_NON_NUMERIC_DTYPE": "have a text dtype. For analysis, metrics should usually be numeric (or datetime for time metrics).",
+    "METRIC_BAD_NUMERIC_CAST": "have many non-numeric values (failed cast rate >= 20%).",
+    "METRIC_NONFINITE": "contain inf/-inf values. That breaks most analysis.",
+    "METRIC_CONSTANT": "are constant (no variation). They will not show treatment effects.",
+    "METRIC_BAD_BINARY_VALUES": "look binary but contain values other than 0/1.",
+    "METRIC_OUTLIERS": "have potential outliers (IQR rule).",
+    "METRIC_TINY_ARM": "have too few non-missing users in some variants.",
+}
+
+
+def _write_metric_findings(report_items: list[dict], entries: list[tuple[str, dict, dict]], max_rows: int = 30) -> None:
+    #entries: (metric, finding, compact table row) in report order. A code with more than _COMPACT_METRIC_FINDINGS metrics
+    #becomes one finding (count = metrics, examples = their rows, meta.metrics = all names) where its first metric was
+    by_code: dict[str, list] = {}
+    for entry in entries:
+        by_code.setdefault(entry[1]["code"], []).append(entry)
+    for _, finding, _ in entries:
+        group = by_code[finding["code"]]
+        if len(group) <= _COMPACT_METRIC_FINDINGS:
+            _write_report(report_items, finding, max_rows=max_rows)
+        elif finding is group[0][1]:
+            metrics = [x[0] for x in group]
+            _write_report(report_items, {
+                "severity": finding["severity"],
+                "code": finding["code"],
+                "message": f"{len(metrics)} metrics {_COMPACT_MESSAGES[finding['code']]} Per-metric details in the examples.",
+                "count": len(metrics),
+                "meta": {"metrics": metrics, "compact": True},
+                "examples_df": pd.DataFrame([x[2] for x in group]),
+            }, max_rows=max_rows)
 
-    for m in metrics:
-        s = df[m]
-        missing_total = int(s.isna().sum())
-        overall_rate = float(missing_total / n_total) if n_total > 0 else 0.0
-
-        g = df.groupby(variant, dropna=False)[m]
-        per = g.agg(users="size", missing=lambda x: int(x.isna().sum())).reset_index()
-        per["missing_pct"] = per.apply(lambda r: (float(r["missing"] / r["users"]) if r["users"] else 0.0),axis=1)
-
-        if len(per) > 0:
-            worst_idx = int(per["missing_pct"].idxmax())
-            best_idx = int(per["missing_pct"].idxmin())
-            worst_v = per.loc[worst_idx, variant]
-            best_v = per.loc[best_idx, variant]
-            worst_rate = float(per.loc[worst_idx, "missing_pct"])
-            best_rate = float(per.loc[best_idx, "missing_pct"])
-            gap = float(worst_rate - best_rate)
-        else:
-            worst_v = best_v = ""
-            worst_rate = best_rate = 0.0
-            gap = 0.0
-
-        rows.append({
-            "metric": m,
-            "overall_missing": f"{missing_total}/{n_total} ({_fmt_pct(overall_rate)})",
-            "worst_variant": f"{worst_v} ({_fmt_pct(worst_rate)})",
-            "best_variant": f"{best_v} ({_fmt_pct(best_rate)})",
-            "gap_pp": _fmt_pp(gap),
-            "overall_missing_rate": overall_rate,
-            "gap_rate": gap,
-        })
 
-        if overall_rate >= high_missing_warn or gap >= gap_warn or overall_rate >= 0.80:
-            highlight_lines.append(
-                f"- **{m}**: overall {missing_total}/{n_total} ({_fmt_pct(overall_rate)}), "
-                f"worst {worst_v} {_fmt_pct(worst_rate)}, best {best_v} {_fmt_pct(best_rate)}, gap {_fmt_pp(gap)}"
-            )
+def _missingness(stats: MetricStats, report_items: list[dict], max_rows: int = 30, high_missing_warn: float = 0.95, gap_warn: float = 0.20) -> None:
+    variant = stats.variant
+    o = stats.overall
+    n_total = o["n_rows"].to_numpy(dtype="int64")
+    missing_total = o["missing"].to_numpy(dtype="int64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        overall_rate = np.where(n_total > 0, missing_total / np.maximum(n_total, 1), 0.0)
+
+    #Worst/best variant of every metric from one grouped reduction over the (metric, variant) table
+    per, groups = _variant_rows(stats)
+    per = per[["metric", variant, "users", "missing"]].copy()
+    per["missing_pct"] = (per["missing"] / per["users"].where(per["users"] > 0)).fillna(0.0)
+    by_metric = per.groupby("metric", sort=False)["missing_pct"]
+    worst_idx = by_metric.idxmax().reindex(stats.metrics)
+    best_idx = by_metric.idxmin().reindex(stats.metrics)
+    has = worst_idx.notna().to_numpy()
+    labels = per[variant].to_numpy(dtype=object)
+    rates = per["missing_pct"].to_numpy(dtype="float64")
+    wi = worst_idx.fillna(0).to_numpy(dtype="int64")
+    bi = best_idx.fillna(0).to_numpy(dtype="int64")
+    worst_v = np.where(has, labels[wi] if len(labels) else "", "")
+    best_v = np.where(has, labels[bi] if len(labels) else "", "")
+    worst_rate = np.where(has, rates[wi] if len(rates) else 0.0, 0.0)
+    best_rate = np.where(has, rates[bi] if len(rates) else 0.0, 0.0)
+    gap = worst_rate - best_rate
+
+    rows = [{
+        "metric": m,
+        "overall_missing": f"{missing_total[i]}/{n_total[i]} ({_fmt_pct(overall_rate[i])})",
+        "worst_variant": f"{worst_v[i]} ({_fmt_pct(worst_rate[i])})",
+        "best_variant": f"{best_v[i]} ({_fmt_pct(best_rate[i])})",
+        "gap_pp": _fmt_pp(gap[i]),
+        "overall_missing_rate": float(overall_rate[i]),
+        "gap_rate": float(gap[i]),
+    } for i, m in enumerate(stats.metrics)]
 
-        if overall_rate >= 0.999999:
-            _write_report(report_items, {
+    highlight_lines = []
+    entries = []
+    for i in np.flatnonzero((overall_rate >= min(high_missing_warn, 0.80)) | (gap >= gap_warn)):
+        m = stats.metrics[i]
+        n, miss, rate = int(n_total[i]), int(missing_total[i]), float(overall_rate[i])
+        wv, bv, wr, br, g = worst_v[i], best_v[i], float(worst_rate[i]), float(best_rate[i]), float(gap[i])
+        table = per.iloc[groups[m]][[variant, "users", "missing", "missing_pct"]].reset_index(drop=True) if m in groups else per.iloc[:0][[variant, "users", "missing", "missing_pct"]]
+        highlight_lines.append(
+            f"- **{m}**: overall {miss}/{n} ({_fmt_pct(rate)}), "
+            f"worst {wv} {_fmt_pct(wr)}, best {bv} {_fmt_pct(br)}, gap {_fmt_pp(g)}"
+        )
+
+        if rate >= 0.999999:
+            entries.append((m, {
                 "severity": "ERROR",
                 "code": "METRIC_ALL_MISSING",
                 "message": (
-                    f"Metric '{m}' is entirely missing: {missing_total}/{n_total} ({_fmt_pct(overall_rate)}). "
+                    f"Metric '{m}' is entirely missing: {miss}/{n} ({_fmt_pct(rate)}). "
                     "It is not usable for analysis."
                 ),
-                "count": missing_total,
-                "meta": {"metric": m, "missing": missing_total, "missing_rate": overall_rate},
-                "examples_df": df.loc[s.isna(), [user, variant, m]].copy(),
-            }, max_rows=max_rows)
+                "count": miss,
+                "meta": {"metric": m, "missing": miss, "missing_rate": rate},
+                "examples_df": stats.examples("missing", m),
+            }, {"metric": m, "missing": miss, "missing_rate": rate}))
 
-        elif overall_rate >= high_missing_warn:
-            _write_report(report_items, {
+        elif rate >= high_missing_warn:
+            entries.append((m, {
                 "severity": "WARN",
                 "code": "METRIC_HIGH_MISSING",
                 "message": (
-                    f"Metric '{m}' has high missingness: {missing_total}/{n_total} ({_fmt_pct(overall_rate)})."
+                    f"Metric '{m}' has high missingness: {miss}/{n} ({_fmt_pct(rate)})."
                 ),
-                "count": missing_total,
-                "meta": {"metric": m, "missing": missing_total, "missing_rate": overall_rate},
-                "examples_df": per[[variant, "users", "missing", "missing_pct"]].copy(),
-            }, max_rows=max_rows)
+                "count": miss,
+                "meta": {"metric": m, "missing": miss, "missing_rate": rate},
+                "examples_df": table,
+            }, {"metric": m, "missing": miss, "missing_rate": rate}))
 
-        if gap >= gap_warn:
-            _write_report(report_items, {
+        if g >= gap_warn:
+            entries.append((m, {
                 "severity": "WARN",
                 "code": "METRIC_MISSING_IMBALANCE",
                 "message": (
                     f"Metric '{m}' missingness differs across variants. "
-                    f"Worst {worst_v} {_fmt_pct(worst_rate)}, best {best_v} {_fmt_pct(best_rate)}; gap {_fmt_pp(gap)}."
+                    f"Worst {wv} {_fmt_pct(wr)}, best {bv} {_fmt_pct(br)}; gap {_fmt_pp(g)}."
                 ),
-                "count": int(len(per)),
+                "count": int(len(table)),
                 "meta": {
                     "metric": m,
-                    "worst_variant": worst_v,
-                    "worst_rate": worst_rate,
-                    "best_variant": best_v,
-                    "best_rate": best_rate,
-                    "gap_pp": gap,
+                    "worst_variant": wv,
+                    "worst_rate": wr,
+                    "best_variant": bv,
+                    "best_rate": br,
+                    "gap_pp": g,
                 },
-                "examples_df": per[[variant, "users", "missing", "missing_pct"]].copy(),
-            }, max_rows=max_rows)
+                "examples_df": table,
+            }, {"metric": m, "worst_variant": wv, "worst_rate": wr, "best_variant": bv, "best_rate": br, "gap_pp": g}))
+    _write_metric_findings(report_items, entries, max_rows=max_rows)
 
-    summary = pd.DataFrame(rows).sort_values(["overall_missing_rate", "gap_rate"], ascending=False)
+    summary = pd.DataFrame(rows, columns=["metric", "overall_missing", "worst_variant", "best_variant", "gap_pp", "overall_missing_rate", "gap_rate"])
+    summary = summary.sort_values(["overall_missing_rate", "gap_rate"], ascending=False)
 
     if highlight_lines:
         _write_report(report_items, {
@@ -635,96 +819,101 @@ def _missingness(df: pd.DataFrame, user: str, variant: str, metrics: list[str],
         "examples_df": summary.drop(columns=["overall_missing_rate", "gap_rate"]),
     }, max_rows=max_rows)
 #---------------------
-def _metrics_check(df: pd.DataFrame, user: str, variant: str, metrics: list[str], preview: bool, report_items: list[dict], max_rows: int = 30) -> None:
-    rows = []
-    for m in metrics:
-        s0 = df[m]
-        #Try numeric view
-        s_num = pd.to_numeric(s0, errors="coerce")
-        n_total = int(len(df))
-        n_missing = int(s0.isna().sum())
-        n_nonmissing = int(n_total - n_missing)
-
-        #How many non-missing become NaN after numeric coercion
-        bad_cast = int(((~s0.isna()) & (s_num.isna())).sum())
-        bad_cast_rate = (bad_cast / n_nonmissing) if n_nonmissing > 0 else 0.0
-
-        #Non-finite (inf / -inf)
-        nonfinite = int(pd.Series(s_num).isin([float("inf"), float("-inf")]).sum())
-
-        #Constant metric
-        is_constant = False
-        if s_num.notna().sum() >= 2:
-            is_constant = (int(s_num.dropna().nunique()) <= 1)
-
-        #Binary-ish check
-        uniq = s_num.dropna().unique()
-        looks_binary = (len(uniq) > 0 and len(uniq) <= 3 and set([float(x) for x in uniq if pd.notna(x)]).issubset({0.0, 1.0}))
-        bad_binary = 0
-        if looks_binary:
-            bad_binary = int((s_num.notna() & ~s_num.isin([0, 1])).sum())
-
-        rows.append({
-            "metric": m,
-            "dtype": str(s0.dtype),
-            "missing": n_missing,
-            "bad_numeric_cast": bad_cast,
-            "bad_cast_rate": round(bad_cast_rate, 4),
-            "nonfinite": nonfinite,
-            "constant": int(is_constant),
-        })
+def _metrics_check(stats: MetricStats, preview: bool, report_items: list[dict], max_rows: int = 30) -> None:
+    #Every per-metric quantity is a column of stats.overall: flags are whole-array comparisons, and only flagged
+    #metrics are visited to write findings
+    o = stats.overall
+    dtype = o["dtype"].astype(str).to_numpy(dtype=object)
+    n_total = o["n_rows"].to_numpy(dtype="int64")
+    n_missing = o["missing"].to_numpy(dtype="int64")
+    n_nonmissing = n_total - n_missing
+    n_numeric = o["count"].to_numpy(dtype="int64")
+
+    #How many non-missing become NaN after numeric coercion
+    bad_cast = o["bad_cast"].to_numpy(dtype="int64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bad_cast_rate = np.where(n_nonmissing > 0, bad_cast / np.maximum(n_nonmissing, 1), 0.0)
+
+    #Non-finite (inf / -inf)
+    nonfinite = o["nonfinite"].to_numpy(dtype="int64")
+
+    #Constant metric (a single distinct value: min == max)
+    is_constant = (n_numeric >= 2) & (o["min"].to_numpy(dtype="float64") == o["max"].to_numpy(dtype="float64"))
+
+    #Binary-ish check: every numeric value is 0 or 1
+    n_01 = o["n_01"].to_numpy(dtype="int64")
+    looks_binary = (n_numeric > 0) & (n_01 == n_numeric)
+    bad_binary = np.where(looks_binary, n_numeric - n_01, 0)
+
+    non_numeric = np.isin(dtype, ["object", "string"])
+    many_bad = (bad_cast_rate >= 0.20) & (n_nonmissing > 0)
+    constant = is_constant & (n_numeric > 0)
+    binary_bad = looks_binary & (bad_binary > 0)
+
+    entries = []
+    for i in np.flatnonzero(non_numeric | many_bad | (nonfinite > 0) | constant | binary_bad):
+        m = stats.metrics[i]
 
         #WARN: metric is object/string
-        if str(s0.dtype) in {"object", "string"}:
-            _write_report(report_items, {
+        if non_numeric[i]:
+            entries.append((m, {
                 "severity": "WARN",
                 "code": "METRIC_NON_NUMERIC_DTYPE",
-                "message": f"Metric '{m}' is dtype={s0.dtype}. For analysis, metrics should usually be numeric (or datetime for time metrics).",
-                "count": n_total,
-                "examples_df": df[[user, variant, m]].head(30).copy() if preview else None,
-            }, max_rows=max_rows)
+                "message": f"Metric '{m}' is dtype={dtype[i]}. For analysis, metrics should usually be numeric (or datetime for time metrics).",
+                "count": int(n_total[i]),
+                "examples_df": stats.examples("head", m) if preview else None,
+            }, {"metric": m, "dtype": dtype[i]}))
 
         #WARN: too many values fail numeric casting
-        if bad_cast_rate >= 0.20 and n_nonmissing > 0:
-            _write_report(report_items, {
+        if many_bad[i]:
+            entries.append((m, {
                 "severity": "WARN",
                 "code": "METRIC_BAD_NUMERIC_CAST",
-                "message": f"Metric '{m}' has many non-numeric values (failed cast rate={bad_cast_rate:.1%}). This often means the conversion produced strings like '$12' or 'N/A'.",
-                "count": bad_cast,
-                "examples_df": df.loc[(~s0.isna()) & (s_num.isna()), [user, variant, m]].copy(),
-            }, max_rows=max_rows)
+                "message": f"Metric '{m}' has many non-numeric values (failed cast rate={bad_cast_rate[i]:.1%}). This often means the conversion produced strings like '$12' or 'N/A'.",
+                "count": int(bad_cast[i]),
+                "examples_df": stats.examples("bad_cast", m),
+            }, {"metric": m, "bad_numeric_cast": int(bad_cast[i]), "bad_cast_rate": round(float(bad_cast_rate[i]), 4)}))
 
         #ERROR: non-finite numbers
-        if nonfinite > 0:
-            _write_report(report_items, {
+        if nonfinite[i] > 0:
+            entries.append((m, {
                 "severity": "ERROR",
                 "code": "METRIC_NONFINITE",
                 "message": f"Metric '{m}' contains inf/-inf values. That breaks most analysis.",
-                "count": nonfinite,
-                "examples_df": df.loc[pd.Series(s_num).isin([float("inf"), float("-inf")]).values, [user, variant, m]].copy(),
-            }, max_rows=max_rows)
+                "count": int(nonfinite[i]),
+                "examples_df": stats.examples("nonfinite", m),
+            }, {"metric": m, "nonfinite": int(nonfinite[i])}))
 
         #WARN: constant metric
-        if is_constant and s_num.notna().sum() > 0:
-            _write_report(report_items, {
+        if constant[i]:
+            entries.append((m, {
                 "severity": "WARN",
                 "code": "METRIC_CONSTANT",
                 "message": f"Metric '{m}' is constant (no variation). It will not show treatment effects.",
-                "count": int(s_num.notna().sum()),
-                "examples_df": df[[user, variant, m]].head(30).copy() if preview else None,
-            }, max_rows=max_rows)
+                "count": int(n_numeric[i]),
+                "examples_df": stats.examples("head", m) if preview else None,
+            }, {"metric": m, "value": o["min"].iloc[i], "count": int(n_numeric[i])}))
 
         #ERROR: binary-ish metric contains values other than 0/1
-        if looks_binary and bad_binary > 0:
-            _write_report(report_items, {
+        if binary_bad[i]:
+            entries.append((m, {
                 "severity": "ERROR",
                 "code": "METRIC_BAD_BINARY_VALUES",
                 "message": f"Metric '{m}' looks binary but contains values other than 0/1.",
-                "count": bad_binary,
-                "examples_df": df.loc[s_num.notna() & ~s_num.isin([0, 1]), [user, variant, m]].copy(),
-            }, max_rows=max_rows)
-
-    summary = pd.DataFrame(rows).sort_values(["bad_cast_rate", "missing"], ascending=False)
+                "count": int(bad_binary[i]),
+                "examples_df": stats.examples("bad_binary", m),
+            }, {"metric": m, "bad_binary": int(bad_binary[i])}))
+    _write_metric_findings(report_items, entries, max_rows=max_rows)
+
+    summary = pd.DataFrame({
+        "metric": stats.metrics,
+        "dtype": dtype,
+        "missing": n_missing,
+        "bad_numeric_cast": bad_cast,
+        "bad_cast_rate": np.round(bad_cast_rate, 4),
+        "nonfinite": nonfinite,
+        "constant": is_constant.astype("int64"),
+    }).sort_values(["bad_cast_rate", "missing"], ascending=False)
     _write_report(report_items, {
         "severity": "INFO",
         "code": "METRICS_SUMMARY",
@@ -733,114 +922,116 @@ def _metrics_check(df: pd.DataFrame, user: str, variant: str, metrics: list[str]
         "examples_df": summary,
     }, max_rows=max_rows)
 #---------------------
-def _consistency(df: pd.DataFrame, user: str, variant: str, report_items: list[dict], max_rows: int = 30) -> None:
+#Placeholder-like variant values that usually mean assignment failed upstream
+_BAD_VARIANT_VALUES = {"none", "null", "nan", "n/a", "na", "undefined", "?"}
+
+
+def _consistency_summary(df: pd.DataFrame, user: str, variant: str, views: _StringViews | None = None) -> dict:
+    views = _StringViews(df) if views is None else views
+    v, u = views[variant], views[user]
+
+    #Flags per distinct value (missing values are never flagged except as a bad user id)
+    checks = {
+        "variant_needs_cleaning": (v, _flags(v.raw != v.clean), False),
+        "variant_suspicious": (v, _flags(v.clean.isin(list(_BAD_VARIANT_VALUES))), False),
+        "user_bad": (u, _flags(u.stripped == ""), True),
+        "user_needs_cleaning": (u, _flags(u.raw != u.stripped), False),
+    }
+    out = {}
+    for key, (view, flags, with_missing) in checks.items():
+        out[key] = view.count(flags) + (view.n_missing if with_missing else 0)
+        #Row masks only for checks with findings
+        mask = (view.blank() if with_missing else view.rows(flags)) if out[key] else np.zeros(0, dtype=bool)
+        out[key + "_examples"] = _first_rows(df, mask, [user, variant])
+    return out
+
+
+def _consistency_report(s: dict, user: str, variant: str, report_items: list[dict], max_rows: int = 30) -> None:
     #Variant cleanup check
-    v0 = df[variant].astype("string")
-    v_clean = v0.str.strip().str.lower()
-
-    changed = (v0.notna() & (v0 != v_clean))
-    if changed.any():
+    if s["variant_needs_cleaning"] > 0:
         _write_report(report_items, {
             "severity": "WARN",
             "code": "VARIANT_NEEDS_CLEANING",
             "message": f"Variant column '{variant}' has whitespace/case inconsistencies. It should be normalized (strip + lower).",
-            "count": int(changed.sum()),
-            "examples_df": df.loc[changed, [user, variant]].copy(),
+            "count": s["variant_needs_cleaning"],
+            "examples_df": s["variant_needs_cleaning_examples"],
         }, max_rows=max_rows)
 
     #Suspicious variant values
-    bad_vals = {"none", "null", "nan", "n/a", "na", "undefined", "?"}
-    bad_var = v_clean.isin(list(bad_vals))
-    if bad_var.any():
+    if s["variant_suspicious"] > 0:
         _write_report(report_items, {
             "severity": "WARN",
             "code": "VARIANT_SUSPICIOUS_VALUES",
             "message": f"Variant column '{variant}' contains placeholder-like values (none/null/nan/etc). Usually means assignment failed upstream.",
-            "count": int(bad_var.sum()),
-            "examples_df": df.loc[bad_var, [user, variant]].copy(),
+            "count": s["variant_suspicious"],
+            "examples_df": s["variant_suspicious_examples"],
         }, max_rows=max_rows)
 
     #User id cleanup check
-    u0 = df[user].astype("string")
-    u_clean = u0.str.strip()
-
-    bad_user = u0.isna() | (u_clean == "")
-    if bad_user.any():
+    if s["user_bad"] > 0:
         _write_report(report_items, {
             "severity": "ERROR",
             "code": "USER_BAD_VALUES",
             "message": f"User column '{user}' contains missing/empty values. Canonical data must have user_id for every row.",
-            "count": int(bad_user.sum()),
-            "examples_df": df.loc[bad_user, [user, variant]].copy(),
+            "count": s["user_bad"],
+            "examples_df": s["user_bad_examples"],
         }, max_rows=max_rows)
 
-    changed_user = (u0.notna() & (u0 != u_clean))
-    if changed_user.any():
+    if s["user_needs_cleaning"] > 0:
         _write_report(report_items, {
             "severity": "WARN",
             "code": "USER_NEEDS_CLEANING",
             "message": f"User column '{user}' has whitespace issues. Consider strip() in convert, otherwise joins/groupbys can break.",
-            "count": int(changed_user.sum()),
-            "examples_df": df.loc[changed_user, [user, variant]].copy(),
+            "count": s["user_needs_cleaning"],
+            "examples_df": s["user_needs_cleaning_examples"],
         }, max_rows=max_rows)
-#---------------------
-def _distribution(df: pd.DataFrame, user: str, variant: str, metrics: list[str], report_items: list[dict], max_rows: int = 30, outlier_warn_rate: float = 0.01) -> None:
-    #Per-variant summary for each metric (numeric only)
-    summaries = []
-    for m in metrics:
-        s_num = pd.to_numeric(df[m], errors="coerce")
-
-        #Skip if fully non-numeric
-        if s_num.notna().sum() == 0:
-            continue
 
-        #Variant-level stats
-        g = df[[variant]].copy()
-        g["_x"] = s_num
-
-        stats = g.groupby(variant, dropna=False)["_x"].agg(["count", "mean", "std", "min"]).reset_index()
-        #Percentiles separately
-        p50 = g.groupby(variant, dropna=False)["_x"].quantile(0.50).reset_index(name="p50")
-        p90 = g.groupby(variant, dropna=False)["_x"].quantile(0.90).reset_index(name="p90")
-        mx = g.groupby(variant, dropna=False)["_x"].max().reset_index(name="max")
-
-        stats = stats.merge(p50, on=variant, how="left").merge(p90, on=variant, how="left").merge(mx, on=variant, how="left")
-        stats.insert(0, "metric", m)
-        summaries.append(stats)
-
-        #Outliers (global IQR)
-        x = s_num.dropna()
-        if len(x) >= 20:
-            q1 = float(x.quantile(0.25))
-            q3 = float(x.quantile(0.75))
-            iqr = q3 - q1
-            if iqr > 0:
-                lo = q1 - 1.5 * iqr
-                hi = q3 + 1.5 * iqr
-                out_mask = s_num.notna() & ((s_num < lo) | (s_num > hi))
-                n_out = int(out_mask.sum())
-                rate = n_out / int(s_num.notna().sum()) if int(s_num.notna().sum()) > 0 else 0.0
-
-                if rate >= outlier_warn_rate and n_out > 0:
-                    ex = df.loc[out_mask, [user, variant, m]].copy()
-                    ex["_abs"] = pd.to_numeric(ex[m], errors="coerce").abs()
-                    ex = ex.sort_values("_abs", ascending=False).drop(columns=["_abs"])
-
-                    _write_report(report_items, {
-                        "severity": "WARN",
-                        "code": "METRIC_OUTLIERS",
-                        "message": f"Metric '{m}' has potential outliers (IQR rule). Outlier rate={rate:.1%}. Consider winsorizing/log transform or check value parsing.",
-                        "count": n_out,
-                        "examples_df": ex,
-                    }, max_rows=max_rows)
-
-    if summaries:
-        out = pd.concat(summaries, ignore_index=True)
+
+def _consistency(df: pd.DataFrame, user: str, variant: str, report_items: list[dict], max_rows: int = 30, views: _StringViews | None = None) -> None:
+    _consistency_report(_consistency_summary(df, user, variant, views), user, variant, report_items, max_rows=max_rows)
+#---------------------
+def _distribution(stats: MetricStats, report_items: list[dict], max_rows: int = 30, outlier_warn_rate: float = 0.01) -> None:
+    variant = stats.variant
+    o = stats.overall
+    n_numeric = o["count"].to_numpy(dtype="int64")
+
+    #Per-variant summary of every metric with numeric values, straight from the fused (metric, variant) table
+    per, _ = _variant_rows(stats)
+    keep = set(np.asarray(stats.metrics, dtype=object)[n_numeric > 0])
+    out = per.loc[per["metric"].isin(keep), ["metric", variant, "count", "mean", "std", "min", "p50", "p90", "max"]].reset_index(drop=True)
+
+    #Outliers (global IQR); the counts are the only per-metric work left
+    q1 = o["q1"].to_numpy(dtype="float64")
+    q3 = o["q3"].to_numpy(dtype="float64")
+    iqr = q3 - q1
+    lo = q1 - 1.5 * iqr
+    hi = q3 + 1.5 * iqr
+    entries = []
+    with np.errstate(invalid="ignore"):
+        candidates = np.flatnonzero((n_numeric >= 20) & (iqr > 0))
+    for i in candidates:
+        m = stats.metrics[i]
+        n_out, approx = stats.outlier_count(m, lo[i], hi[i])
+        rate = n_out / n_numeric[i]
+
+        if rate >= outlier_warn_rate and n_out > 0:
+            entries.append((m, {
+                "severity": "WARN",
+                "code": "METRIC_OUTLIERS",
+                "message": f"Metric '{m}' has potential outliers (IQR rule). Outlier rate={rate:.1%}. Consider winsorizing/log transform or check value parsing.",
+                "count": n_out,
+                "meta": {"metric": m, "approximate": True} if approx else None,
+                "examples_df": stats.outlier_examples(m, lo[i], hi[i]),
+            }, {"metric": m, "outliers": n_out, "outlier_rate": float(rate), "lo": float(lo[i]), "hi": float(hi[i])}))
+    _write_metric_findings(report_items, entries, max_rows=max_rows)
+
+    if len(out):
         _write_report(report_items, {
             "severity": "INFO",
             "code": "DISTRIBUTION_SUMMARY",
             "message": "Per-variant numeric summary (count/mean/std/min/p50/p90/max). Helps you spot obviously broken scales.",
             "count": int(len(out)),
+            "meta": {"approximate_quantiles": True} if stats.approximate else None,
             "examples_df": out,
         }, max_rows=max_rows)
     else:
@@ -853,37 +1044,37 @@ def _distribution(df: pd.DataFrame, user: str, variant: str, metrics: list[str],
         }, max_rows=max_rows)
 
 #---------------------
-def _metric_arm_n_check(df: pd.DataFrame, user: str, variant: str, metrics: list[str], min_n_metric: int, report_items: list[dict], max_rows: int = 30) -> None:
+def _metric_arm_n_check(stats: MetricStats, min_n_metric: int, report_items: list[dict], max_rows: int = 30) -> None:
     if min_n_metric is None or min_n_metric <= 0:
         return
 
-    rows = []
-    for m in metrics:
-        tmp = df[[variant, m]].copy()
-        tmp["_ok"] = tmp[m].notna().astype(int)
-        per = tmp.groupby(variant, dropna=False)["_ok"].sum().reset_index()
-        per.columns = [variant, "n_nonmissing"]
-        per.insert(0, "metric", m)
-
-        if len(per) == 0:
-            continue
-
-        worst_idx = int(per["n_nonmissing"].idxmin())
-        worst_v = per.loc[worst_idx, variant]
-        worst_n = int(per.loc[worst_idx, "n_nonmissing"])
-
-        if worst_n < min_n_metric:
-            note = f"{m}: {worst_v} has {worst_n} non-missing users"
-            rows.append({"metric": m, "worst_variant": worst_v, "worst_n_nonmissing": worst_n, "min_n_metric": int(min_n_metric)})
+    variant = stats.variant
+    per, groups = _variant_rows(stats)
+    per = pd.DataFrame({"metric": per["metric"], variant: per[variant], "n_nonmissing": per["users"] - per["missing"]})
+    #Smallest arm of every metric in one grouped reduction
+    worst_idx = per.groupby("metric", sort=False)["n_nonmissing"].idxmin().reindex(stats.metrics)
+    worst_n = per["n_nonmissing"].to_numpy()[worst_idx.fillna(0).to_numpy(dtype="int64")] if len(per) else np.zeros(len(stats.metrics), dtype="int64")
+    flagged = worst_idx.notna().to_numpy() & (worst_n < min_n_metric)
 
-            _write_report(report_items, {
-                "severity": "WARN",
-                "code": "METRIC_TINY_ARM",
-                "message": f"Metric '{m}' has too few non-missing users in some variants (min_n_metric={min_n_metric}). This can make results unstable or impossible to compute.",
-                "count": int(len(per)),
-                "meta": {"metric": m, "min_n_metric": int(min_n_metric), "note": note},
-                "examples_df": per,
-            }, max_rows=max_rows)
+    rows = []
+    entries = []
+    for i in np.flatnonzero(flagged):
+        m = stats.metrics[i]
+        worst_v = per[variant].iloc[int(worst_idx.iloc[i])]
+        n = int(worst_n[i])
+        table = per.iloc[groups[m]].reset_index(drop=True)
+        note = f"{m}: {worst_v} has {n} non-missing users"
+        row = {"metric": m, "worst_variant": worst_v, "worst_n_nonmissing": n, "min_n_metric": int(min_n_metric)}
+        rows.append(row)
+        entries.append((m, {
+            "severity": "WARN",
+            "code": "METRIC_TINY_ARM",
+            "message": f"Metric '{m}' has too few non-missing users in some variants (min_n_metric={min_n_metric}). This can make results unstable or impossible to compute.",
+            "count": int(len(table)),
+            "meta": {"metric": m, "min_n_metric": int(min_n_metric), "note": note},
+            "examples_df": table,
+        }, row))
+    _write_metric_findings(report_items, entries, max_rows=max_rows)
 
     if rows:
         out = pd.DataFrame(rows).sort_values(["worst_n_nonmissing"])
@@ -897,50 +1088,60 @@ def _metric_arm_n_check(df: pd.DataFrame, user: str, variant: str, metrics: list
         }, max_rows=max_rows)
 
 #---------------------
-def _allocation_check(df: pd.DataFrame, user: str, variant: str, allocation: str, alpha: float, report_items: list[dict], max_rows: int = 30) -> None:
-    if allocation is None:
-        return
+def _allocation_counts(df: pd.DataFrame, variant: str, views: _StringViews | None = None) -> pd.Series:
+    #Users per normalized (strip + lower) variant, blanks dropped
+    v = (_StringViews(df) if views is None else views)[variant]
+    return v.value_counts(v.clean, variant, keep=~_flags(v.clean == ""), dropna=True)
 
-    v = df[variant].astype("string").str.strip().str.lower()
-    v = v.mask(v.isna() | (v == ""), pd.NA).dropna()
-    if v.empty:
-        return
-
-    counts = v.value_counts(dropna=False).reset_index()
-    counts.columns = [variant, "n_users"]
 
-    #Parse expected allocation
+def _expected_allocation(allocation: str, variants: list[str]) -> dict:
+    #Expected share per normalized variant name: 'equal' over the observed variants, or 'A=0.5,B=0.3' (normalized to sum 1)
     alloc = allocation.strip().lower()
-    variants = [str(x) for x in counts[variant].tolist()]
-
     exp = {}
     if alloc == "equal":
         real_vars = [x for x in variants if x is not None and str(x).strip() != "" and str(x).lower() != "nan"]
         if not real_vars:
-            return
+            return {}
         p = 1.0 / len(real_vars)
         for k in real_vars:
             exp[k] = p
-    else:
-        #Format: A=0.5,B=0.3,C=0.2
-        parts = [p.strip() for p in alloc.split(",") if p.strip()]
-        for p0 in parts:
-            if "=" not in p0:
-                raise SystemExit(f"Bad --allocation '{allocation}'. Use 'equal' or 'A=0.5,B=0.3'.")
-            k, val = p0.split("=", 1)
-            k = k.strip().lower()
-            try:
-                val = float(val.strip())
-            except Exception:
-                raise SystemExit(f"Bad --allocation value in '{p0}'. Use floats like 0.5.")
-            exp[k] = val
+        return exp
+
+    #Format: A=0.5,B=0.3,C=0.2
+    parts = [p.strip() for p in alloc.split(",") if p.strip()]
+    for p0 in parts:
+        if "=" not in p0:
+            raise SystemExit(f"Bad --allocation '{allocation}'. Use 'equal' or 'A=0.5,B=0.3'.")
+        k, val = p0.split("=", 1)
+        k = k.strip().lower()
+        try:
+            val = float(val.strip())
+        except Exception:
+            raise SystemExit(f"Bad --allocation value in '{p0}'. Use floats like 0.5.")
+        exp[k] = val
+
+    s = sum(exp.values())
+    if s <= 0:
+        raise SystemExit(f"Bad --allocation '{allocation}'. Sum of weights must be > 0.")
+    #Normalize if user gave weights that don't sum to 1
+    if abs(s - 1.0) > 1e-6:
+        exp = {k: v / s for k, v in exp.items()}
+    return exp
+
+
+def _allocation_report(counts: pd.Series, variant: str, allocation: str, alpha: float, report_items: list[dict], max_rows: int = 30) -> None:
+    if allocation is None:
+        return
+    if counts.empty:
+        return
+
+    counts = counts.rename_axis(variant).reset_index()
+    counts.columns = [variant, "n_users"]
 
-        s = sum(exp.values())
-        if s <= 0:
-            raise SystemExit(f"Bad --allocation '{allocation}'. Sum of weights must be > 0.")
-        #Normalize if user gave weights that don't sum to 1
-        if abs(s - 1.0) > 1e-6:
-            exp = {k: v / s for k, v in exp.items()}
+    #Parse expected allocation
+    exp = _expected_allocation(allocation, [str(x) for x in counts[variant].tolist()])
+    if not exp:
+        return
 
     #Build observed/expected vectors for chi-square
     obs = {}
@@ -967,19 +1168,10 @@ def _allocation_check(df: pd.DataFrame, user: str, variant: str, allocation: str
             continue
         chisq += ((obs[k] - e) ** 2) / e
     dfree = max(1, len(keys) - 1)
-    pval = None
-    try:
-        from scipy.stats import chi2
-        pval = float(chi2.sf(chisq, dfree))
-    except Exception:
-        pval = None
+    pval = float(_chi2_sf(chisq, dfree))
 
     #Always report INFO summary
-    msg = f"Allocation check vs '{allocation}': chi2={chisq:.3f}, df={dfree}"
-    if pval is not None:
-        msg += f", p={pval:.6g}, alpha={alpha}"
-    else:
-        msg += " (p-value unavailable: scipy not installed)"
+    msg = f"Allocation check vs '{allocation}': chi2={chisq:.3f}, df={dfree}, p={pval:.6g}, alpha={alpha}"
 
     _write_report(report_items, {
         "severity": "INFO",
@@ -990,7 +1182,7 @@ def _allocation_check(df: pd.DataFrame, user: str, variant: str, allocation: str
     }, max_rows=max_rows)
 
     #Flag if significant
-    if pval is not None and pval < alpha:
+    if pval < alpha:
         _write_report(report_items, {
             "severity": "ERROR",
             "code": "ALLOCATION_SRM_FAIL",
@@ -999,6 +1191,310 @@ def _allocation_check(df: pd.DataFrame, user: str, variant: str, allocation: str
             "examples_df": counts,
         }, max_rows=max_rows)
 
+
+def _allocation_check(df: pd.DataFrame, user: str, variant: str, allocation: str, alpha: float, report_items: list[dict], max_rows: int = 30, views: _StringViews | None = None, counts: pd.Series | None = None) -> None:
+    if allocation is None:
+        return
+    counts = _allocation_counts(df, variant, views) if counts is None else counts
+    _allocation_report(counts, variant, allocation, alpha, report_items, max_rows=max_rows)
+#---------------------
+#Segment SRM: the allocation test within every level of every segment column, from one long count table
+#(segment, level, variant, n_users) and one vectorized chi-square over the (level x variant) matrix. Mergeable across chunks.
+#Rows (levels, time buckets) where some variant expects fewer users than this are not tested
+_SRM_MIN_EXPECTED = 5
+
+
+def _variant_codes(s: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    #Codes of the normalized (strip + lower) variant per row, -1 for blanks; normalizes distinct values only
+    return _StringView(s).normalized()
+
+
+_GAMMA_EPS = 1e-15
+_GAMMA_MAX_ITER = 10_000
+_GAMMA_TINY = 1e-300
+
+
+def _chi2_sf(x, df) -> np.ndarray:
+    #Chi-square survival function P(X > x) = Q(df/2, x/2), the regularized upper incomplete gamma, vectorized over
+    #x and df (broadcast) so thousands of SRM tests take one call. NaN where x is NaN or df <= 0.
+    #Power series of P for x < a + 1, modified Lentz continued fraction of Q otherwise (both converge fast there);
+    #agrees with scipy.stats.chi2.sf to ~1e-12 relative, without importing SciPy.
+    x, a = np.broadcast_arrays(np.asarray(x, dtype="float64") / 2.0, np.asarray(df, dtype="float64") / 2.0)
+    out = np.full(x.shape, np.nan)
+    ok = (a > 0) & ~np.isnan(x)
+    out[ok & (x <= 0)] = 1.0
+    out[ok & np.isposinf(x)] = 0.0
+    todo = ok & (x > 0) & np.isfinite(x)
+    series = todo & (x < a + 1)
+    frac = todo & ~series
+    lgamma = np.vectorize(math.lgamma, otypes=["float64"])
+
+    if series.any():
+        xs, as_ = x[series], a[series]
+        ap = as_.copy()
+        term = 1.0 / as_
+        total = term.copy()
+        for _ in range(_GAMMA_MAX_ITER):
+            ap += 1.0
+            term *= xs / ap
+            total += term
+            if np.all(term < total * _GAMMA_EPS):
+                break
+        out[series] = 1.0 - total * np.exp(-xs + as_ * np.log(xs) - lgamma(as_))
+
+    if frac.any():
+        xs, as_ = x[frac], a[frac]
+        b = xs + 1.0 - as_
+        c = np.full(xs.shape, 1.0 / _GAMMA_TINY)
+        d = 1.0 / b
+        h = d.copy()
+        for i in range(1, _GAMMA_MAX_ITER):
+            an = -i * (i - as_)
+            b += 2.0
+            d = an * d + b
+            d = np.where(np.abs(d) < _GAMMA_TINY, _GAMMA_TINY, d)
+            c = b + an / c
+            c = np.where(np.abs(c) < _GAMMA_TINY, _GAMMA_TINY, c)
+            d = 1.0 / d
+            delta = d * c
+            h *= delta
+            if np.all(np.abs(delta - 1.0) < _GAMMA_EPS):
+                break
+        out[frac] = np.exp(-xs + as_ * np.log(xs) - lgamma(as_)) * h
+    return np.clip(out, 0.0, 1.0)
+
+
+def _srm_matrix(obs: np.ndarray, share: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    #Chi-square goodness of fit per row of obs (rows x variants) vs the expected shares, all rows at once.
+    #Returns (chi2, testable, p-values); rows with an expected count < 5 are not testable (NaN chi2 and p).
+    n = obs.sum(axis=1)
+    expected = n[:, None] * share[None, :]
+    testable = (expected.min(axis=1) >= _SRM_MIN_EXPECTED) if obs.shape[1] > 1 else np.zeros(len(obs), dtype=bool)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        chisq = np.where(testable, ((obs - expected) ** 2 / expected).sum(axis=1), np.nan)
+    pval = _chi2_sf(chisq, max(obs.shape[1] - 1, 1))
+    return chisq, testable, pval
+
+
+def _segment_counts(df: pd.DataFrame, variant: str, segments: list[str], views: _StringViews | None = None) -> pd.DataFrame:
+    #Users per (segment column, level, normalized variant); blank variants dropped, missing levels kept.
+    #Each segment is one factorize + bincount.
+    v, labels = (_StringViews(df) if views is None else views)[variant].normalized()
+    keep = v >= 0
+    v = v[keep]
+    k = len(labels)
+    parts = []
+    for seg in segments:
+        codes, levels = pd.factorize(df[seg], use_na_sentinel=False)
+        counts = np.bincount(codes[keep] * k + v, minlength=len(levels) * k).reshape(len(levels), k)
+        li, vi = np.nonzero(counts)
+        parts.append(pd.DataFrame({
+            "segment": seg,
+            "level": pd.Series(levels, dtype=object).astype("string").to_numpy()[li],
+            variant: labels[vi],
+            "n_users": counts[li, vi].astype("int64"),
+        }))
+    if not parts:
+        return pd.DataFrame(columns=["segment", "level", variant, "n_users"])
+    return pd.concat(parts, ignore_index=True)
+
+
+def _merge_segment_counts(parts: list[pd.DataFrame], variant: str) -> pd.DataFrame:
+    out = pd.concat(parts, ignore_index=True)
+    return out.groupby(["segment", "level", variant], dropna=False, sort=False)["n_users"].sum().reset_index()
+
+
+def _holm(p: np.ndarray) -> np.ndarray:
+    #Holm-Bonferroni adjusted p-values (step-down, monotone)
+    m = len(p)
+    order = np.argsort(p, kind="stable")
+    adj = np.maximum.accumulate(p[order] * (m - np.arange(m)))
+    out = np.empty(m)
+    out[order] = np.minimum(adj, 1.0)
+    return out
+
+
+def _segment_srm_report(counts: pd.DataFrame, variant: str, allocation: str, alpha: float, report_items: list[dict], max_rows: int = 30) -> None:
+    if allocation is None or counts.empty:
+        return
+    overall = counts.groupby(variant, sort=False)["n_users"].sum()
+    exp = _expected_allocation(allocation, [str(x) for x in overall.index])
+    keys = [k for k in exp if k in overall.index]
+    if not keys:
+        return
+
+    #(segment, level) x variant matrix over the expected variants; shares renormalized over them
+    sub = counts[counts[variant].isin(keys)]
+    wide = sub.groupby(["segment", "level", variant], dropna=False, sort=False)["n_users"].sum().unstack(variant, fill_value=0)
+    wide = wide.reindex(columns=keys, fill_value=0)
+    obs = wide.to_numpy(dtype="float64")
+    share = np.array([exp[k] for k in keys])
+    chisq, testable, pval = _srm_matrix(obs, share / share.sum())
+
+    dfree = len(keys) - 1
+    table = wide.reset_index()
+    table.columns = ["segment", "level"] + keys
+    table.insert(2, "n_users", obs.sum(axis=1).astype("int64"))
+    table["chi2"] = chisq
+    table = table[testable].reset_index(drop=True)
+    pval = pval[testable]
+    n_segments = int(counts["segment"].nunique())
+    n_small = int((~testable).sum())
+
+    msg = f"Segment SRM screen vs '{allocation}': {n_segments} segment column(s), {len(table)} level(s) tested"
+    if n_small:
+        msg += f", {n_small} too small (expected count < {_SRM_MIN_EXPECTED} in some variant)"
+    table["p_value"] = pval
+    table["p_holm"] = _holm(pval) if len(table) else pval
+    table = table.sort_values(["p_value", "segment"], kind="stable").reset_index(drop=True)
+    flagged = table[table["p_holm"] < alpha]
+    _write_report(report_items, {
+        "severity": "INFO",
+        "code": "SEGMENT_SRM_SUMMARY",
+        "message": msg + f"; {len(flagged)} deviate at alpha={alpha} after Holm correction. Smallest p-values first.",
+        "count": int(len(table)),
+        "meta": {"segments": sorted(counts["segment"].unique().tolist()), "levels_tested": int(len(table)), "levels_too_small": n_small, "df": dfree},
+        "examples_df": table,
+    }, max_rows=max_rows)
+
+    if not flagged.empty:
+        worst = flagged.iloc[0]
+        _write_report(report_items, {
+            "severity": "WARN",
+            "code": "SEGMENT_SRM",
+            "message": (
+                f"Variant split deviates from '{allocation}' within {len(flagged)} segment level(s) (Holm-adjusted p < alpha={alpha}). "
+                f"Worst: {worst['segment']}={worst['level']} (p={worst['p_value']:.3g}). Localized SRM usually means an assignment or logging bug on that slice."
+            ),
+            "count": int(len(flagged)),
+            "meta": {"segments": sorted(flagged["segment"].unique().tolist())},
+            "examples_df": flagged,
+        }, max_rows=max_rows)
+
+
+def _segment_srm_check(df: pd.DataFrame, variant: str, segments: list[str], allocation: str, alpha: float, report_items: list[dict], max_rows: int = 30, views: _StringViews | None = None) -> None:
+    if allocation is None or not segments:
+        return
+    _segment_srm_report(_segment_counts(df, variant, segments, views), variant, allocation, alpha, report_items, max_rows=max_rows)
+#---------------------
+#Time-sliced SRM: the allocation test per exposure day/hour and on the cumulative counts up to each bucket, from one
+#(bucket, variant, n_users) count table (UTC buckets). Mergeable across chunks.
+_TIME_BUCKETS = {"day": "D", "hour": "h"}
+
+
+def _time_counts(df: pd.DataFrame, variant: str, time_col: str, bucket: str, views: _StringViews | None = None) -> pd.DataFrame:
+    #Users per (bucket start, normalized variant); bucket is NaT for missing/unparseable times, blank variants dropped
+    v, labels = (_StringViews(df) if views is None else views)[variant].normalized()
+    t = df[time_col]
+    if not pd.api.types.is_datetime64_any_dtype(t):
+        t = pd.to_datetime(t, errors="coerce", utc=True)
+    if getattr(t.dt, "tz", None) is not None:
+        t = t.dt.tz_convert("UTC").dt.tz_localize(None)
+    ns = t.to_numpy(dtype="datetime64[ns]")
+    step = int(np.timedelta64(1, _TIME_BUCKETS[bucket]).astype("timedelta64[ns]").astype(np.int64))
+    valid = ~np.isnat(ns)
+    keep = v >= 0
+    k = len(labels)
+
+    b = ns.view("int64") // step
+    uniq, inv = np.unique(b[keep & valid], return_inverse=True)
+    counts = np.bincount(inv * k + v[keep & valid], minlength=len(uniq) * k).reshape(len(uniq), k)
+    bi, vi = np.nonzero(counts)
+    missing = np.bincount(v[keep & ~valid], minlength=k)
+    mi = np.flatnonzero(missing)
+    return pd.DataFrame({
+        "bucket": pd.to_datetime(np.concatenate([uniq[bi] * step, np.full(len(mi), np.iinfo(np.int64).min)]), unit="ns"),
+        variant: np.concatenate([labels[vi], labels[mi]]),
+        "n_users": np.concatenate([counts[bi, vi], missing[mi]]).astype("int64"),
+    })
+
+
+def _merge_time_counts(parts: list[pd.DataFrame], variant: str) -> pd.DataFrame:
+    out = pd.concat(parts, ignore_index=True)
+    return out.groupby(["bucket", variant], dropna=False, sort=False)["n_users"].sum().reset_index()
+
+
+def _time_srm_report(counts: pd.DataFrame, variant: str, time_col: str, bucket: str, allocation: str, alpha: float, report_items: list[dict], max_rows: int = 30) -> None:
+    if allocation is None or counts.empty:
+        return
+    exp = _expected_allocation(allocation, [str(x) for x in counts.groupby(variant, sort=False)["n_users"].sum().index])
+    timed = counts[counts["bucket"].notna()]
+    keys = [k for k in exp if k in set(timed[variant])]
+    if not keys:
+        return
+    n_missing = int(counts.loc[counts["bucket"].isna(), "n_users"].sum())
+
+    #bucket x variant matrix in time order, and its running total
+    wide = timed[timed[variant].isin(keys)].groupby(["bucket", variant])["n_users"].sum().unstack(variant, fill_value=0)
+    wide = wide.reindex(columns=keys, fill_value=0).sort_index()
+    obs = wide.to_numpy(dtype="float64")
+    share = np.array([exp[k] for k in keys])
+    share = share / share.sum()
+    chisq, testable, pval = _srm_matrix(obs, share)
+    cum_chisq, cum_testable, cum_pval = _srm_matrix(np.cumsum(obs, axis=0), share)
+
+    fmt = "%Y-%m-%d" if bucket == "day" else "%Y-%m-%d %H:00"
+    labels = wide.index.strftime(fmt).to_numpy(dtype=object)
+    table = pd.DataFrame({"bucket": labels, "n_users": obs.sum(axis=1).astype("int64")})
+    for i, k in enumerate(keys):
+        table[k] = obs[:, i].astype("int64")
+    table["chi2"] = chisq
+    table["cum_n"] = np.cumsum(obs.sum(axis=1)).astype("int64")
+    table["cum_chi2"] = cum_chisq
+
+    msg = f"Time-sliced SRM vs '{allocation}' by {bucket} over '{time_col}' (UTC): {len(table)} bucket(s), {int(testable.sum())} tested"
+    if n_missing:
+        msg += f", {n_missing} user(s) without a time"
+    meta = {"time_col": time_col, "bucket": bucket, "buckets": int(len(table)), "buckets_tested": int(testable.sum()), "missing_time": n_missing}
+    #Per-bucket p-values are Holm-adjusted across the tested buckets
+    holm = np.full(len(table), np.nan)
+    holm[testable] = _holm(pval[testable])
+    table.insert(len(keys) + 3, "p_value", pval)
+    table.insert(len(keys) + 4, "p_holm", holm)
+    table["cum_p"] = cum_pval
+    flagged = table[testable & (holm < alpha)]
+
+    #Cumulative SRM: the earliest bucket from which the running split stays significant through the end
+    cum_bad = cum_testable & (cum_pval < alpha)
+    since = None
+    if len(cum_bad) and cum_bad[-1]:
+        ok = np.flatnonzero(~cum_bad)
+        since = labels[ok[-1] + 1] if len(ok) else labels[0]
+
+    meta.update({"first_flagged": flagged["bucket"].iloc[0] if len(flagged) else None, "cumulative_since": since})
+    msg += f"; {len(flagged)} deviate at alpha={alpha} after Holm correction"
+    if len(flagged):
+        msg += f", first at {flagged['bucket'].iloc[0]}"
+    if since is not None:
+        msg += f"; the cumulative split deviates since {since}"
+    _write_report(report_items, {
+        "severity": "INFO",
+        "code": "TIME_SRM_SUMMARY",
+        "message": msg + ".",
+        "count": int(len(table)),
+        "meta": meta,
+        "examples_df": table,
+    }, max_rows=max_rows)
+
+    if not flagged.empty:
+        _write_report(report_items, {
+            "severity": "WARN",
+            "code": "TIME_SRM",
+            "message": (
+                f"Variant split deviates from '{allocation}' in {len(flagged)} {bucket} bucket(s) of '{time_col}' (Holm-adjusted p < alpha={alpha}), "
+                f"first at {flagged['bucket'].iloc[0]}. Ramp-up changes, deployments or assignment bugs that start at a point in time look like this."
+            ),
+            "count": int(len(flagged)),
+            "meta": {"time_col": time_col, "bucket": bucket, "first_flagged": flagged["bucket"].iloc[0]},
+            "examples_df": flagged,
+        }, max_rows=max_rows)
+
+
+def _time_srm_check(df: pd.DataFrame, variant: str, time_col: str | None, bucket: str, allocation: str, alpha: float, report_items: list[dict], max_rows: int = 30, views: _StringViews | None = None) -> None:
+    if allocation is None or time_col is None:
+        return
+    _time_srm_report(_time_counts(df, variant, time_col, bucket, views), variant, time_col, bucket, allocation, alpha, report_items, max_rows=max_rows)
+
 #############################################################################################################################
 #############################################################################################################################
 def _run_doctor(args: argparse.Namespace) -> None:
@@ -1011,10 +1507,7 @@ def _run_doctor(args: argparse.Namespace) -> None:
                 setattr(args, key, val)
 
     #Required defaults
-    if args.user is None:
-        args.user = "user_id"
-    if args.variant is None:
-        args.variant = "variant"
+    _doctor_column_defaults(args)
     if args.report is None and not args.preview:
         args.preview = True
 
@@ -1026,11 +1519,153 @@ def _run_doctor(args: argparse.Namespace) -> None:
         raise SystemExit(
             f"Missing required arguments: {missing}. Provide them on CLI or via --config.")
     
-    in_path = Path(args.data)
-    df = _load_df(in_path)
-    df.columns = df.columns.str.strip()
+    #A glob (--data 'outputs/*.parquet'): every matching table, on a process pool (doctor_batch.py)
+    if _is_batch(args.data):
+        from abx.cli.doctor_batch import _run_doctor_batch
+        _run_doctor_batch(args)
+        return
+
+    prof = make_profiler(args, "doctor")
     out_path = Path(args.report) if args.report is not None else None
-    
+    report_items = _doctor_file(args, prof)
+
+    #Saving and visualizing
+    if out_path is not None:
+        with prof.stage("write_report"):
+            _save_report(report_items, out_path)
+        print(f"Report saved in {out_path}")
+    if args.preview:
+        _print_preview(report_items, only=args.only, max_example_rows=10)
+    finish_profile(prof, args)
+
+    exit_code = _doctor_exit_code(report_items, args)
+    if exit_code != 0:
+        raise SystemExit(exit_code)
+
+
+def _is_batch(data: str) -> bool:
+    return any(ch in str(data) for ch in "*?[")
+
+
+#Loads one table (whole, selected columns, chunks or footer only, depending on the options) and runs the checks
+def _doctor_file(args: argparse.Namespace, prof: Profiler) -> list[dict]:
+    in_path = Path(args.data)
+    chunk_rows = getattr(args, "chunk_rows", None)
+    if chunk_rows is not None and chunk_rows <= 0:
+        raise SystemExit("--chunk-rows must be a positive number of rows")
+
+    metadata_only = getattr(args, "metadata_only", False)
+    if metadata_only and chunk_rows:
+        raise SystemExit("--metadata-only and --chunk-rows cannot be combined")
+
+    pf = None
+    if not chunk_rows and in_path.suffix.lower() in (".parquet", ".pq"):
+        from abx.cli.doctor_meta import _doctor_checks_metadata, _load_columns, _parquet_file, _schema_frame
+        pf = _parquet_file(in_path)
+    if metadata_only and pf is None:
+        raise SystemExit("--metadata-only needs a Parquet file and pyarrow (pip install pyarrow)")
+
+    if getattr(args, "by", None) and (chunk_rows or metadata_only or getattr(args, "use_stats", False)):
+        raise SystemExit("--by runs the in-memory doctor per experiment (not with --chunk-rows, --metadata-only or --use-stats)")
+
+    if getattr(args, "cache", None) and (chunk_rows or metadata_only or getattr(args, "use_stats", False)):
+        raise SystemExit("--cache only applies to the in-memory doctor (not with --chunk-rows, --metadata-only or --use-stats)")
+
+    #--use-stats: metric statistics come from the convert sidecar when it matches the file; only user/variant are read
+    sidecar = None
+    if getattr(args, "use_stats", False):
+        if chunk_rows or metadata_only:
+            raise SystemExit("--use-stats cannot be combined with --chunk-rows or --metadata-only")
+        from abx.cli.stats_sidecar import SidecarStats, _load_stats_sidecar, _sidecar_covers, _sidecar_frame
+        sidecar, reason = _load_stats_sidecar(in_path, args.user, args.variant)
+        if sidecar is not None:
+            _doctor_defaults(_sidecar_frame(sidecar), args)
+            _doctor_plan(args)
+            if not _sidecar_covers(sidecar, args.metrics):
+                sidecar, reason = None, "some metrics are not numeric columns covered by the sidecar"
+        print(f"[stats] using {reason}" if sidecar is not None else f"[stats] scanning the table: {reason}")
+
+    if chunk_rows:
+        #Chunked mode: defaults come from the first chunk, checks from one pass over the file
+        from abx.cli.doctor_stream import _doctor_checks_stream, _read_head
+        _doctor_defaults(_read_head(in_path, chunk_rows), args)
+    elif pf is not None:
+        #Parquet: defaults come from the schema and only the checked columns are read (none with --metadata-only)
+        schema = _schema_frame(pf)
+        _doctor_defaults(schema, args)
+        if not metadata_only:
+            extra = _frame_columns(args, _doctor_plan(args))
+            needed = list(dict.fromkeys([args.user, args.variant] + extra + ([] if sidecar is not None else args.metrics)))
+            _require_columns(schema, needed)
+            prof.start("load")
+            df = _load_columns(pf, needed)
+            prof.stop(rows_out=len(df))
+    else:
+        prof.start("load")
+        columns = None
+        if sidecar is not None:
+            columns = [args.user, args.variant] + _frame_columns(args, _doctor_plan(args))
+        df = _load_df(in_path, columns=columns)
+        df.columns = df.columns.str.strip()
+        prof.stop(rows_out=len(df))
+        _doctor_defaults(df, args)
+
+    if args.save_config:
+        _save_config(args, Path(args.save_config))
+        print(f"[config] saved: {args.save_config}")
+
+    if chunk_rows:
+        report_items = _doctor_checks_stream(in_path, args, prof, max_rows=_example_rows(args))
+    elif metadata_only:
+        report_items = _doctor_checks_metadata(pf, args, prof, max_rows=_example_rows(args))
+    elif sidecar is not None:
+        report_items = _doctor_checks(df, args, prof, max_rows=_example_rows(args), stats=SidecarStats(sidecar, args.metrics))
+        _write_report(report_items, {
+            "severity": "INFO",
+            "code": "STATS_SIDECAR",
+            "message": f"Metric checks used {reason} (file hash matched). Metric findings have no example rows.",
+            "count": int(sidecar["data"]["rows"]),
+            "meta": {"sha256": sidecar["data"]["sha256"], "config": sidecar.get("config")},
+            "examples_df": None,
+        })
+    elif getattr(args, "by", None):
+        from abx.cli.doctor_groups import _doctor_checks_by
+        report_items = _doctor_checks_by(df, args, prof, max_rows=_example_rows(args))
+    else:
+        report_items = _doctor_checks(df, args, prof, max_rows=_example_rows(args))
+    return report_items
+
+
+def _doctor_exit_code(report_items: list[dict], args: argparse.Namespace) -> int:
+    n_err = sum(1 for x in report_items if x.get("severity") == "ERROR")
+    n_wrn = sum(1 for x in report_items if x.get("severity") == "WARN")
+
+    exit_code = 0
+    no_exit = getattr(args, "no_exit", False)
+    fail_on = getattr(args, "fail_on", "error")
+    if not no_exit:
+        if fail_on == "warn" and (n_err > 0 or n_wrn > 0):
+            exit_code = 2
+        elif fail_on == "error" and n_err > 0:
+            exit_code = 2
+    return exit_code
+
+
+def _example_rows(args: argparse.Namespace) -> int:
+    #Example rows per finding that the outputs will show: 30 in a report, 10 in the console preview
+    if getattr(args, "report", None) is not None:
+        return 30
+    return 10 if args.preview else 0
+
+
+def _doctor_column_defaults(args: argparse.Namespace) -> None:
+    if args.user is None:
+        args.user = "user_id"
+    if args.variant is None:
+        args.variant = "variant"
+
+
+def _doctor_defaults(df: pd.DataFrame, args: argparse.Namespace) -> None:
     #Secondary defaults
     if args.alpha is None:
         args.alpha = 0.01
@@ -1040,82 +1675,180 @@ def _run_doctor(args: argparse.Namespace) -> None:
         args.fail_on = "error"
     if args.check is None:
         args.check = "integrity,variants,missingness,metrics,consistency,distribution,metric_arm_n,allocation"
+        #Per-segment and time-sliced SRM are opt-in: --check segment_srm/time_srm, or naming the columns
+        if getattr(args, "segments", None):
+            args.check += ",segment_srm"
+        if getattr(args, "time_col", None):
+            args.check += ",time_srm"
+    if getattr(args, "time_bucket", None) is None:
+        args.time_bucket = "day"
+    #Default time column: exposure_time from `ab convert events --exposure`
+    if getattr(args, "time_col", None) is None and "exposure_time" in df.columns:
+        args.time_col = "exposure_time"
 
     #Default metrics: numeric columns only (so segments like country/device don't spam)
     if args.metrics is None:
-        cand = [c for c in df.columns if c not in [args.user, args.variant]]
+        cand = [c for c in df.columns if c not in [args.user, args.variant, getattr(args, "by", None)]]
         args.metrics = [c for c in cand if pd.api.types.is_numeric_dtype(df[c])]
 
-    if args.save_config:
-        _save_config(args, Path(args.save_config))
-        print(f"[config] saved: {args.save_config}")
+    #Default segments when segment_srm is asked for without --segments: text/categorical/bool columns that are not
+    #metrics (country, device, plan, ...)
+    if getattr(args, "segments", None) is None:
+        metrics = args.metrics.split(",") if isinstance(args.metrics, str) else args.metrics
+        skip = {args.user, args.variant, getattr(args, "time_col", None), getattr(args, "by", None), "window_end"} | {m.strip() for m in metrics}
+        args.segments = [
+            c for c in df.columns
+            if c not in skip and (pd.api.types.is_object_dtype(df[c]) or pd.api.types.is_string_dtype(df[c]) or isinstance(df[c].dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(df[c]))
+        ]
+
+
+#Normalizes args.metrics (string -> list, minus --ignore) and returns the checks to run (--check minus --skip)
+def _doctor_plan(args: argparse.Namespace) -> list[str]:
+    if getattr(args, "workers", None) is not None and args.workers < 1:
+        raise SystemExit("--workers must be at least 1")
 
     #Dtype formating
     if isinstance(args.metrics, str):
         args.metrics = [c.strip() for c in args.metrics.split(",") if c.strip()]
 
+    if isinstance(getattr(args, "segments", None), str):
+        args.segments = [c.strip() for c in args.segments.split(",") if c.strip()]
+
     if args.ignore:
         ignore_list = [c.strip() for c in args.ignore.split(",") if c.strip()]
         ignore_set = set(ignore_list)
         args.metrics = [m for m in args.metrics if m not in ignore_set]
-
-    
-    #Check if columns exist
-    required_cols = [args.user, args.variant] + list(args.metrics)
-    _require_columns(df, required_cols)
+        if getattr(args, "segments", None):
+            args.segments = [c for c in args.segments if c not in ignore_set]
 
     #Tests that will be conducted
     what_to_check = [c.strip() for c in args.check.split(",") if c.strip()]
     if args.skip:
         what_to_skip = {c.strip() for c in args.skip.split(",") if c.strip()}
-        what_to_skip = set(what_to_skip)
         what_to_check = [item for item in what_to_check if item not in what_to_skip]
+    return what_to_check
 
-    #Report structure
-    report_items: list[dict] = []
-    #Run Tests
-    if "integrity" in what_to_check:
-        _integrity(df, args.user, args.variant, report_items, max_rows=30)
 
-    if "variants" in what_to_check:
-        _variant_check(df, args.user, args.variant, args.min_n, report_items, max_rows=30)
+def _segment_columns(args: argparse.Namespace, what_to_check: list[str]) -> list[str]:
+    #Segment columns only matter to segment_srm, which needs an expected allocation
+    if "segment_srm" not in what_to_check or args.allocation is None:
+        return []
+    return [c for c in dict.fromkeys(getattr(args, "segments", None) or []) if c not in (args.user, args.variant)]
 
-    if "missingness" in what_to_check:
-        _missingness(df, args.user, args.variant, args.metrics, report_items, max_rows=30)
 
-    if "metrics" in what_to_check:
-        _metrics_check(df, args.user, args.variant, args.metrics, args.preview, report_items, max_rows=30)
+def _time_column(args: argparse.Namespace, what_to_check: list[str]) -> str | None:
+    #The time column only matters to time_srm, which needs an expected allocation
+    if "time_srm" not in what_to_check or args.allocation is None:
+        return None
+    return getattr(args, "time_col", None)
 
-    if "consistency" in what_to_check:
-        _consistency(df, args.user, args.variant, report_items, max_rows=30)
 
-    if "distribution" in what_to_check:
-        _distribution(df, args.user, args.variant, args.metrics, report_items, max_rows=30)
+def _frame_columns(args: argparse.Namespace, what_to_check: list[str]) -> list[str]:
+    #Columns the frame checks read besides user/variant (and the --by experiment column)
+    time_col = _time_column(args, what_to_check)
+    by = getattr(args, "by", None)
+    return list(dict.fromkeys(([by] if by else []) + _segment_columns(args, what_to_check) + ([time_col] if time_col else [])))
 
-    if "metric_arm_n" in what_to_check:
-        _metric_arm_n_check(df, args.user, args.variant, args.metrics, args.min_n_metric, report_items, max_rows=30)
 
-    if "allocation" in what_to_check:
-        _allocation_check(df, args.user, args.variant, args.allocation, args.alpha, report_items, max_rows=30)
+#Doctor core: runs the selected checks on a loaded frame and returns the findings (no file I/O, no exit codes).
+#Shared by `ab doctor` and the Python API (abx.doctor). max_rows caps example rows per finding (0 = no examples);
+#stats replaces the fused statistics pass (e.g. stats_sidecar.SidecarStats); otherwise --cache DIR reuses results of
+#unchanged columns (doctor_cache.py). given holds inputs computed elsewhere for single checks (doctor_groups, from one
+#pass over all experiments): "variants" -> its summary, "allocation" -> its value counts, "missingness"/"metric_arm_n"
+#-> a stats object with overall/by_variant.
+def _doctor_checks(df: pd.DataFrame, args: argparse.Namespace, prof: Profiler | None = None, max_rows: int = 30, stats=None, given: dict | None = None) -> list[dict]:
+    if prof is None:
+        prof = Profiler("doctor")
+    what_to_check = _doctor_plan(args)
 
+    segments = _segment_columns(args, what_to_check)
+    time_col = _time_column(args, what_to_check)
+    bucket = getattr(args, "time_bucket", None) or "day"
+    if bucket not in _TIME_BUCKETS:
+        raise SystemExit(f"--time-bucket must be one of {sorted(_TIME_BUCKETS)}")
 
-    #Saving and visualizing
-    if out_path is not None:
-        _save_report(report_items, out_path)
-        print(f"Report saved in {out_path}")
-    if args.preview:
-        _print_preview(report_items, only=args.only, max_example_rows=10)
-
-    n_err = sum(1 for x in report_items if x.get("severity") == "ERROR")
-    n_wrn = sum(1 for x in report_items if x.get("severity") == "WARN")
+    #Check if columns exist (metric columns are not needed when the statistics are given, e.g. from a sidecar)
+    required_cols = [args.user, args.variant] + segments + ([time_col] if time_col else []) + (list(args.metrics) if stats is None else [])
+    _require_columns(df, required_cols)
+    given_stats = stats
+    given = given or {}
 
-    exit_code = 0
-    no_exit = getattr(args, "no_exit", False)
-    fail_on = getattr(args, "fail_on", "error")
-    if not no_exit:
-        if fail_on == "warn" and (n_err > 0 or n_wrn > 0):
-            exit_code = 2
-        elif fail_on == "error" and n_err > 0:
-            exit_code = 2
-    if exit_code != 0:
-        raise SystemExit(exit_code)
+    #Run Tests
+    n_rows = len(df)
+    user, variant = args.user, args.variant
+
+    cache = None
+    if getattr(args, "cache", None) and given_stats is None:
+        from abx.cli.doctor_cache import DoctorCache
+        cache = DoctorCache(args.cache)
+
+    #Checks in report order. Frame checks read the table (user/variant through one shared distinct-value view each),
+    #metric checks read the fused statistics.
+    views = _StringViews(df)
+    frame_checks = {
+        "integrity": lambda items: _integrity(df, user, variant, items, max_rows=max_rows, views=views),
+        "variants": lambda items: _variant_check(df, user, variant, args.min_n, items, max_rows=max_rows, views=views, summary=given.get("variants")),
+        "consistency": lambda items: _consistency(df, user, variant, items, max_rows=max_rows, views=views),
+        "allocation": lambda items: _allocation_check(df, user, variant, args.allocation, args.alpha, items, max_rows=max_rows, views=views, counts=given.get("allocation")),
+        "segment_srm": lambda items: _segment_srm_check(df, variant, segments, args.allocation, args.alpha, items, max_rows=max_rows, views=views),
+        "time_srm": lambda items: _time_srm_check(df, variant, time_col, bucket, args.allocation, args.alpha, items, max_rows=max_rows, views=views),
+    }
+    metric_checks = {
+        "missingness": lambda items: _missingness(given.get("missingness", stats), items, max_rows=max_rows),
+        "metrics": lambda items: _metrics_check(stats, args.preview, items, max_rows=max_rows),
+        "distribution": lambda items: _distribution(stats, items, max_rows=max_rows),
+        "metric_arm_n": lambda items: _metric_arm_n_check(given.get("metric_arm_n", stats), args.min_n_metric, items, max_rows=max_rows),
+    }
+    #Options each frame check depends on (part of its cache key)
+    frame_params = {
+        "integrity": [], "variants": [args.min_n], "consistency": [], "allocation": [args.allocation, args.alpha],
+        "segment_srm": [args.allocation, args.alpha, segments], "time_srm": [args.allocation, args.alpha, time_col, bucket],
+    }
+    #Frame check -> columns it reads (part of its cache key)
+    frame_cols = {name: [user, variant] for name in frame_checks}
+    frame_cols["segment_srm"] = [user, variant] + segments
+    frame_cols["time_srm"] = [user, variant] + ([time_col] if time_col else [])
+    order = ["integrity", "variants", "missingness", "metrics", "consistency", "distribution", "metric_arm_n", "allocation", "segment_srm", "time_srm"]
+    #Each check writes its own findings list; the lists are joined in report order, so --workers never changes the report
+    found: dict[str, list[dict]] = {name: [] for name in order if name in what_to_check}
+
+    if cache is not None:
+        with prof.stage("fingerprint", rows_in=n_rows):
+            cache.fingerprint(df, [user, variant] + segments + ([time_col] if time_col else []) + (list(args.metrics) if set(metric_checks) & set(found) else []))
+
+    def run(name: str, check) -> None:
+        with prof.stage(f"check:{name}", rows_in=n_rows):
+            if cache is not None and name in frame_checks and name not in given:
+                cache.frame_check(name, frame_cols[name], frame_params[name], max_rows, check, found[name])
+            else:
+                check(found[name])
+
+    def build_stats(pool=None, workers: int = 1) -> MetricStats | None:
+        #Metric checks share one fused statistics pass (quantiles only when distribution needs them)
+        if not (set(metric_checks) - set(given)) & set(found):
+            return None
+        if given_stats is not None:
+            return given_stats
+        if cache is not None:
+            return cache.metric_stats(df, user, variant, args.metrics, "distribution" in found, prof, pool=pool, workers=workers)
+        with prof.stage("stats", rows_in=n_rows):
+            return MetricStats(df, user, variant, args.metrics, quantiles="distribution" in found, pool=pool, workers=workers)
+
+    workers = getattr(args, "workers", None) or 1
+    if workers > 1:
+        #Threads share the loaded frame (no copies); numpy/pandas release the GIL in the heavy parts
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="doctor") as pool:
+            jobs = [pool.submit(run, name, check) for name, check in frame_checks.items() if name in found]
+            stats = build_stats(pool, workers)
+            jobs += [pool.submit(run, name, check) for name, check in metric_checks.items() if name in found]
+            for job in jobs:
+                job.result()
+    else:
+        stats = build_stats()
+        for name in found:
+            run(name, frame_checks.get(name) or metric_checks[name])
+
+    if cache is not None:
+        print(f"[cache] {cache.summary()}")
+    report_items: list[dict] = [item for name in found for item in found[name]]
+    return report_items
@@ -0,0 +1,217 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from abx.cli.doctor_cmd import _StringView, _doctor_checks, _doctor_exit_code, _doctor_plan, _label_counts, _require_columns, _write_report
+from abx.cli.doctor_stats import _first_rows
+from abx.cli.profiling import Profiler
+
+#Multi-experiment tables (`ab doctor --by experiment_id`): one canonical table holds the users of many experiments.
+#The experiment column is factorized once and the frame reordered once (not at all when it is already grouped), so
+#every experiment is a contiguous row slice: no per-experiment filtering over the whole table and no re-reading.
+#Checks that only count rows (variants, allocation, missingness, metric_arm_n) get their inputs for all experiments
+#from one grouped pass (_ExperimentCounts); the checks that need the rows (integrity, consistency, metrics, ...) run
+#on each slice.
+#
+#Every finding gets an "experiment" key. EXPERIMENTS_SUMMARY (first finding) has per-experiment readiness and exit status,
+#and the exit status of the run is the worst of them.
+
+_READINESS = {0: "ready", 1: "warnings", 2: "not ready"}
+
+
+def _experiment_key(label):
+    #JSON-friendly experiment label (numpy scalars -> Python, anything else exotic -> str)
+    if isinstance(label, np.generic):
+        label = label.item()
+    return label if isinstance(label, (str, int, float, bool)) else str(label)
+
+
+def _experiment_slices(df: pd.DataFrame, by: str) -> tuple[pd.DataFrame, list, np.ndarray, np.ndarray]:
+    #(frame grouped by experiment, labels in first-seen order, slice bounds per label, row codes (-1 = missing))
+    codes, labels = pd.factorize(df[by], sort=False)
+    missing = codes < 0
+    #Missing experiment ids sort last; a table that is already grouped keeps its order (and memory)
+    key = np.where(missing, len(labels), codes)
+    if len(key) > 1 and np.any(key[1:] < key[:-1]):
+        order = np.argsort(key, kind="stable")
+        df = df.take(order)
+        codes = codes[order]
+        key = key[order]
+    bounds = np.searchsorted(key, np.arange(len(labels) + 1))
+    return df, list(labels), bounds, codes
+
+
+def _experiment_counts(view: _StringView, codes: np.ndarray, n_experiments: int) -> tuple[np.ndarray, np.ndarray]:
+    #Rows per (experiment, normalized variant) in one pass; blank variants and missing experiment ids not counted
+    vcodes, vlabels = view.normalized()
+    ok = (codes >= 0) & (vcodes >= 0)
+    flat = np.bincount(codes[ok] * len(vlabels) + vcodes[ok], minlength=n_experiments * len(vlabels))
+    return flat.reshape(n_experiments, len(vlabels)), vlabels
+
+
+class _MissingStats:
+    #The part of MetricStats that missingness and metric_arm_n read (overall n_rows/missing, by_variant users/missing,
+    #missing examples), for one experiment
+    approximate = False
+
+    def __init__(self, part: pd.DataFrame, user: str, variant: str, metrics: list[str], labels: np.ndarray, users: np.ndarray, missing: np.ndarray) -> None:
+        #users: rows per variant label, missing: (metrics, labels); variants without rows are left out, like a groupby
+        self.df = part
+        self.user = user
+        self.variant = variant
+        self.metrics = metrics
+        present = users > 0
+        k, n_var = len(metrics), int(present.sum())
+        missing = missing[:, present].astype("int64")
+        self.by_variant = pd.DataFrame({
+            "metric": np.repeat(np.array(metrics, dtype=object), n_var),
+            variant: np.tile(labels[present], k),
+            "users": np.tile(users[present].astype("int64"), k),
+            "missing": missing.ravel(),
+        })
+        self.overall = pd.DataFrame({"n_rows": len(part), "missing": missing.sum(axis=1)}, index=pd.Index(metrics, name="metric"))
+
+    def examples(self, kind: str, m: str):
+        if kind != "missing":
+            raise ValueError(f"Unknown example kind: {kind}")
+        return lambda n: _first_rows(self.df, self.df[m].isna().to_numpy(), [self.user, self.variant, m])(n)
+
+
+class _ExperimentCounts:
+    #Inputs of the counting checks for every experiment from one pass over the grouped frame: rows and first row per
+    #(experiment, distinct variant value), and missing values per (metric, experiment, variant). given(i) returns what
+    #the checks would compute from experiment i's slice (same values, order and dtypes) for _doctor_checks(given=...).
+    def __init__(self, df: pd.DataFrame, args: argparse.Namespace, view: _StringView, bounds: np.ndarray, codes: np.ndarray, checks: list[str]) -> None:
+        self.df = df
+        self.args = args
+        self.bounds = bounds
+        n_exp = len(bounds) - 1
+        #Rows of missing experiment ids are last (_experiment_slices)
+        n_ok = int(bounds[-1])
+        self.checks = [c for c in checks if c in ("variants", "missingness", "metric_arm_n")
+                       or (c == "allocation" and args.allocation is not None)]
+
+        #Distinct variant values per experiment (slot 0 = missing), with the first row of each so the counts come out
+        #in the slice's first-seen order
+        n_val = len(view) + 1
+        key = codes[:n_ok] * n_val + view.codes[:n_ok] + 1
+        self.value_rows = np.bincount(key, minlength=n_exp * n_val).reshape(n_exp, n_val)
+        first = np.full(n_exp * n_val, n_ok)
+        np.minimum.at(first, key, np.arange(n_ok))
+        self.value_first = first.reshape(n_exp, n_val)
+        na = pd.Series([pd.NA], dtype="string")
+        self.stripped = pd.concat([na, view.stripped], ignore_index=True)
+        self.clean = pd.concat([na, view.clean], ignore_index=True)
+        if "variants" in self.checks:
+            #Distinct users per experiment (missing ids not counted)
+            ucodes, uniques = pd.factorize(df[args.user])
+            ok = ucodes[:n_ok] >= 0
+            n_ids = np.int64(max(len(uniques), 1))
+            pairs = np.sort(codes[:n_ok][ok] * n_ids + ucodes[:n_ok][ok])
+            pairs = pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])] if len(pairs) else pairs
+            self.n_users = np.bincount(pairs // n_ids, minlength=n_exp)
+
+        #Missing values per (metric, experiment, variant), variants in MetricStats order (sorted, missing last)
+        self.metrics = list(dict.fromkeys(args.metrics))
+        if {"missingness", "metric_arm_n"} & set(self.checks):
+            vcodes, labels = pd.factorize(df[args.variant], sort=True, use_na_sentinel=False)
+            self.labels = labels.to_numpy(dtype=object)
+            n_var = len(labels)
+            key = codes[:n_ok] * n_var + vcodes[:n_ok]
+            self.users = np.bincount(key, minlength=n_exp * n_var).reshape(n_exp, n_var)
+            self.missing = np.zeros((len(self.metrics), n_exp, n_var), dtype="int64")
+            for j, m in enumerate(self.metrics):
+                miss = df[m].isna().to_numpy()[:n_ok]
+                self.missing[j] = np.bincount(key[miss], minlength=n_exp * n_var).reshape(n_exp, n_var)
+
+    def _value_counts(self, i: int, labels: pd.Series, keep: np.ndarray) -> pd.Series:
+        #Counts per label of experiment i's values, like _StringView.value_counts on the slice
+        slots = np.flatnonzero((self.value_rows[i] > 0) & keep)
+        slots = slots[np.argsort(self.value_first[i, slots], kind="stable")]
+        return _label_counts(labels.iloc[slots].reset_index(drop=True), self.value_rows[i, slots], self.args.variant)
+
+    def given(self, i: int) -> dict:
+        out = {}
+        if "variants" in self.checks:
+            out["variants"] = {
+                "counts": self._value_counts(i, self.stripped, np.ones(len(self.stripped), dtype=bool)),
+                "n_users": int(self.n_users[i]),
+            }
+        if "allocation" in self.checks:
+            #Blank and missing variants dropped
+            out["allocation"] = self._value_counts(i, self.clean, self.clean.notna().to_numpy() & (self.clean != "").to_numpy(dtype=bool, na_value=False))
+        if {"missingness", "metric_arm_n"} & set(self.checks):
+            part = self.df.iloc[self.bounds[i]:self.bounds[i + 1]]
+            stats = _MissingStats(part, self.args.user, self.args.variant, self.metrics, self.labels, self.users[i], self.missing[:, i])
+            out.update({c: stats for c in ("missingness", "metric_arm_n") if c in self.checks})
+        return out
+
+
+def _doctor_checks_by(df: pd.DataFrame, args: argparse.Namespace, prof: Profiler | None = None, max_rows: int = 30) -> list[dict]:
+    if prof is None:
+        prof = Profiler("doctor")
+    by = args.by
+    _require_columns(df, [by, args.user, args.variant])
+    if by in (args.user, args.variant):
+        raise SystemExit("--by must be a column other than the user and variant columns")
+
+    checks = _doctor_plan(args)
+    if {"missingness", "metric_arm_n"} & set(checks):
+        _require_columns(df, list(args.metrics))
+
+    with prof.stage("group", rows_in=len(df)):
+        df, labels, bounds, codes = _experiment_slices(df, by)
+        view = _StringView(df[args.variant])
+        counts, vlabels = _experiment_counts(view, codes, len(labels))
+        grouped = _ExperimentCounts(df, args, view, bounds, codes, checks)
+
+    report_items: list[dict] = []
+    n_missing = int(len(df) - bounds[-1])
+    if n_missing:
+        _write_report(report_items, {
+            "severity": "ERROR",
+            "code": "EXPERIMENT_MISSING_ID",
+            "message": f"Found {n_missing} row(s) with a missing '{by}'. They belong to no experiment and were not checked.",
+            "count": n_missing,
+            "meta": {"by": by},
+            "examples_df": _first_rows(df, codes < 0, [args.user, args.variant, by]),
+        }, max_rows=max_rows)
+
+    rows = []
+    per_experiment = []
+    for i, label in enumerate(labels):
+        part = df.iloc[bounds[i]:bounds[i + 1]]
+        key = _experiment_key(label)
+        #Per-experiment check stages would repeat for every experiment; the profile gets one stage per experiment
+        with prof.stage(f"experiment:{key}", rows_in=len(part)):
+            items = _doctor_checks(part, args, Profiler("doctor"), max_rows=max_rows, given=grouped.given(i))
+        for item in items:
+            item["experiment"] = key
+        #What `ab doctor` would exit with on this experiment alone (--fail-on applies, --no-exit does not)
+        exit_code = _doctor_exit_code(items, argparse.Namespace(fail_on=args.fail_on))
+        n_err = sum(1 for x in items if x["severity"] == "ERROR")
+        n_wrn = sum(1 for x in items if x["severity"] == "WARN")
+        arms = ", ".join(f"{v}={int(n)}" for v, n in zip(vlabels, counts[i]) if n)
+        level = 2 if n_err else (1 if n_wrn else 0)
+        rows.append({"experiment": key, "n_rows": len(part), "variants": arms, "errors": n_err, "warnings": n_wrn, "readiness": _READINESS[level], "exit_code": exit_code})
+        per_experiment.append(items)
+
+    table = pd.DataFrame(rows, columns=["experiment", "n_rows", "variants", "errors", "warnings", "readiness", "exit_code"])
+    n_bad = int((table["errors"] > 0).sum())
+    n_warn = int(((table["errors"] == 0) & (table["warnings"] > 0)).sum())
+    #Worst experiments first, so a capped example table still shows the ones to fix
+    table = table.sort_values(["errors", "warnings"], ascending=False, kind="stable").reset_index(drop=True)
+    summary: list[dict] = []
+    _write_report(summary, {
+        "severity": "INFO",
+        "code": "EXPERIMENTS_SUMMARY",
+        "message": (
+            f"{len(labels)} experiment(s) by '{by}': {len(labels) - n_bad - n_warn} ready, {n_warn} with warnings only, "
+            f"{n_bad} not ready. Worst first."
+        ),
+        "count": len(labels),
+        "meta": {"by": by, "experiments": table.to_dict(orient="records")},
+        "examples_df": table,
+    }, max_rows=max_rows)
+    return summary + report_items + [item for items in per_experiment for item in items]
@@ -0,0 +1,208 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from abx.cli.doctor_cmd import _doctor_plan, _fmt_pct, _require_columns, _write_report
+from abx.cli.profiling import Profiler
+
+#Parquet footer helpers for doctor. Footers store the schema, row counts and per-row-group null counts and min/max, so
+#  - defaults (numeric metric columns) come from the schema and only the checked columns are read, and
+#  - `ab doctor --metadata-only` answers what it can without reading any data (null counts, min/max screening).
+
+
+def _parquet_file(path: Path):
+    if not path.exists():
+        raise SystemExit(f"File not found: {path}")
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+    return pq.ParquetFile(path)
+
+
+def _schema_frame(pf) -> pd.DataFrame:
+    #Zero-row frame with the dtypes pandas would give the columns (for _doctor_defaults and column checks)
+    df = pf.schema_arrow.empty_table().to_pandas()
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def _load_columns(pf, columns: list[str]) -> pd.DataFrame:
+    #Reads only `columns` (stripped names), in file order
+    raw = {c.strip(): c for c in pf.schema_arrow.names}
+    df = pf.read(columns=[raw[c] for c in raw if c in set(columns)]).to_pandas()
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def _column_stats(pf) -> dict:
+    #Per top-level column, merged over row groups: nulls (None if any row group has no null count),
+    #min/max (None when missing), row groups whose min/max is +-inf
+    md = pf.metadata
+    names = set(pf.schema_arrow.names)
+    out: dict = {}
+    for j in range(md.num_columns):
+        path = md.schema.column(j).path
+        if path not in names:
+            continue
+        st = {"nulls": 0, "min": None, "max": None, "has_min_max": True, "inf_groups": 0}
+        for rg in range(md.num_row_groups):
+            col = md.row_group(rg).column(j)
+            s = col.statistics
+            if s is None or not s.has_null_count:
+                st["nulls"] = None
+            elif st["nulls"] is not None:
+                st["nulls"] += int(s.null_count)
+            if md.row_group(rg).num_rows == 0 or (s is not None and s.has_null_count and s.null_count == md.row_group(rg).num_rows):
+                continue
+            if s is None or not s.has_min_max:
+                st["has_min_max"] = False
+                continue
+            lo, hi = s.min, s.max
+            if isinstance(lo, float) and (np.isinf(lo) or np.isinf(hi)):
+                st["inf_groups"] += 1
+            try:
+                st["min"] = lo if st["min"] is None else min(st["min"], lo)
+                st["max"] = hi if st["max"] is None else max(st["max"], hi)
+            except TypeError:
+                st["has_min_max"] = False
+        if not st["has_min_max"]:
+            st["min"] = st["max"] = None
+        out[path.strip()] = st
+    return out
+
+
+def _doctor_checks_metadata(pf, args: argparse.Namespace, prof: Profiler | None = None, max_rows: int = 30) -> list[dict]:
+    if prof is None:
+        prof = Profiler("doctor")
+    what_to_check = _doctor_plan(args)
+    user, variant = args.user, args.variant
+    schema = _schema_frame(pf)
+    _require_columns(schema, [user, variant] + list(args.metrics))
+
+    with prof.stage("metadata"):
+        n_rows = int(pf.metadata.num_rows)
+        cols = _column_stats(pf)
+    no_stats = [c for c in [user, variant] + list(args.metrics) if cols.get(c, {}).get("nulls") is None]
+    src = "parquet_metadata"
+
+    report_items: list[dict] = []
+    if "integrity" in what_to_check:
+        with prof.stage("check:integrity"):
+            for col, code, what in ((user, "INTEGRITY_BAD_USER", "a valid user_id"), (variant, "INTEGRITY_BAD_VARIANT", "a variant")):
+                nulls = cols[col]["nulls"]
+                if nulls:
+                    _write_report(report_items, {
+                        "severity": "ERROR",
+                        "code": code,
+                        "message": f"Found missing values in '{col}'. Canonical data must have {what} per row.",
+                        "count": nulls,
+                        "meta": {"n_rows": n_rows, "source": src},
+                        "examples_df": None,
+                    }, max_rows=max_rows)
+            _write_report(report_items, {
+                "severity": "INFO",
+                "code": "INTEGRITY_SUMMARY",
+                "message": f"Rows={n_rows}.",
+                "count": n_rows,
+                "meta": {"n_rows": n_rows, "source": src},
+                "examples_df": None,
+            }, max_rows=max_rows)
+
+    if "missingness" in what_to_check:
+        with prof.stage("check:missingness"):
+            rows = []
+            for m in args.metrics:
+                missing = cols[m]["nulls"]
+                if missing is None:
+                    continue
+                rate = float(missing / n_rows) if n_rows > 0 else 0.0
+                rows.append({"metric": m, "overall_missing": f"{missing}/{n_rows} ({_fmt_pct(rate)})", "overall_missing_rate": rate})
+                if rate >= 0.999999:
+                    _write_report(report_items, {
+                        "severity": "ERROR",
+                        "code": "METRIC_ALL_MISSING",
+                        "message": f"Metric '{m}' is entirely missing: {missing}/{n_rows} ({_fmt_pct(rate)}). It is not usable for analysis.",
+                        "count": missing,
+                        "meta": {"metric": m, "missing": missing, "missing_rate": rate, "source": src},
+                        "examples_df": None,
+                    }, max_rows=max_rows)
+                elif rate >= 0.95:
+                    _write_report(report_items, {
+                        "severity": "WARN",
+                        "code": "METRIC_HIGH_MISSING",
+                        "message": f"Metric '{m}' has high missingness: {missing}/{n_rows} ({_fmt_pct(rate)}).",
+                        "count": missing,
+                        "meta": {"metric": m, "missing": missing, "missing_rate": rate, "source": src},
+                        "examples_df": None,
+                    }, max_rows=max_rows)
+            if rows:
+                summary = pd.DataFrame(rows).sort_values("overall_missing_rate", ascending=False, kind="stable")
+                _write_report(report_items, {
+                    "severity": "INFO",
+                    "code": "MISSINGNESS_SUMMARY",
+                    "message": "Missingness summary across metrics (Parquet null counts).",
+                    "count": int(len(summary)),
+                    "meta": {"source": src},
+                    "examples_df": summary.drop(columns=["overall_missing_rate"]),
+                }, max_rows=max_rows)
+
+    if "metrics" in what_to_check:
+        with prof.stage("check:metrics"):
+            rows = []
+            for m in args.metrics:
+                st = cols[m]
+                dtype = str(schema[m].dtype)
+                numeric = pd.api.types.is_numeric_dtype(schema[m])
+                rows.append({"metric": m, "dtype": dtype, "missing": st["nulls"], "min": st["min"], "max": st["max"]})
+                if dtype in {"object", "string"}:
+                    _write_report(report_items, {
+                        "severity": "WARN",
+                        "code": "METRIC_NON_NUMERIC_DTYPE",
+                        "message": f"Metric '{m}' is dtype={dtype}. For analysis, metrics should usually be numeric (or datetime for time metrics).",
+                        "count": n_rows,
+                        "meta": {"source": src},
+                    }, max_rows=max_rows)
+                if st["inf_groups"]:
+                    _write_report(report_items, {
+                        "severity": "ERROR",
+                        #Own code: count is row groups here, not values as in METRIC_NONFINITE
+                        "code": "METRIC_NONFINITE_ROWGROUPS",
+                        "message": f"Metric '{m}' contains inf/-inf values (Parquet min/max of {st['inf_groups']} row group(s)). That breaks most analysis.",
+                        "count": st["inf_groups"],
+                        "meta": {"metric": m, "row_groups": st["inf_groups"], "source": src},
+                    }, max_rows=max_rows)
+                n_values = n_rows - st["nulls"] if st["nulls"] is not None else 0
+                if numeric and n_values >= 2 and st["min"] is not None and st["min"] == st["max"]:
+                    _write_report(report_items, {
+                        "severity": "WARN",
+                        "code": "METRIC_CONSTANT",
+                        "message": f"Metric '{m}' is constant (no variation). It will not show treatment effects.",
+                        "count": n_values,
+                        "meta": {"metric": m, "source": src},
+                    }, max_rows=max_rows)
+            _write_report(report_items, {
+                "severity": "INFO",
+                "code": "METRICS_SUMMARY",
+                "message": "Metrics dtype/missing/min/max from the Parquet schema and statistics.",
+                "count": len(rows),
+                "meta": {"source": src},
+                "examples_df": pd.DataFrame(rows, columns=["metric", "dtype", "missing", "min", "max"]),
+            }, max_rows=max_rows)
+
+    #Everything else needs the rows (duplicates, per-variant counts, parsing, quantiles)
+    skipped = [c for c in what_to_check if c not in ("integrity", "missingness", "metrics") and not (c in ("allocation", "segment_srm", "time_srm") and args.allocation is None)]
+    _write_report(report_items, {
+        "severity": "INFO",
+        "code": "METADATA_ONLY",
+        "message": (
+            "Answered from Parquet metadata only: row/null counts, dtypes and min/max. Duplicate users, blank strings, "
+            "per-variant numbers and value-level checks need a data scan (run without --metadata-only)."
+        ),
+        "count": len(skipped),
+        "meta": {"skipped_checks": skipped, "columns_without_statistics": no_stats, "source": src},
+        "examples_df": None,
+    }, max_rows=max_rows)
+    return report_items
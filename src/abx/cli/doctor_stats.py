@@ -0,0 +1,306 @@
+import numpy as np
+import pandas as pd
+
+#Fused statistics for doctor: every metric column is parsed to numbers once and all metrics are aggregated per variant
+#in one pass over a 2-D float block, instead of each check re-running pd.to_numeric and its own groupby per metric.
+#The metric checks (missingness, metrics, distribution, metric_arm_n) only read from these tables.
+#
+#  stats.by_variant   one row per (metric, variant): users, missing, count, nonfinite, sum, sumsq, mean, std, min, p50, p90, max
+#  stats.overall      one row per metric: dtype, n_rows, missing, count, bad_cast, nonfinite, n_01, min, max, q1, q3
+#
+#count is the number of numeric values (inf included, like pandas); missing counts missing raw values, so
+#bad_cast = non-missing values that failed numeric parsing.
+#
+#Checks get example rows through examples()/outlier_examples() rather than from the frame, so the chunked doctor
+#(doctor_stream.StreamMetricStats) can serve the same checks from bounded example buffers. Here they return lazy
+#selectors (see _first_rows): nothing is copied unless the finding is written with examples.
+
+#Per-variant columns, in table order
+_BY_VARIANT_COLS = ["users", "missing", "count", "nonfinite", "sum", "sumsq", "mean", "std", "min", "p50", "p90", "max"]
+
+
+def _numeric_column(s: pd.Series) -> np.ndarray:
+    #Same parsing as pd.to_numeric(errors="coerce"), always as float64 (bool/Int64/strings included)
+    if not pd.api.types.is_numeric_dtype(s):
+        s = pd.to_numeric(s, errors="coerce")
+    return s.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _quantiles_sorted(x: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    #x: rows sorted ascending with NaN last, counts: non-NaN values per row. Linear interpolation (pandas default).
+    if x.shape[1] == 0:
+        return np.full(x.shape[0], np.nan)
+    pos = q * np.maximum(counts - 1, 0)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, np.maximum(counts - 1, 0))
+    rows = np.arange(x.shape[0])
+    a = x[rows, lo]
+    b = x[rows, hi]
+    frac = pos - lo
+    with np.errstate(invalid="ignore"):
+        out = np.where(frac > 0, a + (b - a) * frac, a)
+    return np.where(counts > 0, out, np.nan)
+
+
+#Values per batch of metric rows in _split_rows/_row_quantiles: bounds their temporaries on long tables
+_BATCH_VALUES = 1 << 22
+
+
+def _row_quantiles(x: np.ndarray, qs: tuple, counts: np.ndarray | None = None) -> np.ndarray:
+    #x: (metrics, rows) float block, possibly a strided view; counts: non-NaN values per metric row. Quantiles of the
+    #non-NaN values of every row as (metrics, len(qs)), linear interpolation (pandas default). Partitions small
+    #batches of rows with the same count in place (NaN goes last) instead of sorting a copy of the whole block.
+    out = np.full((x.shape[0], len(qs)), np.nan)
+    if counts is None:
+        counts = x.shape[1] - np.isnan(x).sum(axis=1)
+    for c in np.unique(counts[counts > 0]):
+        rows = np.flatnonzero(counts == c)
+        pos = np.asarray(qs, dtype="float64") * (c - 1)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, c - 1)
+        frac = pos - lo
+        kth = np.unique(np.concatenate([lo, hi]))
+        step = max(1, _BATCH_VALUES // x.shape[1])
+        for j in range(0, len(rows), step):
+            r = rows[j:j + step]
+            part = x[r]
+            part.partition(kth, axis=1)
+            a, b = part[:, lo], part[:, hi]
+            with np.errstate(invalid="ignore"):
+                out[r] = np.where(frac > 0, a + (b - a) * frac, a)
+    return out
+
+
+def _block_stats(x: np.ndarray, quantiles: bool) -> dict:
+    #x: (metrics, rows) float block of one variant (or of all rows), possibly a view into a larger block
+    n = x.shape[1]
+    nan = np.isnan(x)
+    count = n - nan.sum(axis=1)
+    nonfinite = np.isinf(x).sum(axis=1)
+    x0 = np.where(nan, 0.0, x)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        total = x0.sum(axis=1)
+        sumsq = np.einsum("ij,ij->i", x0, x0)
+        mean = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+        #Two-pass variance (ddof=1); undefined with inf values or fewer than 2 values, like pandas
+        x0 -= mean[:, None]
+        x0[nan] = 0.0
+        m2 = np.einsum("ij,ij->i", x0, x0)
+        var = m2 / (count - 1)
+    std = np.where((count > 1) & (nonfinite == 0), np.sqrt(np.maximum(var, 0.0)), np.nan)
+    out = {"count": count, "nonfinite": nonfinite, "sum": total, "sumsq": sumsq, "mean": mean, "m2": m2, "std": std}
+
+    out["min"] = np.fmin.reduce(x, axis=1) if n else np.full(x.shape[0], np.nan)
+    out["max"] = np.fmax.reduce(x, axis=1) if n else np.full(x.shape[0], np.nan)
+    if quantiles:
+        q = _row_quantiles(x, (0.50, 0.90), count)
+        out["p50"] = q[:, 0]
+        out["p90"] = q[:, 1]
+    return out
+
+
+def _take(df: pd.DataFrame, pos: np.ndarray, cols: list[str]) -> pd.DataFrame:
+    #Rows at positions `pos`, only the `cols` columns (no full-column copies on wide frames)
+    if not df.columns.is_unique:
+        return df.iloc[pos][cols].copy()
+    return df.iloc[pos, df.columns.get_indexer(cols)].copy()
+
+
+def _first_rows(df: pd.DataFrame, mask, cols: list[str], sort_by: str | None = None):
+    #Lazy example selector for findings: n -> first n rows where mask is True (optionally ordered by one column,
+    #stable, missing last). _write_report calls it with max_rows, or not at all when examples are not needed.
+    def rows(n: int) -> pd.DataFrame:
+        pos = np.flatnonzero(np.asarray(mask, dtype=bool))
+        if sort_by is not None:
+            key = df[sort_by].iloc[pos].reset_index(drop=True)
+            pos = pos[key.sort_values(kind="stable").index.to_numpy()]
+        return _take(df, pos[:n], cols)
+    return rows
+
+
+def _split_rows(fn, x: np.ndarray, pool=None, parts: int = 1):
+    #fn over groups of metric rows of x, on a thread pool when given (numpy sorts and reductions release the GIL),
+    #joined back in row order. Groups hold at most about _BATCH_VALUES values, which bounds the temporaries of fn.
+    parts = max(parts if pool is not None else 1, -(-x.size // _BATCH_VALUES))
+    if parts <= 1 or x.shape[0] < 2:
+        return fn(x)
+    bounds = np.linspace(0, x.shape[0], min(parts, x.shape[0]) + 1).astype(int)
+    run = pool.map if pool is not None else map
+    res = list(run(lambda i: fn(x[bounds[i]:bounds[i + 1]]), range(len(bounds) - 1)))
+    if isinstance(res[0], dict):
+        return {k: np.concatenate([r[k] for r in res], axis=0) for k in res[0]}
+    return np.concatenate(res, axis=0)
+
+
+#Example row selections, by kind: rows of the metric whose raw/numeric value matches
+_EXAMPLE_KINDS = ("head", "missing", "bad_cast", "nonfinite", "bad_binary")
+
+
+def _example_mask(raw: pd.Series, x: np.ndarray, kind: str) -> np.ndarray:
+    #raw: the metric column, x: its numeric view (_numeric_column)
+    if kind == "missing":
+        return raw.isna().to_numpy()
+    if kind == "bad_cast":
+        return raw.notna().to_numpy() & np.isnan(x)
+    if kind == "nonfinite":
+        return np.isinf(x)
+    if kind == "bad_binary":
+        return ~np.isnan(x) & (x != 0) & (x != 1)
+    raise ValueError(f"Unknown example kind: {kind}")
+
+
+def _variant_rows(stats) -> tuple[pd.DataFrame, dict]:
+    #stats.by_variant with the rows of each metric contiguous and in stats.metrics order, plus {metric: row positions}.
+    #The checks read every metric's per-variant rows from this one table instead of building a frame per metric.
+    bv = stats.by_variant
+    pos = {m: i for i, m in enumerate(stats.metrics)}
+    order = np.argsort(bv["metric"].map(pos).to_numpy(dtype="int64"), kind="stable")
+    if np.any(order != np.arange(len(order))):
+        bv = bv.iloc[order].reset_index(drop=True)
+    return bv, bv.groupby("metric", sort=False).indices
+
+
+def _outlier_bounds(q1: float, q3: float) -> tuple[float, float] | None:
+    #Same IQR rule as the distribution check
+    iqr = q3 - q1
+    if not iqr > 0:
+        return None
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+def _fence_distance(x: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    #How far values outside [lo, hi] lie beyond the nearer fence
+    return np.where(x < lo, lo - x, x - hi)
+
+
+def _outlier_rows(df: pd.DataFrame, x: np.ndarray, lo: float, hi: float, cols: list[str], n: int) -> pd.DataFrame:
+    #First n values outside [lo, hi], farthest outside the fences first (so low-side outliers such as zeros in a
+    #metric around 100 rank by how far below the fence they are, not by |x|)
+    pos = np.flatnonzero((x < lo) | (x > hi))
+    order = np.argsort(-_fence_distance(x[pos], lo, hi), kind="stable")[:n]
+    return _take(df, pos[order], cols)
+
+
+class MetricStats:
+    #Exact statistics over an in-memory frame
+    approximate = False
+
+    def __init__(self, df: pd.DataFrame, user: str, variant: str, metrics: list[str], quantiles: bool = True, pool=None, workers: int = 1) -> None:
+        self.df = df
+        self.user = user
+        self.variant = variant
+        self.metrics = list(dict.fromkeys(metrics))
+        self.quantiles = quantiles
+        #Optional thread pool: metric rows of each block are split across `workers` threads
+        self._pool = pool
+        self._workers = workers
+        self._pos = {m: i for i, m in enumerate(self.metrics)}
+
+        #Variant groups in groupby(dropna=False) order: sorted labels, missing last
+        codes, labels = pd.factorize(df[variant], sort=True, use_na_sentinel=False)
+        self.labels = labels
+        self.n_variants = len(labels)
+
+        #The only numeric copy of the metrics: one (metrics, rows) float block with the rows sorted by variant once, so
+        #every variant is a contiguous column slice (a view). _order maps block columns back to frame rows.
+        sizes = np.bincount(codes, minlength=self.n_variants)
+        self._bounds = np.concatenate([[0], np.cumsum(sizes)])
+        order = np.argsort(codes, kind="stable")
+        self._order = None if np.all(np.diff(codes) >= 0) else order
+        self._block = np.empty((len(self.metrics), len(df)))
+        for i, m in enumerate(self.metrics):
+            x = _numeric_column(df[m])
+            if self._order is None:
+                self._block[i] = x
+            else:
+                np.take(x, order, out=self._block[i])
+        #Raw missing differs from numeric NaN only for columns that need parsing (strings, datetimes)
+        parsed = [i for i, m in enumerate(self.metrics) if not pd.api.types.is_numeric_dtype(df[m])]
+        raw_missing = {i: np.bincount(codes[df[self.metrics[i]].isna().to_numpy()], minlength=self.n_variants) for i in parsed}
+
+        self.by_variant = self._by_variant(sizes, raw_missing)
+        self.overall = self._overall(df)
+
+    def _numeric(self, m: str) -> np.ndarray:
+        #Numeric values of one metric in frame row order (for example masks)
+        x = self._block[self._pos[m]]
+        if self._order is None:
+            return x
+        out = np.empty_like(x)
+        out[self._order] = x
+        return out
+
+    def _by_variant(self, sizes: np.ndarray, raw_missing: dict) -> pd.DataFrame:
+        k, n_var = len(self.metrics), self.n_variants
+        cols = {c: np.full((n_var, k), np.nan) for c in _BY_VARIANT_COLS}
+        for g in range(n_var):
+            x = self._block[:, self._bounds[g]:self._bounds[g + 1]]
+            st = _split_rows(lambda x: _block_stats(x, self.quantiles), x, self._pool, self._workers)
+            cols["users"][g] = sizes[g]
+            cols["missing"][g] = sizes[g] - st["count"]
+            for i, miss in raw_missing.items():
+                cols["missing"][g, i] = miss[g]
+            for c in ("count", "nonfinite", "sum", "sumsq", "mean", "std", "min", "max"):
+                cols[c][g] = st[c]
+            if self.quantiles:
+                cols["p50"][g] = st["p50"]
+                cols["p90"][g] = st["p90"]
+
+        #Long table, metric-major: rows [i*n_var, (i+1)*n_var) belong to metrics[i]
+        out = {
+            "metric": np.repeat(np.array(self.metrics, dtype=object), n_var),
+            self.variant: np.tile(self.labels.to_numpy(dtype=object), k),
+        }
+        for c in _BY_VARIANT_COLS:
+            out[c] = cols[c].T.ravel()
+        for c in ("users", "missing", "count", "nonfinite"):
+            out[c] = out[c].astype("int64")
+        self._columns = out
+        return pd.DataFrame(out)
+
+    def _overall(self, df: pd.DataFrame) -> pd.DataFrame:
+        k, n_var = len(self.metrics), self.n_variants
+        per = {c: self.by_variant[c].to_numpy().reshape(k, n_var) for c in ("missing", "count", "nonfinite", "min", "max")}
+        n_rows = int(len(df))
+        out = pd.DataFrame({
+            "dtype": [str(df[m].dtype) for m in self.metrics],
+            "n_rows": n_rows,
+            "missing": per["missing"].sum(axis=1),
+            "count": per["count"].sum(axis=1),
+            "nonfinite": per["nonfinite"].sum(axis=1),
+        }, index=pd.Index(self.metrics, name="metric"))
+        out["bad_cast"] = (n_rows - out["missing"] - out["count"]).astype("int64")
+        block = self._block
+        out["n_01"] = ((block == 0) | (block == 1)).sum(axis=1)
+        with np.errstate(invalid="ignore"):
+            out["min"] = np.fmin.reduce(per["min"], axis=1) if n_var else np.nan
+            out["max"] = np.fmax.reduce(per["max"], axis=1) if n_var else np.nan
+        if self.quantiles and k:
+            q = _split_rows(lambda x: _row_quantiles(x, (0.25, 0.75)), block, self._pool, self._workers)
+            out["q1"] = q[:, 0]
+            out["q3"] = q[:, 1]
+        else:
+            out["q1"] = np.nan
+            out["q3"] = np.nan
+        return out
+
+    def metric(self, m: str) -> pd.DataFrame:
+        #Per-variant rows of one metric (variant column first)
+        i = self._pos[m]
+        k = self.n_variants
+        return pd.DataFrame({c: a[i * k:(i + 1) * k] for c, a in self._columns.items() if c != "metric"})
+
+    def examples(self, kind: str, m: str):
+        cols = [self.user, self.variant, m]
+        if kind == "head":
+            return lambda n: _take(self.df, np.arange(min(n, len(self.df))), cols)
+        return lambda n: _first_rows(self.df, _example_mask(self.df[m], self._numeric(m), kind), cols)(n)
+
+    def outlier_count(self, m: str, lo: float, hi: float) -> tuple[int, bool]:
+        #(count, approximate)
+        x = self._numeric(m)
+        return int(((x < lo) | (x > hi)).sum()), False
+
+    def outlier_examples(self, m: str, lo: float, hi: float):
+        #Farthest outside the fences first
+        return lambda n: _outlier_rows(self.df, self._numeric(m), lo, hi, [self.user, self.variant, m], n)
@@ -0,0 +1,624 @@
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from abx.cli.doctor_cmd import (
+    _StringViews, _allocation_counts, _allocation_report, _consistency_report, _consistency_summary, _distribution,
+    _doctor_plan, _integrity_report, _merge_segment_counts, _merge_time_counts, _metric_arm_n_check, _metrics_check, _missingness,
+    _segment_columns, _segment_counts, _segment_srm_report, _time_column, _time_counts, _time_srm_report, _variant_report,
+)
+from abx.cli.doctor_stats import _BY_VARIANT_COLS, _block_stats, _fence_distance, _numeric_column, _quantiles_sorted
+from abx.cli.profiling import Profiler
+
+#Chunked doctor (`ab doctor --chunk-rows N`): reads the table N rows at a time and keeps only mergeable state, so memory
+#follows the chunk size and the number of metrics, not the number of rows.
+#  - exact counters (rows, blanks, missing, casts, non-finite, variant counts) and Welford moments per (metric, variant)
+#  - KLL quantile sketches for p50/p90 and the IQR outlier rule (only when the distribution check runs)
+#  - exact unique/duplicate users from 64-bit user hashes, spilled to hash partitions on disk for large tables
+#  - the first max_rows matching rows per finding as examples
+#Findings are built by the same report functions as the in-memory doctor.
+
+_MAX_EXAMPLES = 30
+#Buffered user hashes before spilling to partition files (8 bytes each)
+_SPILL_HASHES = 4_000_000
+_HASH_PARTS = 64
+
+
+def _source_columns(path: Path) -> list[str]:
+    suf = path.suffix.lower()
+    if suf == ".csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    if suf in (".parquet", ".pq"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("ab doctor --chunk-rows on Parquet needs pyarrow. Install with: pip install pyarrow") from None
+        return list(pq.ParquetFile(path).schema_arrow.names)
+    raise SystemExit("Unsupported file type. Use .csv or .parquet")
+
+
+def _iter_chunks(path: Path, columns: list[str] | None, chunk_rows: int, as_str: list[str] = ()):
+    #Yields frames with stripped column names. `as_str` columns are read as strings from CSV so that ids keep one
+    #type across chunks (pandas infers CSV dtypes per chunk).
+    raw = {c.strip(): c for c in _source_columns(path)}
+    names = list(raw) if columns is None else list(dict.fromkeys(columns))
+    read = [raw[c] for c in names if c in raw]
+    if path.suffix.lower() == ".csv":
+        reader = pd.read_csv(path, usecols=read, chunksize=chunk_rows, dtype={raw[c]: str for c in as_str if c in raw})
+    else:
+        import pyarrow.parquet as pq
+        reader = (b.to_pandas() for b in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=read))
+    for chunk in reader:
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk
+
+
+def _read_head(path: Path, n: int) -> pd.DataFrame:
+    #First chunk only: used for column checks and default metric detection
+    if not path.exists():
+        raise SystemExit(f"File not found: {path}")
+    for chunk in _iter_chunks(path, None, n):
+        return chunk
+    return pd.DataFrame(columns=[c.strip() for c in _source_columns(path)])
+
+
+class _FirstRows:
+    #First `limit` rows matching a mask, across chunks
+    def __init__(self, limit: int = _MAX_EXAMPLES) -> None:
+        self.limit = limit
+        self.parts: list[pd.DataFrame] = []
+        self.n = 0
+
+    @property
+    def full(self) -> bool:
+        return self.n >= self.limit
+
+    def add(self, frame: pd.DataFrame, mask=None) -> None:
+        if self.full:
+            return
+        need = self.limit - self.n
+        if mask is None:
+            part = frame.iloc[:need]
+        else:
+            part = frame.iloc[np.flatnonzero(np.asarray(mask, dtype=bool))[:need]]
+        if len(part):
+            self.parts.append(part.copy())
+            self.n += len(part)
+
+    def frame(self, columns: list[str]) -> pd.DataFrame:
+        if not self.parts:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(self.parts, ignore_index=True)[columns]
+
+
+def _smallest(x: np.ndarray, n: int) -> np.ndarray:
+    #Positions of the n smallest values (earlier positions first on ties), in position order
+    if len(x) <= n:
+        return np.arange(len(x))
+    t = np.partition(x, n - 1)[n - 1]
+    below = np.flatnonzero(x < t)
+    return np.sort(np.concatenate([below, np.flatnonzero(x == t)[:n - len(below)]]))
+
+
+def _merge_counts(parts: list[pd.Series]) -> pd.Series:
+    #Sum per-chunk value_counts, largest first (like value_counts on the whole column)
+    if not parts:
+        return pd.Series(dtype="int64")
+    out = pd.concat(parts).groupby(level=0, dropna=False, sort=False).sum()
+    return out.sort_values(ascending=False, kind="stable").astype("int64")
+
+
+def _merge_dtype(a: str | None, b: str) -> str:
+    #dtype the whole column would get when read at once
+    if a is None or a == b:
+        return b
+    if "object" in (a, b) or "string" in (a, b):
+        return "object"
+    if a.startswith(("int", "float", "bool")) and b.startswith(("int", "float", "bool")):
+        return "float64"
+    return "object"
+
+
+class KLLSketch:
+    #Mergeable quantile sketch (KLL): level h holds items of weight 2**h; a full level is sorted and every other
+    #item (random offset) is promoted. Exact while everything fits in level 0; the rank error shrinks roughly as 1/k.
+    def __init__(self, k: int = 1024, rng: np.random.Generator | None = None) -> None:
+        self.k = k
+        self.n = 0
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self._rng = rng if rng is not None else np.random.default_rng(0)
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - h - 1
+        return max(8, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def update(self, values: np.ndarray) -> None:
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, lv in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], lv])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            lv = self.levels[h]
+            if len(lv) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                lv = np.sort(lv, kind="stable")
+                odd = len(lv) % 2
+                self.levels[h] = lv[len(lv) - odd:]
+                promoted = lv[self._rng.integers(2):len(lv) - odd:2]
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    @property
+    def exact(self) -> bool:
+        return all(len(lv) == 0 for lv in self.levels[1:])
+
+    def _weighted(self) -> tuple[np.ndarray, np.ndarray]:
+        vals = np.concatenate(self.levels)
+        w = np.concatenate([np.full(len(lv), 2 ** h, dtype=np.int64) for h, lv in enumerate(self.levels)])
+        order = np.argsort(vals, kind="stable")
+        return vals[order], np.cumsum(w[order])
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            return np.nan
+        if self.exact:
+            s = np.sort(self.levels[0])[None, :]
+            return float(_quantiles_sorted(s, np.array([len(self.levels[0])]), q)[0])
+        vals, cw = self._weighted()
+        target = q * (cw[-1] - 1)
+        i = int(np.searchsorted(cw, target, side="right"))
+        return float(vals[min(i, len(vals) - 1)])
+
+    def rank(self, x: float, inclusive: bool = False) -> int:
+        #Weight of items < x (<= x with inclusive)
+        if self.n == 0:
+            return 0
+        vals, cw = self._weighted()
+        i = int(np.searchsorted(vals, x, side="right" if inclusive else "left"))
+        return int(cw[i - 1]) if i > 0 else 0
+
+
+class _UserHashes:
+    #Exact unique/duplicate user counts from 64-bit hashes. Hashes are buffered in memory and spilled to partition
+    #files (by the top hash bits) once the buffer is large, so each partition can be counted on its own.
+    def __init__(self) -> None:
+        self.buffer: list[np.ndarray] = []
+        self.buffered = 0
+        self.null_rows = 0
+        self._tmp: tempfile.TemporaryDirectory | None = None
+
+    def add(self, users: pd.Series) -> None:
+        nulls = users.isna().to_numpy()
+        self.null_rows += int(nulls.sum())
+        h = pd.util.hash_pandas_object(users[~nulls], index=False).to_numpy()
+        self.buffer.append(h)
+        self.buffered += len(h)
+        if self.buffered >= _SPILL_HASHES:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._tmp is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="abx_doctor_")
+        h = np.concatenate(self.buffer) if self.buffer else np.empty(0, dtype=np.uint64)
+        part = (h >> np.uint64(58)).astype(np.int64)
+        order = np.argsort(part, kind="stable")
+        bounds = np.searchsorted(part[order], np.arange(_HASH_PARTS + 1))
+        for i in range(_HASH_PARTS):
+            chunk = h[order[bounds[i]:bounds[i + 1]]]
+            if len(chunk):
+                with open(Path(self._tmp.name) / f"part_{i:02d}.u64", "ab") as f:
+                    chunk.tofile(f)
+        self.buffer = []
+        self.buffered = 0
+
+    def _partitions(self):
+        if self._tmp is None:
+            yield np.concatenate(self.buffer) if self.buffer else np.empty(0, dtype=np.uint64)
+            return
+        self._spill()
+        for i in range(_HASH_PARTS):
+            path = Path(self._tmp.name) / f"part_{i:02d}.u64"
+            if path.exists():
+                yield np.fromfile(path, dtype=np.uint64)
+
+    def finish(self) -> dict:
+        #Counts by hash. A duplicated hash is a duplicated id unless two ids collide on it: dup_hashes (every duplicated
+        #hash, ascending) is what _verify_duplicates checks against the ids themselves.
+        n_users = dup_users = dup_rows = 0
+        dup_hashes: list[np.ndarray] = []
+        for h in self._partitions():
+            u, c = np.unique(h, return_counts=True)
+            n_users += len(u)
+            d = c > 1
+            dup_users += int(d.sum())
+            dup_rows += int(c[d].sum())
+            if d.any():
+                dup_hashes.append(u[d])
+        #Missing user ids duplicate each other (same as DataFrame.duplicated)
+        if self.null_rows > 1:
+            dup_rows += self.null_rows
+        if self._tmp is not None:
+            self._tmp.cleanup()
+        dups = np.concatenate(dup_hashes) if dup_hashes else np.empty(0, dtype=np.uint64)
+        return {"n_users": n_users, "dup_users": dup_users, "dup_rows": dup_rows, "dup_hashes": dups, "null_rows": self.null_rows}
+
+
+def _verify_duplicates(chunks, user: str, variant: str, users: dict, max_rows: int) -> tuple[dict, pd.DataFrame]:
+    #Second pass (user/variant only) over the rows whose hash is duplicated. Rows are counted per (hash, id), so ids that
+    #only share a 64-bit hash are told apart exactly; memory follows the number of duplicated ids, not rows.
+    #Examples: the first max_rows duplicated rows ordered by id (stable, missing ids last). While scanning, only the rows
+    #of the max_rows smallest candidate ids are kept (at most max_rows rows each), so colliding ids dropped at the end
+    #cannot leave the examples short unless half of those ids collide.
+    dup_set = users["dup_hashes"]
+    counts: list[pd.Series] = []
+    examples = None
+    null_rows = _FirstRows(max_rows)
+    for chunk in chunks:
+        nulls = chunk[user].isna().to_numpy()
+        h = pd.util.hash_pandas_object(chunk[user], index=False).to_numpy()
+        hit = np.isin(h, dup_set) & ~nulls
+        if hit.any():
+            ids = chunk[user].to_numpy()[hit]
+            counts.append(pd.Series(1, index=pd.MultiIndex.from_arrays([h[hit], ids])).groupby(level=[0, 1]).sum())
+            if len(counts) > 16:
+                counts = [pd.concat(counts).groupby(level=[0, 1]).sum()]
+            if max_rows:
+                part = chunk.loc[hit, [user, variant]].assign(_h=h[hit])
+                examples = part if examples is None else pd.concat([examples, part], ignore_index=True)
+                examples = examples.sort_values(user, kind="stable")
+                first_ids = examples[user].rank(method="dense").to_numpy() <= max_rows
+                examples = examples[first_ids & (examples.groupby(user, sort=False).cumcount().to_numpy() < max_rows)]
+        if users["null_rows"] > 1:
+            null_rows.add(chunk[[user, variant]], nulls)
+
+    per_id = pd.concat(counts).groupby(level=[0, 1]).sum() if counts else pd.Series(dtype="int64")
+    dup = per_id[per_id > 1]
+    ids_per_hash = per_id.groupby(level=0).size()
+    users = dict(users)
+    users["n_users"] += int((ids_per_hash - 1).sum())
+    users["dup_users"] = int(len(dup))
+    users["dup_rows"] = int(dup.sum()) + (users["null_rows"] if users["null_rows"] > 1 else 0)
+
+    parts = []
+    if examples is not None:
+        #Rows of colliding ids are not duplicates
+        key = pd.MultiIndex.from_arrays([examples["_h"].to_numpy(), examples[user].to_numpy()])
+        parts.append(examples[key.isin(dup.index)].drop(columns="_h"))
+    parts.append(null_rows.frame([user, variant]))
+    return users, pd.concat(parts, ignore_index=True)
+
+
+class StreamMetricStats:
+    #Same interface as doctor_stats.MetricStats, built from chunks
+    approximate = True
+
+    def __init__(self, user: str, variant: str, metrics: list[str], quantiles: bool = True, max_rows: int = _MAX_EXAMPLES) -> None:
+        self.user = user
+        self.variant = variant
+        self.metrics = list(dict.fromkeys(metrics))
+        self.quantiles = quantiles
+        self.max_rows = max_rows
+        self._pos = {m: i for i, m in enumerate(self.metrics)}
+        k = len(self.metrics)
+        self.n_rows = 0
+        #File position of the current chunk's first row (ties between outlier examples go to the earlier row)
+        self._row0 = 0
+        self._dtypes: list[str | None] = [None] * k
+        self._n_01 = np.zeros(k, dtype=np.int64)
+        #Per variant label (None = missing): counters, moments and sketches
+        self._acc: dict = {}
+        self._rng = np.random.default_rng(0)
+        self._examples = {(kind, m): _FirstRows(max_rows) for kind in ("head", "missing", "bad_cast", "nonfinite", "bad_binary") for m in self.metrics}
+        #Rows with the smallest and the largest values per metric: the outlier examples (farthest outside the IQR fences,
+        #which are known only at the end) are among them on either side
+        self._low: dict[str, pd.DataFrame] = {}
+        self._high: dict[str, pd.DataFrame] = {}
+
+    def _new_acc(self) -> dict:
+        k = len(self.metrics)
+        acc = {c: np.zeros(k) for c in ("missing", "count", "nonfinite", "sum", "sumsq", "mean", "m2")}
+        acc["users"] = 0
+        acc["min"] = np.full(k, np.nan)
+        acc["max"] = np.full(k, np.nan)
+        acc["sketch"] = [KLLSketch(rng=self._rng) for _ in range(k)] if self.quantiles else None
+        return acc
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        k = len(self.metrics)
+        self.n_rows += len(chunk)
+        if not k:
+            return
+        for i, m in enumerate(self.metrics):
+            self._dtypes[i] = _merge_dtype(self._dtypes[i], str(chunk[m].dtype))
+        block = np.vstack([_numeric_column(chunk[m]) for m in self.metrics])
+        self._n_01 += ((block == 0) | (block == 1)).sum(axis=1)
+        parsed = {i: chunk[m].isna().to_numpy() for i, m in enumerate(self.metrics) if not pd.api.types.is_numeric_dtype(chunk[m])}
+
+        codes, labels = pd.factorize(chunk[self.variant], use_na_sentinel=False)
+        for g, label in enumerate(labels):
+            key = None if pd.isna(label) else label
+            mask = codes == g
+            sub = block[:, mask]
+            st = _block_stats(sub, quantiles=False)
+            acc = self._acc.get(key)
+            if acc is None:
+                acc = self._acc[key] = self._new_acc()
+            n_g = int(mask.sum())
+            missing = n_g - st["count"]
+            for i, miss in parsed.items():
+                missing[i] = miss[mask].sum()
+
+            #Chan et al. merge of (count, mean, M2)
+            na, nb = acc["count"], st["count"].astype(float)
+            n = na + nb
+            with np.errstate(invalid="ignore", divide="ignore"):
+                delta = np.where(nb > 0, st["mean"], 0.0) - acc["mean"]
+                acc["mean"] = np.where(n > 0, acc["mean"] + delta * nb / np.maximum(n, 1), 0.0)
+                acc["m2"] = acc["m2"] + np.where(nb > 0, st["m2"], 0.0) + np.where(n > 0, delta * delta * na * nb / np.maximum(n, 1), 0.0)
+            acc["count"] = n
+            acc["users"] += n_g
+            acc["missing"] += missing
+            acc["nonfinite"] += st["nonfinite"]
+            acc["sum"] += st["sum"]
+            acc["sumsq"] += st["sumsq"]
+            acc["min"] = np.fmin(acc["min"], st["min"])
+            acc["max"] = np.fmax(acc["max"], st["max"])
+            if acc["sketch"] is not None:
+                for i in range(k):
+                    x = sub[i]
+                    acc["sketch"][i].update(x[~np.isnan(x)])
+
+        self._collect_examples(chunk, block)
+        self._row0 += len(chunk)
+
+    def _collect_examples(self, chunk: pd.DataFrame, block: np.ndarray) -> None:
+        for i, m in enumerate(self.metrics):
+            cols = [self.user, self.variant, m]
+            x = block[i]
+            ex = self._examples
+            if not ex[("head", m)].full:
+                ex[("head", m)].add(chunk[cols])
+            if not ex[("missing", m)].full:
+                ex[("missing", m)].add(chunk[cols], chunk[m].isna().to_numpy())
+            if not ex[("bad_cast", m)].full:
+                ex[("bad_cast", m)].add(chunk[cols], chunk[m].notna().to_numpy() & np.isnan(x))
+            if not ex[("nonfinite", m)].full:
+                ex[("nonfinite", m)].add(chunk[cols], np.isinf(x))
+            if not ex[("bad_binary", m)].full:
+                ex[("bad_binary", m)].add(chunk[cols], ~np.isnan(x) & (x != 0) & (x != 1))
+
+            n = self.max_rows
+            if self.quantiles and n:
+                valid = np.flatnonzero(~np.isnan(x))
+                for side, sign in ((self._low, 1.0), (self._high, -1.0)):
+                    pick = valid[_smallest(sign * x[valid], n)]
+                    cand = chunk[cols].iloc[pick].assign(_x=x[pick], _row=self._row0 + pick)
+                    prev = side.get(m)
+                    both = cand if prev is None else pd.concat([prev, cand], ignore_index=True)
+                    side[m] = both.iloc[_smallest(sign * both["_x"].to_numpy(), n)].reset_index(drop=True)
+
+    def finish(self) -> None:
+        k = len(self.metrics)
+        keys = sorted(key for key in self._acc if key is not None)
+        if None in self._acc:
+            keys.append(None)
+        self.labels = pd.Index([np.nan if key is None else key for key in keys], dtype=object)
+        self.n_variants = len(keys)
+        cols = {c: np.full((len(keys), k), np.nan) for c in _BY_VARIANT_COLS}
+        for g, key in enumerate(keys):
+            acc = self._acc[key]
+            count = acc["count"]
+            cols["users"][g] = acc["users"]
+            for c in ("missing", "count", "nonfinite", "sum", "sumsq", "min", "max"):
+                cols[c][g] = acc[c]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                cols["mean"][g] = np.where(count > 0, acc["sum"] / np.maximum(count, 1), np.nan)
+                cols["std"][g] = np.where((count > 1) & (acc["nonfinite"] == 0), np.sqrt(np.maximum(acc["m2"], 0.0) / (count - 1)), np.nan)
+            if acc["sketch"] is not None:
+                cols["p50"][g] = [sk.quantile(0.50) for sk in acc["sketch"]]
+                cols["p90"][g] = [sk.quantile(0.90) for sk in acc["sketch"]]
+
+        out = {
+            "metric": np.repeat(np.array(self.metrics, dtype=object), len(keys)),
+            self.variant: np.tile(self.labels.to_numpy(dtype=object), k),
+        }
+        for c in _BY_VARIANT_COLS:
+            out[c] = cols[c].T.ravel()
+        for c in ("users", "missing", "count", "nonfinite"):
+            out[c] = out[c].astype("int64")
+        self._columns = out
+        self.by_variant = pd.DataFrame(out)
+
+        per = {c: cols[c].T for c in ("missing", "count", "nonfinite", "min", "max")}
+        overall = pd.DataFrame({
+            "dtype": [d or "object" for d in self._dtypes],
+            "n_rows": self.n_rows,
+            "missing": per["missing"].sum(axis=1).astype("int64"),
+            "count": per["count"].sum(axis=1).astype("int64"),
+            "nonfinite": per["nonfinite"].sum(axis=1).astype("int64"),
+        }, index=pd.Index(self.metrics, name="metric"))
+        overall["bad_cast"] = (self.n_rows - overall["missing"] - overall["count"]).astype("int64")
+        overall["n_01"] = self._n_01
+        overall["min"] = np.fmin.reduce(per["min"], axis=1) if keys else np.nan
+        overall["max"] = np.fmax.reduce(per["max"], axis=1) if keys else np.nan
+
+        #Overall sketch per metric = merge of its per-variant sketches
+        self._sketch = {}
+        if self.quantiles:
+            for i, m in enumerate(self.metrics):
+                sk = KLLSketch(rng=np.random.default_rng(i))
+                for key in keys:
+                    sk.merge(self._acc[key]["sketch"][i])
+                self._sketch[m] = sk
+            overall["q1"] = [self._sketch[m].quantile(0.25) for m in self.metrics]
+            overall["q3"] = [self._sketch[m].quantile(0.75) for m in self.metrics]
+        else:
+            overall["q1"] = np.nan
+            overall["q3"] = np.nan
+        self.overall = overall
+        self.approximate = self.quantiles and not all(sk.exact for sk in self._sketch.values())
+
+    def metric(self, m: str) -> pd.DataFrame:
+        i = self._pos[m]
+        k = self.n_variants
+        return pd.DataFrame({c: a[i * k:(i + 1) * k] for c, a in self._columns.items() if c != "metric"})
+
+    def examples(self, kind: str, m: str) -> pd.DataFrame:
+        return self._examples[(kind, m)].frame([self.user, self.variant, m])
+
+    def outlier_count(self, m: str, lo: float, hi: float) -> tuple[int, bool]:
+        sk = self._sketch[m]
+        return int(sk.rank(lo) + (sk.n - sk.rank(hi, inclusive=True))), not sk.exact
+
+    def outlier_examples(self, m: str, lo: float, hi: float) -> pd.DataFrame:
+        #Same rows and order as doctor_stats._outlier_rows: farthest outside the fences first, earlier rows first on ties
+        if m not in self._low:
+            return pd.DataFrame(columns=[self.user, self.variant, m])
+        ex = pd.concat([self._low[m], self._high[m]], ignore_index=True).drop_duplicates("_row")
+        x = ex["_x"].to_numpy()
+        out = (x < lo) | (x > hi)
+        ex, x = ex[out], x[out]
+        order = np.lexsort((ex["_row"].to_numpy(), -_fence_distance(x, lo, hi)))[:self.max_rows]
+        return ex.iloc[order].drop(columns=["_x", "_row"]).reset_index(drop=True)
+
+
+def _doctor_checks_stream(path: Path, args: argparse.Namespace, prof: Profiler | None = None, max_rows: int = _MAX_EXAMPLES) -> list[dict]:
+    if prof is None:
+        prof = Profiler("doctor")
+    what_to_check = _doctor_plan(args)
+    user, variant = args.user, args.variant
+    segments = _segment_columns(args, what_to_check)
+    time_col = _time_column(args, what_to_check)
+    bucket = getattr(args, "time_bucket", None) or "day"
+
+    available = [c.strip() for c in _source_columns(path)]
+    missing = [c for c in [user, variant] + segments + ([time_col] if time_col else []) + list(args.metrics) if c not in available]
+    if missing:
+        raise SystemExit(f"Missing columns: {missing}\nAvailable columns: {available}")
+
+    need_users = bool({"integrity", "variants"} & set(what_to_check))
+    need_metrics = bool({"missingness", "metrics", "distribution", "metric_arm_n"} & set(what_to_check))
+    stats = StreamMetricStats(user, variant, args.metrics if need_metrics else [], quantiles="distribution" in what_to_check, max_rows=max_rows)
+    hashes = _UserHashes() if need_users else None
+    bad_user, bad_variant = _FirstRows(max_rows), _FirstRows(max_rows)
+    n_bad_user = n_bad_variant = 0
+    variant_parts: list[pd.Series] = []
+    alloc_parts: list[pd.Series] = []
+    segment_parts: list[pd.DataFrame] = []
+    time_parts: list[pd.DataFrame] = []
+    consistency: dict = {}
+    n_rows = 0
+
+    #One pass over the file; every state below merges across chunks
+    prof.start("scan")
+    columns = list(dict.fromkeys([user, variant] + segments + ([time_col] if time_col else []) + list(stats.metrics)))
+    for chunk in _iter_chunks(path, columns, args.chunk_rows, as_str=[user, variant] + segments):
+        n_rows += len(chunk)
+        #User/variant checks of a chunk share one distinct-value view per column
+        views = _StringViews(chunk)
+        if hashes is not None:
+            hashes.add(chunk[user])
+        if "integrity" in what_to_check:
+            m_user = views[user].blank()
+            m_var = views[variant].blank()
+            n_bad_user += int(m_user.sum())
+            n_bad_variant += int(m_var.sum())
+            bad_user.add(chunk[[user, variant]], m_user)
+            bad_variant.add(chunk[[user, variant]], m_var)
+        if "variants" in what_to_check:
+            variant_parts.append(views[variant].value_counts(views[variant].stripped, variant))
+        if "allocation" in what_to_check and args.allocation is not None:
+            alloc_parts.append(_allocation_counts(chunk, variant, views))
+        if segments:
+            segment_parts.append(_segment_counts(chunk, variant, segments, views))
+        if time_col:
+            time_parts.append(_time_counts(chunk, variant, time_col, bucket, views))
+        if "consistency" in what_to_check:
+            part = _consistency_summary(chunk, user, variant, views)
+            for key, val in part.items():
+                if key.endswith("_examples"):
+                    rows = consistency.setdefault(key, _FirstRows(max_rows))
+                    if not rows.full:
+                        rows.add(val(rows.limit - rows.n))
+                else:
+                    consistency[key] = consistency.get(key, 0) + val
+        stats.update(chunk)
+    prof.stop(rows_out=n_rows)
+
+    with prof.stage("merge"):
+        stats.finish()
+        users = hashes.finish() if hashes is not None else {"n_users": None, "dup_users": 0, "dup_rows": 0, "dup_hashes": np.empty(0), "null_rows": 0}
+
+    #Duplicated hashes are verified against the ids (and their examples collected) in a second pass over user/variant:
+    #which hashes are duplicated is known only at the end
+    dup_examples = pd.DataFrame(columns=[user, variant])
+    if len(users["dup_hashes"]) or (users["null_rows"] > 1 and "integrity" in what_to_check and max_rows):
+        with prof.stage("scan_duplicates"):
+            chunks = _iter_chunks(path, [user, variant], args.chunk_rows, as_str=[user, variant])
+            users, dup_examples = _verify_duplicates(chunks, user, variant, users, max_rows if "integrity" in what_to_check else 0)
+
+    report_items: list[dict] = []
+    if "integrity" in what_to_check:
+        with prof.stage("check:integrity", rows_in=n_rows):
+            _integrity_report({
+                "n_rows": n_rows, "n_users": users["n_users"],
+                "bad_user": n_bad_user, "bad_user_examples": bad_user.frame([user, variant]),
+                "bad_variant": n_bad_variant, "bad_variant_examples": bad_variant.frame([user, variant]),
+                "dup_users": users["dup_users"], "dup_rows": users["dup_rows"], "dup_examples": dup_examples,
+            }, user, variant, report_items, max_rows=max_rows)
+
+    if "variants" in what_to_check:
+        with prof.stage("check:variants", rows_in=n_rows):
+            _variant_report({"counts": _merge_counts(variant_parts).rename_axis(variant), "n_users": users["n_users"]}, variant, args.min_n, report_items, max_rows=max_rows)
+
+    if "missingness" in what_to_check:
+        with prof.stage("check:missingness", rows_in=n_rows):
+            _missingness(stats, report_items, max_rows=max_rows)
+
+    if "metrics" in what_to_check:
+        with prof.stage("check:metrics", rows_in=n_rows):
+            _metrics_check(stats, args.preview, report_items, max_rows=max_rows)
+
+    if "consistency" in what_to_check:
+        with prof.stage("check:consistency", rows_in=n_rows):
+            s = {k: (v.frame([user, variant]) if isinstance(v, _FirstRows) else v) for k, v in consistency.items()}
+            if s:
+                _consistency_report(s, user, variant, report_items, max_rows=max_rows)
+
+    if "distribution" in what_to_check:
+        with prof.stage("check:distribution", rows_in=n_rows):
+            _distribution(stats, report_items, max_rows=max_rows)
+
+    if "metric_arm_n" in what_to_check:
+        with prof.stage("check:metric_arm_n", rows_in=n_rows):
+            _metric_arm_n_check(stats, args.min_n_metric, report_items, max_rows=max_rows)
+
+    if "allocation" in what_to_check:
+        with prof.stage("check:allocation", rows_in=n_rows):
+            _allocation_report(_merge_counts(alloc_parts), variant, args.allocation, args.alpha, report_items, max_rows=max_rows)
+
+    if segments:
+        with prof.stage("check:segment_srm", rows_in=n_rows):
+            _segment_srm_report(_merge_segment_counts(segment_parts, variant), variant, args.allocation, args.alpha, report_items, max_rows=max_rows)
+
+    if time_col:
+        with prof.stage("check:time_srm", rows_in=n_rows):
+            _time_srm_report(_merge_time_counts(time_parts, variant), variant, time_col, bucket, args.allocation, args.alpha, report_items, max_rows=max_rows)
+
+    return report_items
@@ -1,6 +1,5 @@
 import argparse
-from abx.cli.convert_cmd import add_convert_subcommand
-from abx.cli.doctor_cmd import add_doctor_subcommand
+from abx.cli.parsers import add_convert_subcommand, add_doctor_subcommand, add_run_subcommand, add_synth_subcommand
 
 def main() -> None:
     parser = argparse.ArgumentParser(prog="abx", formatter_class=argparse.RawTextHelpFormatter)
@@ -12,6 +11,10 @@ def main() -> None:
     add_convert_subcommand(subparsers)
     #Register: abx doctor ...
     add_doctor_subcommand(subparsers)
+    #Register: abx run ...
+    add_run_subcommand(subparsers)
+    #Register: abx synth ...
+    add_synth_subcommand(subparsers)
 
 
     args = parser.parse_args()
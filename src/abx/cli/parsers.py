@@ -0,0 +1,187 @@
+import argparse
+import importlib
+from pathlib import Path
+from abx.cli.profiling import add_profile_arguments
+
+#Argument parsers for every subcommand, kept apart from the implementations.
+#This module must stay free of pandas/numpy: `--help`, `--version` and `--examples` only import this,
+#and the command module is imported when its command actually runs.
+_EVENTS_METRIC_EXAMPLES_TEXT = Path(__file__).with_name("EVENTS_METRIC_EXAMPLES_TEXT.txt")
+_UNIT_METRIC_EXAMPLES_TEXT = Path(__file__).with_name("UNIT_METRIC_EXAMPLES_TEXT.txt")
+_TIME_FORMATS = ["iso_z", "iso_offset", "naive", "mixed", "native"]
+
+
+def _command(module: str, func: str, examples: Path | None = None):
+    def run(args: argparse.Namespace) -> None:
+        if examples is not None and getattr(args, "examples", False):
+            print(examples.read_text(encoding="utf-8"))
+            return
+        getattr(importlib.import_module(module), func)(args)
+
+    run.__qualname__ = f"{module}.{func}"
+    return run
+
+
+#Input/column/metric options shared by `convert unit` and `run unit`
+def _add_unit_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--data", metavar="PATH", default=None, help="| Path to CSV or Parquet file")
+    parser.add_argument("--user", metavar="COL", default=None, help="| User/unit id column name")
+    parser.add_argument("--variant", metavar="COL", default=None, help="| Treatment/variant column name")
+    parser.add_argument("--outcome", metavar="COL", default=None, help="| Outcome/metric column name")
+    parser.add_argument("--metric", metavar="SPEC", action="append", default=None, help="| Metric spec (repeatable). Unit: NAME=TYPE:fix(COL). See: ab convert unit --examples")
+    parser.add_argument("--examples",action="store_true",help="| Print metric DSL examples and exit")
+    parser.add_argument("--segment", metavar="COL", action="append", default=None, help="| Segment column (repeatable). Example: --segment country --segment device")
+    parser.add_argument("--segment-rule", choices=["error", "first", "last", "mode"], default="error", help="| How to resolve inconsistent segment values per user (default: error)")
+    parser.add_argument("--segment-fix", action="store_true", help="| Apply string standardization to all segment columns before resolving.")
+    parser.add_argument("--segment-fix-opt", action="append", default=None, metavar="KEY=VAL", help="| Segment fix option (repeatable). Example: --segment-fix-opt lower=1 --segment-fix-opt spaces=underscore")
+    parser.add_argument("--keep", metavar="COL,COL",default=None, help="| Comma-separated extra columns to keep (optional)")
+    parser.add_argument("--dedupe", choices=["error", "first", "last"], default=None, help="| What to do if multiple rows per user exist")
+
+
+#Input/column/metric options shared by `convert events` and `run events`
+def _add_events_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--data", metavar = "PATH", default=None, help="| Path to CSV or Parquet file")
+    parser.add_argument("--user", metavar = "COL", default=None, help="| User/unit id column name")
+    parser.add_argument("--variant", metavar = "COL", default=None, help="| Treatment/variant column name")
+    parser.add_argument("--time", metavar = "COL", default=None, help="| Event timestamp column name")
+    parser.add_argument("--event", metavar = "COL", default=None, help="| Event type/category column name")
+    parser.add_argument("--value", metavar = "COL", default=None, help="| Event numeric value column name (like purchase amount)")
+    parser.add_argument("--exposure", metavar = "VALUE", default=None, help="| Value in Event type column identifying exposure. Users without exposure are dropped")
+    parser.add_argument("--multiexposure", choices=["error", "first", "last"], default=None, help="| A fallback if there are multiple exposure event per user (default: first)")
+    parser.add_argument("--unassigned", choices=["error", "drop", "keep"], default=None, help="| What to do if a user has no assigned variant after conversion (default: error)")
+    parser.add_argument("--multivariant", choices=["error", "first", "last", "mode", "from_exposure"], default=None, help="| A fallback if there are multiple variants per user (default: error)")
+    parser.add_argument("--window", metavar = "DURATION", default=None, help="| Outcome window after exposure (e.g., 7d, 24h). Only used when exposure-event is provided")
+    parser.add_argument("--metric", metavar="SPEC", action="append", default=None, help="| Metric spec (repeatable). Events: NAME=TYPE:RULE(EVENT[, key=value ...]). See: ab convert events --examples")
+    parser.add_argument("--examples",action="store_true",help="| Print metric DSL examples and exit")
+    parser.add_argument("--segment", metavar="COL", action="append", default=None, help="| Segment column (repeatable). Example: --segment country --segment device")
+    parser.add_argument("--segment-rule", choices=["error", "first", "last", "mode", "from_exposure"], default="error", help="| How to resolve inconsistent segment values per user (default: error). from_exposure requires --exposure.")
+    parser.add_argument("--segment-fix", action="store_true", help="| Apply string standardization to all segment columns before resolving.")
+    parser.add_argument("--segment-fix-opt", action="append", default=None, metavar="KEY=VAL", help="| Segment fix option (repeatable). Example: --segment-fix-opt lower=1 --segment-fix-opt spaces=underscore")
+
+
+#Check selection, thresholds and report options shared by `doctor` and `run`
+def _add_doctor_check_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--metrics", metavar="COL,COL", default=None, help="| Comma-separated metric columns to check (default: numeric columns except user/variant)")
+    parser.add_argument("--ignore", metavar="COL,COL", default=None, help="| Comma-separated columns to ignore (e.g., keep cols like device,country)")
+    parser.add_argument("--segments", metavar="COL,COL", default=None, help="| Segment columns for the per-segment SRM check; turns the check on (with --check segment_srm alone: text/categorical columns that are not metrics)")
+    parser.add_argument("--time-col", metavar="COL", default=None, help="| Time column for the time-sliced SRM check; turns the check on (with --check time_srm alone: exposure_time when present)")
+    parser.add_argument("--time-bucket", choices=["day", "hour"], default=None, help="| Bucket size for the time-sliced SRM check (default: day)")
+    parser.add_argument("--allocation", metavar="SPEC", default=None, help="| Expected allocation: 'equal' or 'A=0.5,B=0.3,C=0.2' (optional)")
+    parser.add_argument("--alpha", metavar="FLOAT", type=float, default=None, help="| Alpha for allocation/SRM-style checks (default: 0.01)")
+    parser.add_argument("--min-n", metavar="N", type=int, default=None, help="| Warn if any variant has fewer than N users (optional)")
+    parser.add_argument("--min-n-metric", metavar="N", type=int, default=None, help="| Warn if any metric has < N non-missing users in any variant (optional)")
+    parser.add_argument("--only", choices=["errors", "warnings", "all"], default=None, help="| What to report: errors, warnings, or all (default: all)")
+    parser.add_argument("--fail-on", choices=["error", "warn"], default=None, help="| Exit nonzero on errors only (default) or errors+warnings")
+    parser.add_argument("--no-exit", action="store_true", help="| Always exit 0 (still prints report)")
+    parser.add_argument("--report", metavar="PATH", default=None, help="| Write report to file (.md ot .json) (optional)")
+    parser.add_argument("--check", metavar="NAME,NAME", default=None, help="| Comma-separated checks to run ---(e.g., integrity,variants,missingness,allocation,metrics,consistency)")
+    parser.add_argument("--skip", metavar="NAME,NAME", default=None, help="| Comma-separated checks to skip")
+    parser.add_argument("--workers", metavar="N", type=int, default=None, help="| Run checks and per-metric statistics on N threads (default: 1). With a glob --data: check N tables at once in worker processes")
+    parser.add_argument("--cache", metavar="DIR", default=None, help="| Cache per-column results in DIR; reruns recompute only columns whose content changed")
+
+
+def add_convert_subcommand(subparsers: argparse._SubParsersAction) -> None:
+    convert_parser = subparsers.add_parser( "convert", help="| Convert data to canonical user-level format")
+    convert_subparsers = convert_parser.add_subparsers(dest="convert_cmd", required=True)
+
+    #ab convert unit
+    unit_parser = convert_subparsers.add_parser("unit", help="| Manual conversion/standardization for unit-level data (one row per user)")
+    _add_unit_arguments(unit_parser)
+    unit_parser.add_argument("--out", metavar="PATH", help="| Output path (.csv or .parquet) (either --preview or --out)")
+    unit_parser.add_argument("--preview", action="store_true", help="| Preview converted data without outputing (either --preview or --out)")
+    unit_parser.add_argument("--preview-sample", metavar="FRACTION", default=None, help="| Preview on a stable hash sample of users (e.g., 0.1%% or 0.001). Implies --preview")
+    unit_parser.add_argument("--sample-users", metavar="FRACTION[,SALT]", default=None, help="| Convert only a stable hash sample of users (e.g., 1%% or 0.01,exp42). Works with --out and --preview")
+    unit_parser.add_argument("--write-stats", action="store_true", help="| Also write OUT.stats.json with per-variant column statistics for `ab doctor --use-stats`")
+    unit_parser.add_argument("--save-config", metavar="PATH", default=None, help="| Write merged arguments to a JSON config file (optional, should end in .json)")
+    unit_parser.add_argument("--config", metavar="PATH", default=None, help="| Load arguments from a JSON config file (optional, should end in .json)")
+    add_profile_arguments(unit_parser)
+    unit_parser.set_defaults(func=_command("abx.cli.convert_cmd", "_run_unit", examples=_UNIT_METRIC_EXAMPLES_TEXT))
+
+    #ab convert event
+    events_parser = convert_subparsers.add_parser("events", help="| Manual conversion for event-level data (one row per event)")
+    _add_events_arguments(events_parser)
+    events_parser.add_argument("--out", metavar="PATH", help="| Output path (.csv or .parquet) (either --preview or --out)")
+    events_parser.add_argument("--preview", action="store_true", help="| Preview converted data without outputing (either --preview or --out)")
+    events_parser.add_argument("--preview-sample", metavar="FRACTION", default=None, help="| Preview on a stable hash sample of users (e.g., 0.1%% or 0.001). Implies --preview")
+    events_parser.add_argument("--sample-users", metavar="FRACTION[,SALT]", default=None, help="| Convert only a stable hash sample of users (e.g., 1%% or 0.01,exp42). Works with --out and --preview")
+    events_parser.add_argument("--write-stats", action="store_true", help="| Also write OUT.stats.json with per-variant column statistics for `ab doctor --use-stats`")
+    events_parser.add_argument("--save-config", metavar="PATH", default=None, help="| Write merged arguments to a JSON config file (optional, should end in .json)")
+    events_parser.add_argument("--config", metavar="PATH", default=None, help="| Load arguments from a JSON config file (optional, should end in .json)")
+    add_profile_arguments(events_parser)
+    events_parser.set_defaults(func=_command("abx.cli.convert_cmd", "_run_events", examples=_EVENTS_METRIC_EXAMPLES_TEXT))
+
+
+def add_doctor_subcommand(subparsers: argparse._SubParsersAction) -> None:
+    doctor_parser = subparsers.add_parser( "doctor", help="| Validate converted datasets, check if ready to be analysed")
+    doctor_parser.add_argument("--data", metavar="PATH", default=None, help="| Path to converted CSV or Parquet file, or a quoted glob ('outputs/*.parquet') to check many tables")
+    doctor_parser.add_argument("--user", metavar="COL", default=None, help="| User/unit id column name in converted data (default: user_id)")
+    doctor_parser.add_argument("--variant", metavar="COL", default=None, help="| Treatment/variant column name in converted data (default: variant)")
+    _add_doctor_check_arguments(doctor_parser)
+    doctor_parser.add_argument("--by", metavar="COL", default=None, help="| Experiment column (e.g. experiment_id): run all checks per experiment in one pass, with per-experiment readiness")
+    doctor_parser.add_argument("--preview", action="store_true", help="| Preview problem rows/examples")
+    doctor_parser.add_argument("--use-stats", action="store_true", help="| Take metric statistics from DATA.stats.json (written by convert --write-stats) when it matches the file")
+    doctor_parser.add_argument("--metadata-only", action="store_true", help="| Parquet only: check from the file footer (row/null counts, dtypes, min/max) without reading data")
+    doctor_parser.add_argument("--chunk-rows", type=int, metavar="N", default=None, help="| Read the data N rows at a time (for files larger than memory). Quantiles and outlier counts become approximate")
+    doctor_parser.add_argument("--save-config", metavar="PATH", default=None, help="| Write merged arguments to a JSON config file (optional, should end in .json)")
+    doctor_parser.add_argument("--config", metavar="PATH", default=None, help="| Load arguments from a JSON config file (optional, should end in .json)")
+    add_profile_arguments(doctor_parser)
+    doctor_parser.set_defaults(func=_command("abx.cli.doctor_cmd", "_run_doctor"))
+
+
+def add_run_subcommand(subparsers: argparse._SubParsersAction) -> None:
+    run_parser = subparsers.add_parser("run", help="| Convert, then run doctor checks on the converted table in the same process")
+    run_subparsers = run_parser.add_subparsers(dest="run_cmd", required=True)
+
+    for name, add_arguments, examples, help_text in (
+        ("unit", _add_unit_arguments, _UNIT_METRIC_EXAMPLES_TEXT, "| convert unit + doctor"),
+        ("events", _add_events_arguments, _EVENTS_METRIC_EXAMPLES_TEXT, "| convert events + doctor"),
+    ):
+        #ab run unit|events
+        parser = run_subparsers.add_parser(name, help=help_text)
+        add_arguments(parser)
+        parser.add_argument("--sample-users", metavar="FRACTION[,SALT]", default=None, help="| Convert and check only a stable hash sample of users (e.g., 1%% or 0.01,exp42)")
+        parser.add_argument("--out", metavar="PATH", default=None, help="| Also write the converted table (.csv or .parquet) (optional)")
+        parser.add_argument("--write-stats", action="store_true", help="| With --out: also write OUT.stats.json with per-variant column statistics for `ab doctor --use-stats`")
+        _add_doctor_check_arguments(parser)
+        parser.add_argument("--doctor-config", metavar="PATH", default=None, help="| Load doctor options from a JSON config (e.g., written by ab doctor --save-config)")
+        parser.add_argument("--save-config", metavar="PATH", default=None, help="| Write merged arguments to a JSON config file (optional, should end in .json)")
+        parser.add_argument("--config", metavar="PATH", default=None, help="| Load arguments from a JSON config file (e.g., written by ab convert ... --save-config)")
+        add_profile_arguments(parser)
+        parser.set_defaults(func=_command("abx.cli.run_cmd", "_run_pipeline", examples=examples))
+
+
+def add_synth_subcommand(subparsers: argparse._SubParsersAction) -> None:
+    synth_parser = subparsers.add_parser("synth", help="| Generate synthetic datasets (events or unit) for testing and benchmarking")
+    synth_subparsers = synth_parser.add_subparsers(dest="synth_cmd", required=True)
+
+    def common(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--out", metavar="PATH", required=True, help="| Output path (.csv or .parquet)")
+        p.add_argument("--users", metavar="N", type=int, default=None, help="| Number of users (before SRM injection)")
+        p.add_argument("--variants", metavar="NAME,NAME", default="control,treatment", help="| Variant names (default: control,treatment)")
+        p.add_argument("--allocation", metavar="SPEC", default="equal", help="| 'equal' or 'control=0.5,treatment=0.5' (default: equal)")
+        p.add_argument("--srm", metavar="VARIANT=RATE", action="append", default=None, help="| Inject SRM: drop RATE of VARIANT's users (repeatable). Example: --srm treatment=0.02")
+        p.add_argument("--value-dist", choices=["lognormal", "normal", "exponential"], default="lognormal", help="| Distribution of monetary values (default: lognormal)")
+        p.add_argument("--value-mean", metavar="FLOAT", type=float, default=40.0, help="| Mean monetary value (default: 40)")
+        p.add_argument("--value-format", choices=["plain", "currency", "messy"], default="currency", help="| plain=12.34, currency=$12.34, messy=mix of '$1,234.50', ' 12.3 USD', 'n/a' (default: currency)")
+        p.add_argument("--segment-cardinality", metavar="N", type=int, default=50, help="| Distinct countries (default: 50)")
+        p.add_argument("--dirty-segments", metavar="RATE", type=float, default=0.0, help="| Fraction of segment values with case/whitespace/separator noise (default: 0)")
+        p.add_argument("--seed", metavar="N", type=int, default=0, help="| Random seed (default: 0)")
+        p.add_argument("--chunk-users", metavar="N", type=int, default=200_000, help="| Users generated/written per chunk; bounds memory (default: 200000)")
+
+    events_parser = synth_subparsers.add_parser("events", help="| Event log: one row per event")
+    common(events_parser)
+    events_parser.add_argument("--rows", metavar="N", type=int, default=None, help="| Approximate number of rows (alternative to --users)")
+    events_parser.add_argument("--events-per-user", metavar="MEAN", type=float, default=20.0, help="| Mean events per user, including the exposure (default: 20)")
+    events_parser.add_argument("--events-sigma", metavar="FLOAT", type=float, default=1.0, help="| Heavy tail of events per user (lognormal sigma; 0 = Poisson) (default: 1.0)")
+    events_parser.add_argument("--event-skew", metavar="FLOAT", type=float, default=1.2, help="| Zipf exponent of the event-type mix (0 = uniform) (default: 1.2)")
+    events_parser.add_argument("--exposure-event", metavar="NAME", default="exposed", help="| Exposure event name (first event of every user) (default: exposed)")
+    events_parser.add_argument("--multi-exposure-rate", metavar="RATE", type=float, default=0.05, help="| Fraction of users with a second exposure event (default: 0.05)")
+    events_parser.add_argument("--days", metavar="N", type=int, default=14, help="| Exposure period in days, starting 2025-01-01 (default: 14)")
+    events_parser.add_argument("--time-format", choices=_TIME_FORMATS, default="iso_z", help="| Timestamp format: iso_z, iso_offset, naive, mixed or native datetime (default: iso_z)")
+    events_parser.set_defaults(func=_command("abx.cli.synth_cmd", "_run_synth_events"))
+
+    unit_parser = synth_subparsers.add_parser("unit", help="| Unit-level table: one row per user")
+    common(unit_parser)
+    unit_parser.add_argument("--conversion-rate", metavar="RATE", type=float, default=0.10, help="| Baseline conversion rate (default: 0.10)")
+    unit_parser.add_argument("--duplicate-rate", metavar="RATE", type=float, default=0.0, help="| Fraction of users written twice (tests --dedupe) (default: 0)")
+    unit_parser.set_defaults(func=_command("abx.cli.synth_cmd", "_run_synth_unit"))
@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  #Windows
+    resource = None
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #Linux reports KiB, macOS reports bytes
+    if sys.platform == "darwin":
+        return peak / (1024.0 * 1024.0)
+    return peak / 1024.0
+
+
+class _Stage:
+    def __init__(self, name: str, depth: int, rows_in: int | None) -> None:
+        self.name = name
+        self.depth = depth
+        self.rows_in = rows_in
+        self.rows_out: int | None = None
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.peak_rss_mb: float | None = None
+        self.mem_delta_mb: float | None = None
+        self.tid = threading.get_ident()
+        self.thread_name = threading.current_thread().name
+        self._t0 = 0.0
+        self._c0 = 0.0
+        self._m0 = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "stage": self.name,
+            "depth": self.depth,
+            "wall_s": round(self.wall_s, 6),
+            "cpu_s": round(self.cpu_s, 6),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "peak_rss_mb": None if self.peak_rss_mb is None else round(self.peak_rss_mb, 2),
+            "mem_delta_mb": None if self.mem_delta_mb is None else round(self.mem_delta_mb, 3),
+        }
+
+
+#Records wall/CPU time, rows in/out and memory per pipeline stage.
+#Stages nest: start() inside a running stage creates a child (shown indented in the table).
+#Memory deltas come from tracemalloc and are only recorded with trace_memory=True, because tracing allocations slows pandas down noticeably.
+class Profiler:
+    def __init__(self, command: str, trace_memory: bool = False) -> None:
+        self.command = command
+        self.trace_memory = trace_memory
+        self.stages: list[_Stage] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+
+    def _stack(self) -> list[_Stage]:
+        st = getattr(self._local, "stack", None)
+        if st is None:
+            st = self._local.stack = []
+        return st
+
+    def start(self, name: str, rows_in: int | None = None) -> _Stage:
+        stack = self._stack()
+        stage = _Stage(name, len(stack), rows_in)
+        with self._lock:
+            self.stages.append(stage)
+        stack.append(stage)
+        if self.trace_memory:
+            stage._m0 = tracemalloc.get_traced_memory()[0]
+        stage._c0 = time.process_time()
+        stage._t0 = time.perf_counter()
+        return stage
+
+    def stop(self, rows_out: int | None = None) -> _Stage:
+        t1 = time.perf_counter()
+        c1 = time.process_time()
+        stack = self._stack()
+        if not stack:
+            raise RuntimeError("Profiler.stop() called without a running stage")
+        stage = stack.pop()
+        stage.wall_s = t1 - stage._t0
+        stage.cpu_s = c1 - stage._c0
+        if rows_out is not None:
+            stage.rows_out = rows_out
+        stage.peak_rss_mb = _peak_rss_mb()
+        if self.trace_memory:
+            stage.mem_delta_mb = (tracemalloc.get_traced_memory()[0] - stage._m0) / (1024.0 * 1024.0)
+        return stage
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int | None = None):
+        st = self.start(name, rows_in=rows_in)
+        try:
+            yield st
+        finally:
+            self.stop()
+
+    def to_trace(self) -> dict:
+        #Chrome trace_event format (open in Perfetto / chrome://tracing). One complete ("X") event per stage,
+        #on the thread that ran it; nesting is implied by time containment.
+        pid = os.getpid()
+        tids: dict[int, int] = {}
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": f"abx {self.command}"}}]
+        for s in self.stages:
+            if s.tid not in tids:
+                tids[s.tid] = len(tids) + 1
+                events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tids[s.tid], "args": {"name": s.thread_name}})
+
+        main_tid = tids.get(threading.main_thread().ident, 1)
+        events.append({"name": self.command, "cat": "abx", "ph": "X", "ts": 0.0, "dur": round((time.perf_counter() - self._t0) * 1e6, 3), "pid": pid, "tid": main_tid, "args": {}})
+        for s in self.stages:
+            args = {k: v for k, v in s.to_dict().items() if k not in ("stage", "depth", "wall_s") and v is not None}
+            events.append({
+                "name": s.name,
+                "cat": s.name.split(":", 1)[0] if ":" in s.name else "stage",
+                "ph": "X",
+                "ts": round((s._t0 - self._t0) * 1e6, 3),
+                "dur": round(s.wall_s * 1e6, 3),
+                "pid": pid,
+                "tid": tids[s.tid],
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_dict(self) -> dict:
+        return {
+            "command": self.command,
+            "total_wall_s": round(time.perf_counter() - self._t0, 6),
+            "total_cpu_s": round(time.process_time() - self._c0, 6),
+            "peak_rss_mb": None if _peak_rss_mb() is None else round(_peak_rss_mb(), 2),
+            "stages": [s.to_dict() for s in self.stages],
+        }
+
+    def format_table(self) -> str:
+        def num(v, fmt):
+            return "" if v is None else format(v, fmt)
+
+        header = f"{'stage':<40} {'wall_s':>9} {'cpu_s':>9} {'rows_in':>12} {'rows_out':>12} {'peak_rss_mb':>12} {'mem_delta_mb':>13}"
+        lines = [f"=== profile: {self.command} ===", header, "-" * len(header)]
+        for s in self.stages:
+            name = ("  " * s.depth + s.name)[:40]
+            lines.append(
+                f"{name:<40} {s.wall_s:>9.3f} {s.cpu_s:>9.3f} {num(s.rows_in, 'd'):>12} {num(s.rows_out, 'd'):>12} "
+                f"{num(s.peak_rss_mb, '.1f'):>12} {num(s.mem_delta_mb, '.2f'):>13}"
+            )
+        total = self.to_dict()
+        lines.append("-" * len(header))
+        lines.append(f"{'total':<40} {total['total_wall_s']:>9.3f} {total['total_cpu_s']:>9.3f}")
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--profile", metavar="PATH", nargs="?", const="-", default=None, help="| Record per-stage time/rows/memory. Without PATH print a table; with PATH (.json) write JSON")
+    parser.add_argument("--profile-memory", action="store_true", help="| With --profile: also record tracemalloc memory deltas per stage (slower)")
+    parser.add_argument("--trace", metavar="PATH", default=None, help="| Write a Chrome trace_event JSON of pipeline spans (open in Perfetto / chrome://tracing)")
+
+
+def make_profiler(args: argparse.Namespace, command: str) -> Profiler:
+    trace_memory = bool(getattr(args, "profile", None) or getattr(args, "trace", None)) and bool(getattr(args, "profile_memory", False))
+    return Profiler(command, trace_memory=trace_memory)
+
+
+def finish_profile(prof: Profiler, args: argparse.Namespace) -> None:
+    #Print or save the stage table if --profile was given, and the span trace if --trace was given
+    prof.close()
+    trace_target = getattr(args, "trace", None)
+    if trace_target:
+        trace_path = Path(trace_target)
+        trace_path.parent.mkdir(parents=True, exist_ok=True)
+        trace_path.write_text(json.dumps(prof.to_trace()) + "\n", encoding="utf-8")
+        print(f"[trace] saved: {trace_path}")
+
+    target = getattr(args, "profile", None)
+    if not target:
+        return
+    if target == "-":
+        print("\n" + prof.format_table())
+        return
+    path = Path(target)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(prof.to_dict(), indent=2) + "\n", encoding="utf-8")
+    print(f"[profile] saved: {path}")
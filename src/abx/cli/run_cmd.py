@@ -0,0 +1,79 @@
+import argparse
+from pathlib import Path
+from abx.cli.convert_cmd import (
+    _convert_events_df, _convert_unit_df, _events_defaults, _load_config, _load_events_input, _load_unit_input,
+    _maybe_write_stats, _print_converted, _resolve_sampling, _save_config, _unit_defaults, _validate_events_args, _validate_unit_args, _write_df,
+)
+from abx.cli.doctor_cmd import _doctor_checks, _doctor_defaults, _doctor_exit_code, _example_rows, _print_preview, _save_report
+from abx.cli.profiling import finish_profile, make_profiler
+
+#Doctor options accepted by `ab run` (same meaning as in `ab doctor`)
+_DOCTOR_KEYS = ["metrics", "ignore", "allocation", "alpha", "min_n", "min_n_metric", "only", "fail_on", "no_exit", "report", "check", "skip", "workers", "cache", "segments", "time_col", "time_bucket"]
+
+
+def _run_pipeline(args: argparse.Namespace) -> None:
+    kind = args.run_cmd
+
+    #Load config first (a config saved by `ab convert ... --save-config` or `ab run ... --save-config`)
+    if args.config:
+        print("Reading specified config file......")
+        cfg = _load_config(Path(args.config))
+        for key, val in cfg.items():
+            if hasattr(args, key) and getattr(args, key) is None:
+                setattr(args, key, val)
+
+    #Doctor config: only doctor options are taken (its user/variant refer to the converted table)
+    if args.doctor_config:
+        print("Reading specified doctor config file......")
+        cfg = _load_config(Path(args.doctor_config))
+        for key in _DOCTOR_KEYS:
+            if key in cfg and getattr(args, key) in (None, False):
+                setattr(args, key, cfg[key])
+
+    if kind == "unit":
+        _unit_defaults(args)
+        _validate_unit_args(args, ["data", "user", "variant"])
+    else:
+        _events_defaults(args)
+        _validate_events_args(args, ["data", "user", "variant", "time", "event"])
+    sampling = _resolve_sampling(args)
+
+    if args.save_config:
+        _save_config(args, Path(args.save_config))
+        print(f"[config] saved: {args.save_config}")
+
+    prof = make_profiler(args, f"run {kind}")
+    in_path = Path(args.data)
+    out_path = Path(args.out) if args.out else None
+
+    #Convert
+    prof.start("load")
+    df = _load_unit_input(args, sampling) if kind == "unit" else _load_events_input(args, sampling)
+    prof.stop(rows_out=len(df))
+    users = _convert_unit_df(df, args, prof) if kind == "unit" else _convert_events_df(df, args, prof)
+    del df
+    _print_converted(kind, in_path, out_path, users)
+
+    if out_path is not None:
+        prof.start("write", rows_in=len(users))
+        _write_df(users, out_path)
+        prof.stop()
+        _maybe_write_stats(users, out_path, args, prof)
+        print(f"[run] converted table saved: {out_path}")
+
+    #Doctor on the same in-memory table
+    doc = argparse.Namespace(user="user_id", variant="variant", preview=args.report is None, **{k: getattr(args, k) for k in _DOCTOR_KEYS})
+    _doctor_defaults(users, doc)
+    report_items = _doctor_checks(users, doc, prof, max_rows=_example_rows(doc))
+
+    if doc.report is not None:
+        with prof.stage("write_report"):
+            _save_report(report_items, Path(doc.report))
+        print(f"Report saved in {doc.report}")
+    if doc.preview:
+        _print_preview(report_items, only=doc.only, max_example_rows=10)
+    finish_profile(prof, args)
+
+    exit_code = _doctor_exit_code(report_items, doc)
+    if exit_code != 0:
+        raise SystemExit(exit_code)
@@ -0,0 +1,139 @@
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from abx.cli.doctor_stats import MetricStats, _outlier_bounds
+
+#Statistics sidecar: `ab convert ... --out users.parquet --write-stats` also writes users.parquet.stats.json with the
+#fused doctor statistics of every numeric column (overall + per variant), the outlier counts of the IQR rule, the
+#convert options that produced the table and a SHA-256 of the written file.
+#`ab doctor --use-stats` serves the metric checks from it (no metric columns are read) when the hash still matches.
+
+_SIDECAR_VERSION = 1
+_SIDECAR_SUFFIX = ".stats.json"
+
+
+def _sidecar_path(data_path: Path) -> Path:
+    return data_path.with_name(data_path.name + _SIDECAR_SUFFIX)
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _write_stats_sidecar(df: pd.DataFrame, out_path: Path, args: argparse.Namespace, user: str = "user_id", variant: str = "variant") -> Path:
+    metrics = [c for c in df.columns if c not in (user, variant) and pd.api.types.is_numeric_dtype(df[c])]
+    stats = MetricStats(df, user, variant, metrics)
+    outliers = {}
+    for m in metrics:
+        o = stats.overall.loc[m]
+        bounds = _outlier_bounds(float(o["q1"]), float(o["q3"]))
+        if bounds is not None:
+            outliers[m] = stats.outlier_count(m, *bounds)[0]
+
+    config = {k: v for k, v in vars(args).items() if k not in ("func", "save_config", "config") and v is not None}
+    payload = {
+        "abx_stats": _SIDECAR_VERSION,
+        "data": {
+            "file": out_path.name,
+            "sha256": _file_sha256(out_path),
+            #Cheap change detection before hashing (see _load_stats_sidecar)
+            "size": out_path.stat().st_size,
+            "mtime_ns": out_path.stat().st_mtime_ns,
+            "rows": int(len(df)),
+            "columns": {c: str(df[c].dtype) for c in df.columns},
+        },
+        "user": user,
+        "variant": variant,
+        "config": config,
+        "overall": stats.overall.reset_index().to_dict(orient="records"),
+        "by_variant": stats.by_variant.to_dict(orient="records"),
+        "outliers": outliers,
+    }
+    path = _sidecar_path(out_path)
+    path.write_text(json.dumps(payload, indent=1, ensure_ascii=False, default=_json_default) + "\n", encoding="utf-8")
+    return path
+
+
+def _json_default(x):
+    if isinstance(x, np.integer):
+        return int(x)
+    if isinstance(x, np.floating):
+        return float(x)
+    if isinstance(x, np.bool_):
+        return bool(x)
+    return str(x)
+
+
+def _load_stats_sidecar(data_path: Path, user: str, variant: str) -> tuple[dict | None, str]:
+    #(payload, reason): payload is None when there is no usable sidecar for this exact file
+    path = _sidecar_path(data_path)
+    if not path.exists():
+        return None, f"no statistics sidecar ({path.name})"
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None, f"unreadable statistics sidecar ({path.name})"
+    if payload.get("abx_stats") != _SIDECAR_VERSION:
+        return None, f"unsupported statistics sidecar version ({path.name})"
+    if (payload.get("user"), payload.get("variant")) != (user, variant):
+        return None, f"sidecar was written for columns {payload.get('user')}/{payload.get('variant')}"
+    #Size and mtime first: a different size is stale without reading the file, the same size and mtime is the file the
+    #sidecar was written for (no hashing). Only a touched or copied file of the same size is hashed.
+    st = data_path.stat()
+    data = payload["data"]
+    if data.get("size") is not None and data["size"] != st.st_size:
+        return None, f"stale statistics sidecar: {data_path.name} changed after {path.name} was written"
+    if (data.get("size"), data.get("mtime_ns")) != (st.st_size, st.st_mtime_ns) and data["sha256"] != _file_sha256(data_path):
+        return None, f"stale statistics sidecar: {data_path.name} changed after {path.name} was written"
+    return payload, f"statistics from {path.name}"
+
+
+def _sidecar_covers(payload: dict, metrics: list[str]) -> bool:
+    covered = {o["metric"] for o in payload["overall"]}
+    return all(m in covered for m in metrics)
+
+
+def _sidecar_frame(payload: dict) -> pd.DataFrame:
+    #Zero-row frame with the table's dtypes (for default metric detection without reading the table)
+    return pd.DataFrame({c: pd.Series(dtype=d) for c, d in payload["data"]["columns"].items()})
+
+
+class SidecarStats:
+    #Same interface as doctor_stats.MetricStats, read from a sidecar. Exact numbers, no example rows.
+    approximate = False
+
+    def __init__(self, payload: dict, metrics: list[str]) -> None:
+        #metrics must be numeric columns of the table (the ones the sidecar covers), see _sidecar_covers
+        self.user = payload["user"]
+        self.variant = payload["variant"]
+        self.metrics = list(dict.fromkeys(metrics))
+        overall = pd.DataFrame(payload["overall"] or {"metric": []}).set_index("metric")
+        missing = [m for m in self.metrics if m not in overall.index]
+        if missing:
+            raise SystemExit(f"Metrics not in the statistics sidecar (not numeric in the table?): {missing}")
+        self.overall = overall.loc[self.metrics]
+        by_variant = pd.DataFrame(payload["by_variant"] or {"metric": [], self.variant: []})
+        self.by_variant = by_variant[by_variant["metric"].isin(self.metrics)].reset_index(drop=True)
+        self._outliers = payload.get("outliers", {})
+
+    def metric(self, m: str) -> pd.DataFrame:
+        return self.by_variant[self.by_variant["metric"] == m].drop(columns="metric").reset_index(drop=True)
+
+    def examples(self, kind: str, m: str):
+        return None
+
+    def outlier_count(self, m: str, lo: float, hi: float) -> tuple[int, bool]:
+        #Stored for the IQR bounds of the overall quartiles, which are the bounds the distribution check uses
+        return int(self._outliers.get(m, 0)), False
+
+    def outlier_examples(self, m: str, lo: float, hi: float):
+        return None
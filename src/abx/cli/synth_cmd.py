@@ -0,0 +1,319 @@
+import argparse
+import time
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+_EVENT_TYPES = ["view", "click", "add_to_cart", "purchase", "refund", "search", "share", "signup"]
+_DEVICES = ["ios", "android", "web", "tablet"]
+
+
+class _ChunkWriter:
+    #Appends DataFrame chunks to one CSV/Parquet file without keeping earlier chunks in memory
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.suffix = path.suffix.lower()
+        if self.suffix not in (".csv", ".parquet", ".pq"):
+            raise SystemExit("Unsupported output type. Use .csv or .parquet")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._pq_writer = None
+        self._csv_started = False
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame) -> None:
+        self.rows += len(df)
+        if self.suffix == ".csv":
+            try:
+                import pyarrow as pa
+                import pyarrow.csv as pacsv
+            except ImportError:
+                df.to_csv(self.path, mode="a" if self._csv_started else "w", header=not self._csv_started, index=False)
+                self._csv_started = True
+                return
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with open(self.path, "ab" if self._csv_started else "wb") as fh:
+                pacsv.write_csv(table, fh, write_options=pacsv.WriteOptions(include_header=not self._csv_started))
+            self._csv_started = True
+            return
+
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Writing Parquet needs pyarrow. Install abx[parquet] or use a .csv output.")
+        #Store categoricals as plain strings (Parquet still dictionary-encodes them on disk), so readers get the
+        #same object columns a real export would give instead of pandas categoricals
+        table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+        for i, field in enumerate(table.schema):
+            if pa.types.is_dictionary(field.type):
+                table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+        if self._pq_writer is None:
+            self._pq_writer = pq.ParquetWriter(self.path, table.schema)
+        self._pq_writer.write_table(table)
+
+    def close(self) -> None:
+        if self._pq_writer is not None:
+            self._pq_writer.close()
+            self._pq_writer = None
+
+
+def _parse_variants(raw: str) -> list[str]:
+    names = [v.strip() for v in str(raw).split(",") if v.strip()]
+    if not names:
+        raise SystemExit("Bad --variants: provide at least one name.")
+    if len(set(names)) != len(names):
+        raise SystemExit(f"Bad --variants: duplicate names in {names}.")
+    return names
+
+
+def _parse_allocation(raw: str, variants: list[str]) -> np.ndarray:
+    alloc = str(raw).strip().lower()
+    if alloc == "equal":
+        return np.full(len(variants), 1.0 / len(variants))
+    weights = {}
+    for part in [p.strip() for p in alloc.split(",") if p.strip()]:
+        if "=" not in part:
+            raise SystemExit(f"Bad --allocation '{raw}'. Use 'equal' or 'control=0.5,treatment=0.5'.")
+        k, v = part.split("=", 1)
+        try:
+            weights[k.strip()] = float(v)
+        except ValueError:
+            raise SystemExit(f"Bad --allocation value in '{part}'. Use floats like 0.5.")
+    unknown = [k for k in weights if k not in [v.lower() for v in variants]]
+    if unknown:
+        raise SystemExit(f"Bad --allocation: unknown variants {unknown}. Variants: {variants}")
+    w = np.array([weights.get(v.lower(), 0.0) for v in variants], dtype="float64")
+    if w.sum() <= 0 or (w < 0).any():
+        raise SystemExit(f"Bad --allocation '{raw}'. Weights must be >= 0 and sum to > 0.")
+    return w / w.sum()
+
+
+def _parse_srm(opts: list[str] | None, variants: list[str]) -> np.ndarray:
+    drop = np.zeros(len(variants))
+    for raw in opts or []:
+        if "=" not in raw:
+            raise SystemExit(f"Bad --srm '{raw}'. Use VARIANT=RATE (example: treatment=0.02).")
+        k, v = raw.split("=", 1)
+        k = k.strip()
+        if k not in variants:
+            raise SystemExit(f"Bad --srm: unknown variant '{k}'. Variants: {variants}")
+        try:
+            rate = float(v)
+        except ValueError:
+            raise SystemExit(f"Bad --srm rate in '{raw}'. Use a float in [0, 1).")
+        if not (0.0 <= rate < 1.0):
+            raise SystemExit(f"Bad --srm rate in '{raw}'. Use a float in [0, 1).")
+        drop[variants.index(k)] = rate
+    return drop
+
+
+def _skewed_probs(n: int, skew: float) -> np.ndarray:
+    #Zipf-like: p(rank) ~ 1 / rank^skew  (skew=0 -> uniform)
+    w = 1.0 / np.arange(1, n + 1, dtype="float64") ** float(skew)
+    return w / w.sum()
+
+
+def _user_ids(idx: np.ndarray) -> np.ndarray:
+    return np.char.add("u", np.char.zfill(idx.astype(str), 9)).astype(object)
+
+
+#Repeated string columns are written as categoricals (codes + small vocabulary): far cheaper to build and to
+#serialize than one Python string per row, and Parquet stores them dictionary-encoded anyway.
+def _cat(codes: np.ndarray, categories) -> pd.Categorical:
+    return pd.Categorical.from_codes(codes, categories=pd.Index(categories, dtype=object))
+
+
+def _values(rng: np.random.Generator, n: int, dist: str, mean: float) -> np.ndarray:
+    if dist == "lognormal":
+        sigma = 1.0
+        return rng.lognormal(np.log(max(mean, 1e-9)) - sigma ** 2 / 2.0, sigma, size=n)
+    if dist == "normal":
+        return np.maximum(rng.normal(mean, mean / 3.0, size=n), 0.01)
+    return rng.exponential(mean, size=n)
+
+
+def _format_values(rng: np.random.Generator, x: np.ndarray, fmt: str) -> np.ndarray:
+    s = np.round(x, 2).astype(str)
+    if fmt == "plain":
+        return s.astype(object)
+    if fmt == "currency":
+        return np.char.add("$", s).astype(object)
+    #messy: currency, thousands separators, trailing unit, and some unparseable tokens
+    out = pd.Series(s, dtype=object)
+    kind = rng.integers(0, 4, size=len(out))
+    out[kind == 0] = "$" + out[kind == 0]
+    big = (kind == 1)
+    out[big] = "$" + pd.Series(np.round(x[big], 2)).map("{:,.2f}".format).to_numpy()
+    out[kind == 2] = " " + out[kind == 2] + " USD"
+    out[rng.random(len(out)) < 0.002] = "n/a"
+    return out.to_numpy(dtype=object)
+
+
+def _segment(rng: np.random.Generator, codes: np.ndarray, categories: np.ndarray, rate: float) -> pd.Categorical:
+    #Upper-case, pad with spaces, or swap separators for a fraction of values.
+    #Dirty spellings become extra categories, so this stays vectorized over codes.
+    if rate <= 0:
+        return _cat(codes, categories)
+    base = pd.Series(categories, dtype=object)
+    spellings = np.concatenate([categories, base.str.upper().to_numpy(dtype=object), ("  " + base + " ").to_numpy(dtype=object), base.str.replace("_", " ", regex=False).to_numpy(dtype=object)])
+    remap, uniques = pd.factorize(spellings)
+    kind = np.where(rng.random(len(codes)) < rate, rng.integers(1, 4, size=len(codes)), 0)
+    return _cat(remap[codes + kind * len(categories)], uniques)
+
+
+_TIME_STYLES = {"iso_z": ("T", "Z"), "iso_offset": ("T", "+00:00"), "naive": (" ", "")}
+
+
+@lru_cache(maxsize=None)
+def _time_of_day(sep: str, suffix: str) -> np.ndarray:
+    #All 86400 "HH:MM:SS" strings of a day, with the date/time separator and zone suffix attached
+    sod = np.arange(86400)
+    parts = [np.char.zfill(x.astype(str), 2) for x in (sod // 3600, sod // 60 % 60, sod % 60)]
+    hms = np.char.add(np.char.add(np.char.add(np.char.add(parts[0], ":"), parts[1]), ":"), parts[2])
+    return np.char.add(np.char.add(sep, hms), suffix).astype(object)
+
+
+def _format_times(rng: np.random.Generator, base: np.datetime64, seconds: np.ndarray, fmt: str):
+    #Timestamps are built as date-string + time-of-day-string from lookup tables,
+    #which is several times faster than formatting every datetime individually
+    if fmt == "native":
+        return pd.to_datetime(base + seconds.astype("timedelta64[s]")).tz_localize("UTC")
+    day, sod = np.divmod(seconds, 86400)
+    dates = (base.astype("datetime64[D]") + np.arange(int(day.max()) + 1 if len(day) else 1)).astype(str).astype(object)
+    if fmt == "mixed":
+        tables = np.concatenate([_time_of_day(*_TIME_STYLES[k]) for k in ("iso_z", "iso_offset", "naive")])
+        sod = sod + rng.integers(0, 3, size=len(sod)) * 86400
+    else:
+        tables = _time_of_day(*_TIME_STYLES[fmt])
+    return dates[day] + tables[sod]
+
+
+def _assign_users(rng: np.random.Generator, user_start: int, n_users: int, variants: list[str], probs: np.ndarray, srm_drop: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    #Returns (global user index, variant index) after SRM drops
+    idx = np.arange(user_start, user_start + n_users)
+    var = rng.choice(len(variants), size=n_users, p=probs)
+    if srm_drop.any():
+        keep = rng.random(n_users) >= srm_drop[var]
+        idx, var = idx[keep], var[keep]
+    return idx, var
+
+
+def _events_chunk(rng: np.random.Generator, user_start: int, n_users: int, args: argparse.Namespace, variants: list[str], probs: np.ndarray, srm_drop: np.ndarray) -> pd.DataFrame:
+    uidx, uvar = _assign_users(rng, user_start, n_users, variants, probs, srm_drop)
+    k = len(uidx)
+
+    #Events per user: 1 exposure + Poisson(lognormal rate) -> heavy tail controlled by events_sigma
+    extra_mean = max(0.0, float(args.events_per_user) - 1.0)
+    sigma = max(0.0, float(args.events_sigma))
+    if sigma > 0 and extra_mean > 0:
+        lam = rng.lognormal(np.log(extra_mean) - sigma ** 2 / 2.0, sigma, size=k)
+    else:
+        lam = np.full(k, extra_mean)
+    counts = rng.poisson(lam) + 1
+
+    row_user = np.repeat(np.arange(k), counts)
+    first = np.cumsum(counts) - counts
+    pos = np.arange(len(row_user)) - np.repeat(first, counts)
+
+    event_names = list(dict.fromkeys(_EVENT_TYPES + [args.exposure_event]))
+    event = rng.choice(len(_EVENT_TYPES), size=len(row_user), p=_skewed_probs(len(_EVENT_TYPES), args.event_skew))
+    exposure_code = event_names.index(args.exposure_event)
+    event[pos == 0] = exposure_code
+    multi = rng.random(k) < float(args.multi_exposure_rate)
+    event[(pos == 1) & multi[row_user]] = exposure_code
+
+    #Exposure spread over --days; later events follow with exponential gaps (mean 1h), capped at 30 days
+    base = np.datetime64("2025-01-01T00:00:00", "s")
+    exp_offset = rng.integers(0, max(1, int(args.days)) * 86400, size=k)
+    step = rng.exponential(3600.0, size=len(row_user)).astype("int64")
+    step[pos == 0] = 0
+    cs = np.cumsum(step)
+    within = np.minimum(cs - np.repeat(cs[first], counts), 30 * 86400)
+    seconds = exp_offset[row_user] + within
+
+    amount = np.full(len(row_user), None, dtype=object)
+    has_value = np.isin(event, [event_names.index("purchase"), event_names.index("refund")])
+    n_val = int(has_value.sum())
+    if n_val:
+        amount[has_value] = _format_values(rng, _values(rng, n_val, args.value_dist, args.value_mean), args.value_format)
+
+    countries = np.array([f"country_{i:04d}" for i in range(max(1, int(args.segment_cardinality)))], dtype=object)
+    user_country = rng.integers(0, len(countries), size=k)
+    user_device = rng.integers(0, len(_DEVICES), size=k)
+
+    return pd.DataFrame({
+        "user": _cat(row_user, _user_ids(uidx)),
+        "variant": _cat(uvar[row_user], variants),
+        "ts": _format_times(rng, base, seconds, args.time_format),
+        "event": _cat(event, event_names),
+        "amount": amount,
+        "country": _segment(rng, user_country[row_user], countries, float(args.dirty_segments)),
+        "device": _segment(rng, user_device[row_user], np.array(_DEVICES, dtype=object), float(args.dirty_segments)),
+    })
+
+
+def _unit_chunk(rng: np.random.Generator, user_start: int, n_users: int, args: argparse.Namespace, variants: list[str], probs: np.ndarray, srm_drop: np.ndarray) -> pd.DataFrame:
+    uidx, uvar = _assign_users(rng, user_start, n_users, variants, probs, srm_drop)
+    k = len(uidx)
+    converted = rng.random(k) < float(args.conversion_rate)
+    revenue = np.where(converted, _values(rng, k, args.value_dist, args.value_mean), 0.0)
+    countries = np.array([f"country_{i:04d}" for i in range(max(1, int(args.segment_cardinality)))], dtype=object)
+
+    out = pd.DataFrame({
+        "user": _user_ids(uidx),
+        "variant": _cat(uvar, variants),
+        "converted": np.where(converted, "yes", "no").astype(object),
+        "revenue": _format_values(rng, revenue, args.value_format),
+        "country": _segment(rng, rng.integers(0, len(countries), size=k), countries, float(args.dirty_segments)),
+    })
+    dup_rate = float(args.duplicate_rate)
+    if dup_rate > 0:
+        dups = out[rng.random(k) < dup_rate]
+        out = pd.concat([out, dups], ignore_index=True)
+    return out
+
+
+def _run_synth(args: argparse.Namespace, make_chunk, n_users: int) -> None:
+    variants = _parse_variants(args.variants)
+    probs = _parse_allocation(args.allocation, variants)
+    srm_drop = _parse_srm(args.srm, variants)
+    chunk_users = max(1, int(args.chunk_users))
+    if n_users <= 0:
+        raise SystemExit("Nothing to generate: --users must be > 0.")
+
+    out_path = Path(args.out)
+    writer = _ChunkWriter(out_path)
+    t0 = time.perf_counter()
+    n_chunks = 0
+    try:
+        for start in range(0, n_users, chunk_users):
+            #One RNG stream per chunk: output is reproducible for a given seed and --chunk-users
+            rng = np.random.default_rng([int(args.seed), n_chunks])
+            writer.write(make_chunk(rng, start, min(chunk_users, n_users - start), args, variants, probs, srm_drop))
+            n_chunks += 1
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - t0
+
+    print("=== Synthetic data ===")
+    print(f"output: {out_path}")
+    print(f"users:  {n_users} (before SRM injection)")
+    print(f"rows:   {writer.rows}")
+    print(f"chunks: {n_chunks}")
+    print(f"time:   {elapsed:.2f}s ({writer.rows / elapsed if elapsed > 0 else 0:,.0f} rows/s)")
+
+
+def _run_synth_events(args: argparse.Namespace) -> None:
+    if args.users is None and args.rows is None:
+        raise SystemExit("Provide --users N or --rows N.")
+    if args.users is not None and args.rows is not None:
+        raise SystemExit("Use either --users or --rows, not both.")
+    n_users = args.users if args.users is not None else max(1, int(round(args.rows / max(1.0, float(args.events_per_user)))))
+    _run_synth(args, _events_chunk, n_users)
+
+
+def _run_synth_unit(args: argparse.Namespace) -> None:
+    if args.users is None:
+        raise SystemExit("Provide --users N.")
+    _run_synth(args, _unit_chunk, args.users)
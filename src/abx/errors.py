@@ -0,0 +1,21 @@
+#Exceptions raised by the Python API (abx.convert_unit, abx.convert_events, abx.doctor).
+#The CLI reports the same problems as a message and a non-zero exit code instead.
+
+
+class AbxError(Exception):
+    pass
+
+
+#Invalid spec/options: unknown keys, wrong types, unreadable config file
+class SpecError(AbxError, ValueError):
+    pass
+
+
+#Conversion stopped: missing columns, bad metric DSL, duplicate users with dedupe=error, ...
+class ConvertError(AbxError):
+    pass
+
+
+#Doctor could not run the checks (missing columns, bad allocation spec, ...). Findings are never raised.
+class DoctorError(AbxError):
+    pass
@@ -0,0 +1,25 @@
+import argparse
+
+import pytest
+
+
+@pytest.fixture
+def doctor_args():
+    #doctor_args(options=None, **kwargs) -> the argparse.Namespace of a bare `ab doctor` (every option at its parser
+    #default, user/variant columns as written by convert), with `options` and then `kwargs` set on top.
+    #Doctor tests call it with their own options instead of keeping a Namespace builder per file.
+    from abx.cli.parsers import add_doctor_subcommand
+
+    parser = argparse.ArgumentParser()
+    add_doctor_subcommand(parser.add_subparsers())
+
+    def make(options: dict | None = None, **kwargs) -> argparse.Namespace:
+        args = parser.parse_args(["doctor"])
+        args.user, args.variant = "user_id", "variant"
+        for k, v in {**(options or {}), **kwargs}.items():
+            if not hasattr(args, k):
+                raise AttributeError(f"ab doctor has no option '{k}'")
+            setattr(args, k, v)
+        return args
+
+    return make
@@ -0,0 +1,81 @@
+import argparse
+import json
+import pandas as pd
+import pytest
+
+import abx
+from abx.cli.convert_cmd import _run_events
+
+
+def _events_df():
+    return pd.DataFrame(
+        {
+            "user": ["u1", "u1", "u2", "u2", "u3"],
+            "variant": ["A", "A", "B", "B", "A"],
+            "ts": ["2025-01-01 00:00:00Z", "2025-01-01 01:00:00Z", "2025-01-01 00:00:00Z", "2025-01-02 00:00:00Z", "2025-01-01 00:00:00Z"],
+            "event": ["exposed", "purchase", "exposed", "view", "exposed"],
+            "amount": [None, "$10.50", None, None, None],
+        }
+    )
+
+
+_SPEC = {
+    "user": "user",
+    "variant": "variant",
+    "time": "ts",
+    "event": "event",
+    "value": "amount",
+    "exposure": "exposed",
+    "metric": ["conversion=binary:event_exists(purchase)", "revenue=continuous:sum_value(purchase)"],
+}
+
+
+def test_convert_events_matches_cli(tmp_path):
+    src = _events_df()
+    out = abx.convert_events(src, _SPEC)
+
+    in_path, out_path = tmp_path / "events.csv", tmp_path / "out.parquet"
+    src.to_csv(in_path, index=False)
+    args = argparse.Namespace(
+        data=str(in_path), user="user", variant="variant", time="ts", event="event", value="amount", exposure="exposed",
+        window=None, multiexposure=None, multivariant=None, unassigned=None, metric=list(_SPEC["metric"]), segment=None,
+        out=str(out_path), preview=False, save_config=None, config=None,
+    )
+    _run_events(args)
+    cli = pd.read_parquet(out_path)
+
+    pd.testing.assert_frame_equal(out.reset_index(drop=True), cli, check_dtype=False)
+    assert out.set_index("user_id").loc["u1", "revenue"] == 10.5
+    #The caller's frame is left untouched
+    pd.testing.assert_frame_equal(src, _events_df())
+
+
+def test_convert_unit_accepts_saved_config_and_arrow(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    cfg = tmp_path / "unit.json"
+    cfg.write_text(json.dumps({"cmd": "convert", "convert_cmd": "unit", "data": "ignored.csv", "out": "ignored.parquet", "user": "uid", "variant": "grp", "metric": "paid=binary:fix(paid)"}), encoding="utf-8")
+    table = pa.Table.from_pandas(pd.DataFrame({"uid": ["u1", "u2"], "grp": ["A", "B"], "paid": ["yes", "no"]}))
+
+    out = abx.convert_unit(table, cfg)
+
+    assert isinstance(out, pa.Table)
+    assert out.column("paid").to_pylist() == [1, 0]
+
+
+def test_typed_errors():
+    with pytest.raises(abx.SpecError):
+        abx.convert_events(_events_df(), _SPEC, not_an_option=1)
+    with pytest.raises(abx.ConvertError, match="Duplicate users"):
+        abx.convert_unit(pd.DataFrame({"uid": ["u1", "u1"], "grp": ["A", "A"], "x": [1, 2]}), user="uid", variant="grp", outcome="x")
+    with pytest.raises(abx.DoctorError, match="Missing"):
+        abx.doctor(pd.DataFrame({"user_id": ["u1"], "variant": ["a"]}), metrics="nope")
+    assert issubclass(abx.ConvertError, abx.AbxError)
+
+
+def test_doctor_chains_on_converted_frame():
+    users = abx.convert_events(_events_df(), _SPEC)
+    report = abx.doctor(users, checks=["integrity", "variants"])
+
+    codes = {f["code"] for f in report["findings"]}
+    assert "INTEGRITY_SUMMARY" in codes
+    assert report["ready"] is (report["errors"] == 0)
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import abx
+
+
+def _run_cli(*argv: str) -> subprocess.CompletedProcess:
+    #Fresh interpreter: this test process has pandas imported already
+    code = (
+        "import sys\n"
+        f"sys.argv = ['abx', *{list(argv)!r}]\n"
+        "from abx.cli.main import main\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "heavy = sorted(m for m in ('pandas', 'numpy', 'abx.cli.convert_cmd', 'abx.cli.doctor_cmd', 'abx.cli.run_cmd', 'abx.cli.synth_cmd') if m in sys.modules)\n"
+        "print('HEAVY=' + ','.join(heavy))\n"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(Path(abx.__file__).resolve().parents[1]) + os.pathsep + env.get("PYTHONPATH", "")
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+
+
+def test_version_help_and_examples_do_not_import_pandas():
+    for argv in (["--version"], ["--help"], ["doctor", "--help"], ["run", "events", "--help"], ["convert", "events", "--examples"], ["convert", "unit", "--examples"]):
+        res = _run_cli(*argv)
+        assert "HEAVY=\n" in res.stdout, (argv, res.stdout)
+
+    res = _run_cli("convert", "events", "--examples")
+    assert "event_exists" in res.stdout
+
+
+def test_command_module_is_imported_when_command_runs(tmp_path):
+    res = _run_cli("doctor", "--data", str(tmp_path / "missing.csv"))
+    assert "abx.cli.doctor_cmd" in res.stdout
+    assert "abx.cli.convert_cmd" not in res.stdout
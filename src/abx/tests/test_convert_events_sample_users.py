@@ -0,0 +1,83 @@
+import argparse
+import pandas as pd
+import pytest
+
+from abx.cli.convert_cmd import _parse_sample_users, _run_events
+
+
+def _make_args(in_path, out_path, sample_users):
+    return argparse.Namespace(
+        data=str(in_path),
+        user="user",
+        variant="variant",
+        time="ts",
+        event="event",
+        value="amount",
+        exposure="exposed",
+        window=None,
+        multiexposure="first",
+        multivariant="error",
+        unassigned="error",
+        metric=["n_purchases=count:count_event(purchase)", "revenue=continuous:sum_value(purchase)"],
+        segment=None,
+        out=str(out_path),
+        preview=False,
+        sample_users=sample_users,
+        save_config=None,
+        config=None,
+    )
+
+
+def _write_events(tmp_path, n_users=300):
+    rows = []
+    for i in range(n_users):
+        u = f"u{i}"
+        v = "a" if i % 2 else "b"
+        rows.append({"user": u, "variant": v, "ts": "2025-01-01 00:00:00Z", "event": "exposed", "amount": None})
+        for k in range(i % 4):
+            rows.append({"user": u, "variant": v, "ts": f"2025-01-01 0{k + 1}:00:00Z", "event": "purchase", "amount": f"${k + 1}"})
+    in_path = tmp_path / "events.csv"
+    pd.DataFrame(rows).to_csv(in_path, index=False)
+    return in_path
+
+
+def test_parse_sample_users_with_and_without_salt():
+    assert _parse_sample_users("1%") == (pytest.approx(0.01), "")
+    assert _parse_sample_users("0.05, exp42") == (pytest.approx(0.05), "exp42")
+
+
+def test_sample_users_is_stable_and_metrics_match_full_run(tmp_path):
+    in_path = _write_events(tmp_path)
+
+    _run_events(_make_args(in_path, tmp_path / "full.csv", None))
+    _run_events(_make_args(in_path, tmp_path / "s1.csv", "20%"))
+    _run_events(_make_args(in_path, tmp_path / "s2.csv", "20%"))
+
+    full = pd.read_csv(tmp_path / "full.csv").set_index("user_id")
+    s1 = pd.read_csv(tmp_path / "s1.csv").set_index("user_id")
+    s2 = pd.read_csv(tmp_path / "s2.csv").set_index("user_id")
+
+    assert 0 < len(s1) < len(full)
+    assert s1.index.tolist() == s2.index.tolist()
+    pd.testing.assert_frame_equal(s1, full.loc[s1.index])
+
+
+def test_sample_users_salt_changes_selection(tmp_path):
+    in_path = _write_events(tmp_path)
+
+    _run_events(_make_args(in_path, tmp_path / "a.csv", "30%,salt_a"))
+    _run_events(_make_args(in_path, tmp_path / "b.csv", "30%,salt_b"))
+
+    a = set(pd.read_csv(tmp_path / "a.csv")["user_id"])
+    b = set(pd.read_csv(tmp_path / "b.csv")["user_id"])
+    assert a != b
+
+
+def test_sample_users_conflicts_with_preview_sample(tmp_path):
+    in_path = _write_events(tmp_path, n_users=5)
+    args = _make_args(in_path, tmp_path / "out.csv", "10%")
+    args.out = None
+    args.preview_sample = "10%"
+
+    with pytest.raises(SystemExit):
+        _run_events(args)
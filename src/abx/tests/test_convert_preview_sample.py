@@ -0,0 +1,76 @@
+import argparse
+import pandas as pd
+import pytest
+
+from abx.cli.convert_cmd import _load_df_sampled, _parse_fraction, _run_events, _user_hash_mask
+
+
+def _events_df(n_users=200):
+    rows = []
+    for i in range(n_users):
+        u = f"u{i}"
+        rows.append({"user": u, "variant": "a" if i % 2 else "b", "ts": "2025-01-01 00:00:00Z", "event": "exposed"})
+        rows.append({"user": u, "variant": "a" if i % 2 else "b", "ts": "2025-01-01 01:00:00Z", "event": "purchase"})
+    return pd.DataFrame(rows)
+
+
+def test_parse_fraction_accepts_fraction_and_percent():
+    assert _parse_fraction("0.25", "--preview-sample") == pytest.approx(0.25)
+    assert _parse_fraction("0.1%", "--preview-sample") == pytest.approx(0.001)
+    with pytest.raises(SystemExit):
+        _parse_fraction("0", "--preview-sample")
+    with pytest.raises(SystemExit):
+        _parse_fraction("abc", "--preview-sample")
+
+
+def test_user_hash_mask_is_stable_and_uses_cleaned_ids():
+    s = pd.Series([f"u{i}" for i in range(500)])
+    m1 = _user_hash_mask(s, 0.3)
+    m2 = _user_hash_mask(s, 0.3)
+    assert m1.tolist() == m2.tolist()
+    assert 50 < int(m1.sum()) < 250
+
+    padded = pd.Series([f"  u{i} " for i in range(500)])
+    assert _user_hash_mask(padded, 0.3).tolist() == m1.tolist()
+
+
+def test_sampled_load_keeps_all_rows_of_sampled_users(tmp_path):
+    df = _events_df()
+    in_path = tmp_path / "events.csv"
+    df.to_csv(in_path, index=False)
+
+    out = _load_df_sampled(in_path, "user", 0.5, columns=["user", "event"], chunksize=37)
+    assert list(out.columns) == ["user", "event"]
+    assert out.groupby("user").size().eq(2).all()
+    assert set(out["user"]) == set(df.loc[_user_hash_mask(df["user"], 0.5), "user"])
+
+
+def test_events_preview_sample_runs_pipeline_on_sample(tmp_path, capsys):
+    in_path = tmp_path / "events.csv"
+    _events_df().to_csv(in_path, index=False)
+
+    args = argparse.Namespace(
+        data=str(in_path),
+        user="user",
+        variant="variant",
+        time="ts",
+        event="event",
+        value=None,
+        exposure="exposed",
+        window=None,
+        multiexposure="first",
+        multivariant="error",
+        unassigned="error",
+        metric=["conversion=binary:event_exists(purchase)"],
+        segment=None,
+        out=None,
+        preview=False,
+        preview_sample="10%",
+        save_config=None,
+        config=None,
+    )
+    _run_events(args)
+
+    txt = capsys.readouterr().out
+    assert args.preview is True
+    assert "[sample] 10% of users" in txt
@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+from abx.cli.doctor_cmd import _run_doctor
+
+
+def _write_tables(tmp_path):
+    rng = np.random.default_rng(8)
+    out = tmp_path / "outputs"
+    out.mkdir()
+    for i in range(3):
+        n = 2000
+        df = pd.DataFrame({"user_id": [f"u{j}" for j in range(n)], "variant": rng.choice(["a", "b"], n), "revenue": rng.lognormal(1, 1, n)})
+        if i == 1:
+            df.loc[:4, "user_id"] = "u0"
+        df.to_csv(out / f"t{i}.csv", index=False)
+    (out / "broken.csv").write_text("x,y\n1,2\n", encoding="utf-8")
+    (out / "notes.txt").write_text("not a table\n", encoding="utf-8")
+    return out
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_batch_writes_per_table_reports_and_an_index(tmp_path, workers, doctor_args):
+    out = _write_tables(tmp_path)
+    index = tmp_path / "reports" / "index.json"
+    with pytest.raises(SystemExit) as e:
+        _run_doctor(doctor_args(data=str(out / "*"), report=str(index), workers=workers, check="integrity,variants,missingness,metrics"))
+    assert e.value.code == 2
+
+    payload = json.loads(index.read_text(encoding="utf-8"))
+    assert payload["inputs"] == 4
+    assert payload["readiness"] == {"ready": 2, "warnings": 0, "not ready": 1, "failed": 1}
+    tables = {Path(row["input"]).name: row for row in payload["tables"]}
+    assert tables["t1.csv"]["readiness"] == "not ready" and tables["t1.csv"]["exit_code"] == 2
+    assert "Missing columns" in tables["broken.csv"]["failure"]
+
+    #Each table's report is the one `ab doctor --data TABLE --report ...` writes
+    single = tmp_path / "single.json"
+    _run_doctor(doctor_args(data=str(out / "t1.csv"), report=str(single), no_exit=True, check="integrity,variants,missingness,metrics"))
+    batch = json.loads((tmp_path / "reports" / "t1.csv.json").read_text(encoding="utf-8"))
+    assert batch == json.loads(single.read_text(encoding="utf-8"))
+
+
+def test_batch_without_matches(tmp_path, doctor_args):
+    with pytest.raises(SystemExit, match="No .csv or .parquet files match"):
+        _run_doctor(doctor_args(data=str(tmp_path / "*.parquet")))
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from abx.cli.doctor_cmd import _doctor_checks, _doctor_defaults
+
+
+def _df(n=3000):
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        "user_id": [f"u{i}" for i in rng.integers(0, n - 30, n)],
+        "variant": rng.choice(["control", "treatment", " Treatment"], n, p=[0.5, 0.48, 0.02]),
+    })
+    for i in range(6):
+        x = rng.lognormal(i % 3, 1, n)
+        x[rng.random(n) < 0.1] = np.nan
+        df[f"m{i}"] = x
+    df["m1"] = df["m1"].astype(object)
+    df.loc[7, "m1"] = "oops"
+    df.loc[11, "m2"] = np.inf
+    return df
+
+
+_OPTIONS = {"allocation": "equal", "min_n": 100, "metrics": "m0,m1,m2,m3,m4,m5", "min_n_metric": 50}
+
+
+def _check(df, args):
+    _doctor_defaults(df, args)
+    return _doctor_checks(df, args)
+
+
+def _assert_same(a, b):
+    assert [f["code"] for f in a] == [f["code"] for f in b]
+    for x, y in zip(a, b):
+        assert (x["severity"], x["count"], x["message"], x["meta"]) == (y["severity"], y["count"], y["message"], y["meta"])
+        pd.testing.assert_frame_equal(pd.DataFrame(x["examples"]), pd.DataFrame(y["examples"]), check_dtype=False)
+
+
+def test_cache_reuses_unchanged_columns_with_the_same_report(tmp_path, capsys, doctor_args):
+    df = _df()
+    cache = str(tmp_path / "cache")
+    _assert_same(_check(df, doctor_args(_OPTIONS, cache=cache)), _check(df, doctor_args(_OPTIONS)))
+    assert "reused 0/6 metric columns, 0/4 frame checks" in capsys.readouterr().out
+
+    _assert_same(_check(df, doctor_args(_OPTIONS, cache=cache, workers=3)), _check(df, doctor_args(_OPTIONS)))
+    assert "reused 6/6 metric columns, 4/4 frame checks" in capsys.readouterr().out
+
+    changed = df.copy()
+    changed.loc[changed.index[:50], "m4"] = -1.0
+    _assert_same(_check(changed, doctor_args(_OPTIONS, cache=cache)), _check(changed, doctor_args(_OPTIONS)))
+    assert "reused 5/6 metric columns, 4/4 frame checks" in capsys.readouterr().out
+
+    changed.loc[3, "variant"] = "control"
+    _assert_same(_check(changed, doctor_args(_OPTIONS, cache=cache)), _check(changed, doctor_args(_OPTIONS)))
+    assert "reused 0/6 metric columns, 0/4 frame checks" in capsys.readouterr().out
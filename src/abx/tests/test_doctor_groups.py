@@ -0,0 +1,109 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+import abx
+from abx.cli.doctor_cmd import _doctor_checks, _doctor_defaults, _run_doctor
+
+
+def _df():
+    rng = np.random.default_rng(4)
+    parts = []
+    for e in range(4):
+        n = 3000
+        part = pd.DataFrame({
+            "experiment_id": f"exp{e}",
+            "user_id": [f"u{i}" for i in range(n)],
+            "variant": rng.choice(["control", "treatment"], n),
+            "country": rng.choice(["us", "de"], n),
+            "revenue": rng.lognormal(1, 1, n),
+        })
+        if e == 1:
+            #SRM: 20% of treatment users lost
+            part = part[~((part["variant"] == "treatment") & (rng.random(n) < 0.2))]
+        parts.append(part)
+    #Experiments interleaved, users shared across experiments (fine: duplicates are per experiment)
+    df = pd.concat(parts, ignore_index=True).sample(frac=1, random_state=3).reset_index(drop=True)
+    df.loc[7, "experiment_id"] = None
+    return df
+
+
+_OPTIONS = {"allocation": "equal", "no_exit": True, "by": "experiment_id"}
+
+
+def test_by_matches_doctor_per_experiment(doctor_args):
+    from abx.cli.doctor_groups import _doctor_checks_by
+
+    df = _df()
+    args = doctor_args(_OPTIONS)
+    _doctor_defaults(df, args)
+    assert args.metrics == ["revenue"] and args.segments == ["country"]
+    found = _doctor_checks_by(df, args)
+
+    assert found[0]["code"] == "EXPERIMENTS_SUMMARY"
+    status = {r["experiment"]: r for r in found[0]["meta"]["experiments"]}
+    assert status["exp1"]["readiness"] == "not ready" and status["exp1"]["exit_code"] == 2
+    assert status["exp0"]["exit_code"] == 0 and status["exp0"]["n_rows"] == int((df["experiment_id"] == "exp0").sum())
+    assert found[1]["code"] == "EXPERIMENT_MISSING_ID" and found[1]["count"] == 1
+
+    #Same findings as running doctor on each experiment's rows
+    for e in ("exp0", "exp1"):
+        alone = _doctor_checks(df[df["experiment_id"] == e], args)
+        mine = [{k: v for k, v in f.items() if k != "experiment"} for f in found if f.get("experiment") == e]
+        assert [(f["code"], f["count"], f["message"]) for f in mine] == [(f["code"], f["count"], f["message"]) for f in alone]
+
+
+def test_by_report_and_exit_status(tmp_path, doctor_args):
+    path = tmp_path / "multi.csv"
+    _df().to_csv(path, index=False)
+    report = tmp_path / "doctor.json"
+    with pytest.raises(SystemExit) as e:
+        _run_doctor(doctor_args(_OPTIONS, data=str(path), report=str(report), no_exit=False))
+    assert e.value.code == 2
+
+    findings = json.loads(report.read_text(encoding="utf-8"))["findings"]
+    srm = [f for f in findings if f["code"] == "ALLOCATION_SRM_FAIL"]
+    assert [f["experiment"] for f in srm] == ["exp1"]
+    assert {f.get("experiment") for f in findings if f["code"] == "INTEGRITY_SUMMARY"} == {"exp0", "exp1", "exp2", "exp3"}
+
+    with pytest.raises(SystemExit, match="--by"):
+        _run_doctor(doctor_args(_OPTIONS, data=str(path), chunk_rows=100))
+
+
+def test_api_doctor_by():
+    report = abx.doctor(_df().dropna(subset=["experiment_id"]), checks=["integrity", "allocation"], allocation="equal", by="experiment_id")
+    assert report["errors"] == 1
+    assert [f["experiment"] for f in report["findings"] if f["severity"] == "ERROR"] == ["exp1"]
+
+
+def test_counting_checks_come_from_the_grouped_pass(monkeypatch, doctor_args):
+    from abx.cli.doctor_groups import _doctor_checks_by
+    from abx.cli.doctor_stats import MetricStats
+
+    df = pd.DataFrame({
+        "experiment_id": ["e2", "e1", "e2", "e1", "e1", "e2", "e1", "e2"],
+        "user_id": ["u1", "u1", "u2", "u2", "u3", "u3", "u4", "u4"],
+        "variant": ["B", "a", " b", "A ", None, "A", "b", "A"],
+        "revenue": [1.0, None, None, 2.0, 3.0, 4.0, None, 5.0],
+    })
+    args = doctor_args(_OPTIONS, metrics="revenue", min_n=3, min_n_metric=2, check="variants,missingness,metric_arm_n,allocation")
+    _doctor_defaults(df, args)
+    expected = {e: _doctor_checks(df[df["experiment_id"] == e], args) for e in ("e1", "e2")}
+
+    #No per-experiment statistics pass when only counting checks run
+    def no_stats(*a, **k):
+        raise AssertionError("per-experiment MetricStats")
+    monkeypatch.setattr(MetricStats, "__init__", no_stats)
+    found = _doctor_checks_by(df, args)
+    for e in ("e1", "e2"):
+        mine = [{k: v for k, v in f.items() if k != "experiment"} for f in found if f.get("experiment") == e]
+        assert json.dumps(mine, default=str) == json.dumps(expected[e], default=str)
+
+    e1 = {f["code"]: f for f in found if f.get("experiment") == "e1"}
+    assert e1["VARIANT_COUNTS"]["examples"] == [
+        {"variant": "a", "n_users": 1, "pct": 0.25}, {"variant": "A", "n_users": 1, "pct": 0.25},
+        {"variant": None, "n_users": 1, "pct": 0.25}, {"variant": "b", "n_users": 1, "pct": 0.25},
+    ]
+    assert e1["ALLOCATION_SUMMARY"]["examples"] == [{"variant": "a", "n_users": 2}, {"variant": "b", "n_users": 1}]
+    assert [(r["variant"], r["n_nonmissing"]) for r in e1["METRIC_TINY_ARM"]["examples"]][:3] == [("A ", 1), ("a", 0), ("b", 0)]
@@ -0,0 +1,60 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+from abx.cli.doctor_cmd import _doctor_checks, _doctor_defaults, _run_doctor
+
+pytest.importorskip("pyarrow")
+
+
+def _write(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 1000
+    rev = rng.lognormal(2, 1, n)
+    rev[rng.random(n) < 0.3] = np.nan
+    inf = np.full(n, 1.5)
+    inf[700] = np.inf
+    user = pd.Series([f"u{i}" for i in range(n)], dtype=object)
+    user[3] = None
+    df = pd.DataFrame({
+        "user_id": user,
+        "variant": rng.choice(["a", "b"], n),
+        "country": rng.choice(["us", "de"], n),
+        "rev": rev,
+        "empty": np.nan,
+        "const": 2.0,
+        "inf": inf,
+    })
+    path = tmp_path / "users.parquet"
+    df.to_parquet(path, index=False, row_group_size=300)
+    return path, df
+
+
+def test_metadata_only_answers_from_the_footer(tmp_path, doctor_args):
+    path, _ = _write(tmp_path)
+    report = tmp_path / "doctor.json"
+    _run_doctor(doctor_args(data=str(path), report=str(report), no_exit=True, metadata_only=True))
+
+    found = {f["code"]: f for f in json.loads(report.read_text(encoding="utf-8"))["findings"]}
+    assert found["INTEGRITY_SUMMARY"]["count"] == 1000
+    assert found["INTEGRITY_BAD_USER"]["count"] == 1
+    assert found["METRIC_ALL_MISSING"]["meta"]["metric"] == "empty"
+    assert found["METRIC_CONSTANT"]["meta"]["metric"] == "const"
+    assert "METRIC_NONFINITE" not in found
+    assert found["METRIC_NONFINITE_ROWGROUPS"]["count"] == 1
+    assert found["METRIC_NONFINITE_ROWGROUPS"]["meta"] == {"metric": "inf", "row_groups": 1, "source": "parquet_metadata"}
+    assert "allocation" not in found["METADATA_ONLY"]["meta"]["skipped_checks"]
+    assert "country" not in [r["metric"] for r in found["METRICS_SUMMARY"]["examples"]]
+
+
+def test_parquet_reads_only_checked_columns_with_the_same_report(tmp_path, doctor_args):
+    path, df = _write(tmp_path)
+    report = tmp_path / "doctor.json"
+    _run_doctor(doctor_args(data=str(path), report=str(report), no_exit=True, ignore="const"))
+
+    expected = doctor_args(ignore="const")
+    full = pd.read_parquet(path)
+    _doctor_defaults(full, expected)
+    findings = json.loads(report.read_text(encoding="utf-8"))["findings"]
+    assert [f["code"] for f in findings] == [f["code"] for f in _doctor_checks(full, expected)]
@@ -0,0 +1,103 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+
+from abx.cli.doctor_cmd import _chi2_sf, _doctor_checks, _doctor_defaults, _holm
+from abx.cli.doctor_stream import _doctor_checks_stream, _read_head
+
+
+def _df(n=20000):
+    rng = np.random.default_rng(11)
+    df = pd.DataFrame({
+        "user_id": [f"u{i}" for i in range(n)],
+        "variant": rng.choice(["control", "treatment"], n),
+        "country": rng.choice(["us", "de", "fr", "tiny"], n, p=[0.5, 0.3, 0.1999, 0.0001]),
+        "device": rng.choice(["ios", "android", "web"], n),
+        "revenue": rng.lognormal(1, 1, n),
+    })
+    #Lose 10% of treatment users on ios only
+    lost = (df["device"] == "ios") & (df["variant"] == "treatment") & (rng.random(n) < 0.10)
+    return df[~lost].reset_index(drop=True)
+
+
+_OPTIONS = {"allocation": "equal", "check": "allocation,segment_srm"}
+
+
+def test_segment_srm_flags_only_the_broken_level(doctor_args):
+    df = _df()
+    args = doctor_args(_OPTIONS)
+    _doctor_defaults(df, args)
+    assert args.segments == ["country", "device"]
+    found = {f["code"]: f for f in _doctor_checks(df, args)}
+
+    summary = found["SEGMENT_SRM_SUMMARY"]
+    assert summary["meta"]["levels_tested"] == 6 and summary["meta"]["levels_too_small"] == 1
+    assert [(r["segment"], r["level"]) for r in found["SEGMENT_SRM"]["examples"]] == [("device", "ios")]
+
+    #Same statistics as one chi-square test per level, Holm-adjusted
+    rows = pd.DataFrame(summary["examples"])
+    for r in rows.itertuples():
+        sub = df[df[r.segment] == r.level]["variant"].value_counts().reindex(["control", "treatment"])
+        o = sub.to_numpy()
+        chi = ((o - o.mean()) ** 2 / o.mean()).sum()
+        #Two equal arms: df=1, P(X > x) = erfc(sqrt(x / 2))
+        assert r.p_value == pytest.approx(math.erfc(math.sqrt(chi / 2)), rel=1e-9)
+    assert rows["p_holm"].to_numpy() == pytest.approx(_holm(rows["p_value"].to_numpy()))
+
+
+def test_holm_is_monotone_step_down():
+    p = np.array([0.01, 0.04, 0.03, 0.005])
+    assert _holm(p).tolist() == pytest.approx([0.03, 0.06, 0.06, 0.02])
+
+
+def test_chi2_sf_matches_closed_forms():
+    x = np.array([0.0, 1e-6, 0.5, 3.841458820694124, 10.0, 60.0, 400.0])
+    assert _chi2_sf(x, 1) == pytest.approx([math.erfc(math.sqrt(v / 2)) for v in x], rel=1e-12)
+    assert _chi2_sf(x, 2) == pytest.approx(np.exp(-x / 2), rel=1e-12)
+    assert _chi2_sf(x, 4) == pytest.approx(np.exp(-x / 2) * (1 + x / 2), rel=1e-12)
+    assert float(_chi2_sf(3.841458820694124, 1)) == pytest.approx(0.05, rel=1e-12)
+    #Broadcasts over df; NaN in, NaN out
+    assert _chi2_sf(2.0, np.array([1, 2, 4])) == pytest.approx([math.erfc(1.0), math.exp(-1.0), 2 * math.exp(-1.0)], rel=1e-12)
+    assert np.isnan(_chi2_sf(np.nan, 3)) and _chi2_sf(np.inf, 3) == 0.0
+
+
+def test_chi2_sf_matches_scipy():
+    stats = pytest.importorskip("scipy.stats")
+    rng = np.random.default_rng(5)
+    for df in (1, 3, 9, 40, 250):
+        x = rng.uniform(0, 4 * df + 30, 5000)
+        assert _chi2_sf(x, df) == pytest.approx(stats.chi2.sf(x, df), rel=1e-11, abs=1e-300)
+
+
+def test_segment_srm_is_opt_in(doctor_args):
+    df = _df()
+    #Default suite: text columns are not tested as segments
+    args = doctor_args(_OPTIONS, check=None)
+    _doctor_defaults(df, args)
+    assert "segment_srm" not in args.check
+    assert not [f for f in _doctor_checks(df, args) if f["code"].startswith("SEGMENT_SRM")]
+
+    #Naming the segment columns turns it on
+    args = doctor_args(_OPTIONS, check=None, segments="device")
+    _doctor_defaults(df, args)
+    found = {f["code"]: f for f in _doctor_checks(df, args)}
+    assert found["SEGMENT_SRM"]["examples"][0]["segment"] == "device"
+    assert {r["segment"] for r in found["SEGMENT_SRM_SUMMARY"]["examples"]} == {"device"}
+
+
+def test_chunked_segment_srm_matches_in_memory(tmp_path, doctor_args):
+    path = tmp_path / "users.csv"
+    _df().to_csv(path, index=False)
+    a = doctor_args(_OPTIONS)
+    df = pd.read_csv(path)
+    _doctor_defaults(df, a)
+    exact = [f for f in _doctor_checks(df, a) if f["code"].startswith("SEGMENT_SRM")]
+    b = doctor_args(_OPTIONS, chunk_rows=3001)
+    _doctor_defaults(_read_head(path, b.chunk_rows), b)
+    chunked = [f for f in _doctor_checks_stream(path, b) if f["code"].startswith("SEGMENT_SRM")]
+
+    assert len(exact) == 2
+    for x, y in zip(exact, chunked):
+        assert (x["code"], x["count"], x["message"], x["meta"]) == (y["code"], y["count"], y["message"], y["meta"])
+        pd.testing.assert_frame_equal(pd.DataFrame(x["examples"]), pd.DataFrame(y["examples"]))
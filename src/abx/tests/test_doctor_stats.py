@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+import abx.cli.doctor_stats as doctor_stats
+from abx.cli.doctor_cmd import _doctor_checks, _doctor_defaults
+from abx.cli.doctor_stats import MetricStats
+
+_OPTIONS = {"metrics": "rev,cnt,txt,flag", "min_n_metric": 300}
+
+
+def _df():
+    rng = np.random.default_rng(0)
+    n = 400
+    rev = rng.lognormal(2, 1, n)
+    rev[rng.random(n) < 0.2] = np.nan
+    rev[3] = np.inf
+    cnt = pd.Series(rng.poisson(2, n), dtype="Int64")
+    cnt[rng.random(n) < 0.05] = pd.NA
+    return pd.DataFrame(
+        {
+            "user_id": [f"u{i}" for i in range(n)],
+            "variant": rng.choice(["b", "a", None], n, p=[0.45, 0.45, 0.1]),
+            "rev": rev,
+            "cnt": cnt,
+            "txt": np.where(rng.random(n) < 0.3, "n/a", rng.integers(0, 9, n).astype(str)).astype(object),
+            "flag": rng.random(n) < 0.3,
+        }
+    )
+
+
+def test_by_variant_matches_pandas_groupby():
+    df = _df()
+    stats = MetricStats(df, "user_id", "variant", ["rev", "cnt", "txt", "flag"])
+
+    for m in stats.metrics:
+        x = pd.to_numeric(df[m], errors="coerce").astype("float64")
+        g = x.groupby(df["variant"], dropna=False)
+        exp = pd.DataFrame({
+            "users": g.size(),
+            "missing": df[m].isna().groupby(df["variant"], dropna=False).sum(),
+            "count": g.count(),
+            "sum": g.sum(),
+            "mean": g.mean(),
+            "std": g.std(),
+            "min": g.min(),
+            "p50": g.quantile(0.5),
+            "p90": g.quantile(0.9),
+            "max": g.max(),
+        }).reset_index(drop=True)
+        got = stats.metric(m)
+        assert got["variant"].iloc[:2].tolist() == ["a", "b"] and pd.isna(got["variant"].iloc[2])
+        pd.testing.assert_frame_equal(got[exp.columns], exp, check_dtype=False, check_exact=False, rtol=1e-9)
+
+        o = stats.overall.loc[m]
+        assert o["missing"] == df[m].isna().sum()
+        assert o["bad_cast"] == int((df[m].notna() & x.isna()).sum())
+        assert o["nonfinite"] == int(np.isinf(x).sum())
+        assert np.isclose(o["q1"], x.quantile(0.25)) and np.isclose(o["q3"], x.quantile(0.75))
+
+
+def test_small_batches_give_the_same_stats(monkeypatch):
+    #Quantiles from row batches of a few values each match the one-batch result
+    df = _df()
+    exact = MetricStats(df, "user_id", "variant", ["rev", "cnt", "txt", "flag"])
+    monkeypatch.setattr(doctor_stats, "_BATCH_VALUES", 50)
+    batched = MetricStats(df, "user_id", "variant", ["rev", "cnt", "txt", "flag"])
+
+    pd.testing.assert_frame_equal(batched.by_variant, exact.by_variant)
+    pd.testing.assert_frame_equal(batched.overall, exact.overall)
+    rev = pd.to_numeric(df["rev"]).to_numpy()
+    np.testing.assert_array_equal(batched._numeric("rev"), rev)
+
+
+def test_doctor_checks_accept_bool_and_string_metrics(doctor_args):
+    df = _df()
+    args = doctor_args(_OPTIONS, check="missingness,metrics,distribution,metric_arm_n")
+    _doctor_defaults(df, args)
+    codes = [f["code"] for f in _doctor_checks(df, args)]
+
+    assert "METRIC_NONFINITE" in codes
+    assert "METRIC_BAD_NUMERIC_CAST" in codes
+    assert "DISTRIBUTION_SUMMARY" in codes
+    assert codes.count("METRIC_TINY_ARM") == 4
+
+
+def test_examples_are_bounded_and_skipped_without_output(doctor_args):
+    df = _df()
+    args = doctor_args(metrics="rev,cnt,txt", allocation="equal")
+    _doctor_defaults(df, args)
+    findings = _doctor_checks(df, args, max_rows=5)
+    bad_cast = next(f for f in findings if f["code"] == "METRIC_BAD_NUMERIC_CAST")
+    assert [r["txt"] for r in bad_cast["examples"]] == ["n/a"] * 5
+    assert all(len(f["examples"]) <= 5 for f in findings if f["examples"] is not None)
+
+    assert all(f["examples"] is None for f in _doctor_checks(df, args, max_rows=0))
+
+
+def test_workers_give_the_same_report(doctor_args):
+    df = _df()
+    reports = []
+    for workers in (None, 3):
+        args = doctor_args(_OPTIONS, allocation="equal", workers=workers)
+        _doctor_defaults(df, args)
+        reports.append(_doctor_checks(df, args))
+
+    assert [f["code"] for f in reports[1]] == [f["code"] for f in reports[0]]
+    pd.testing.assert_frame_equal(pd.DataFrame(reports[1]).drop(columns="examples"), pd.DataFrame(reports[0]).drop(columns="examples"))
+
+
+def test_wide_table_findings_are_compact(doctor_args):
+    rng = np.random.default_rng(2)
+    n = 300
+    df = pd.DataFrame({"user_id": [f"u{i}" for i in range(n)], "variant": rng.choice(["a", "b"], n)})
+    wide = {f"c{i}": np.full(n, float(i)) for i in range(25)}
+    wide.update({f"x{i}": rng.normal(size=n) for i in range(5)})
+    df = pd.concat([df, pd.DataFrame(wide)], axis=1)
+    args = doctor_args(check="metrics")
+    _doctor_defaults(df, args)
+    findings = _doctor_checks(df, args)
+
+    #25 constant columns (over the compact threshold): one finding listing them all
+    constant = [f for f in findings if f["code"] == "METRIC_CONSTANT"]
+    assert len(constant) == 1 and constant[0]["count"] == 25
+    assert constant[0]["meta"]["metrics"] == [f"c{i}" for i in range(25)]
+    assert [r["value"] for r in constant[0]["examples"]][:3] == [0.0, 1.0, 2.0]
+
+    #At or below the threshold every metric keeps its own finding
+    args.metrics = [f"c{i}" for i in range(20)]
+    assert [f["meta"] for f in _doctor_checks(df, args) if f["code"] == "METRIC_CONSTANT"] == [None] * 20
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import abx.cli.doctor_stream as doctor_stream
+from abx.cli.doctor_cmd import _doctor_checks, _doctor_defaults
+from abx.cli.doctor_stream import KLLSketch, _doctor_checks_stream, _read_head
+
+
+def _df(n=600):
+    rng = np.random.default_rng(3)
+    users = [f"u{i}" for i in rng.integers(0, n - 20, n)]
+    users[4] = None
+    users[8] = None
+    users[12] = " "
+    rev = rng.lognormal(2, 1, n)
+    rev[rng.random(n) < 0.2] = np.nan
+    rev[7] = np.inf
+    conv = (rng.random(n) < 0.1).astype(float)
+    conv[3] = 2
+    return pd.DataFrame({
+        "user_id": users,
+        "variant": rng.choice(["control", "treatment", " Treatment", "null", None], n, p=[0.5, 0.44, 0.02, 0.02, 0.02]),
+        "revenue": rev,
+        "conv": conv,
+        "txt": np.where(rng.random(n) < 0.05, "bad", rng.integers(0, 5, n).astype(str)),
+    })
+
+
+_OPTIONS = {"metrics": "revenue,conv,txt", "allocation": "equal", "min_n": 100, "min_n_metric": 50, "chunk_rows": 97}
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_chunked_doctor_matches_in_memory(tmp_path, monkeypatch, suffix, doctor_args):
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    #Force the user-hash set to spill to disk partitions
+    monkeypatch.setattr(doctor_stream, "_SPILL_HASHES", 100)
+    df = _df()
+    path = tmp_path / f"data{suffix}"
+    df.to_csv(path, index=False) if suffix == ".csv" else df.to_parquet(path, index=False)
+    df = pd.read_csv(path) if suffix == ".csv" else pd.read_parquet(path)
+
+    a = doctor_args(_OPTIONS)
+    _doctor_defaults(df, a)
+    exact = _doctor_checks(df, a)
+    b = doctor_args(_OPTIONS)
+    _doctor_defaults(_read_head(path, b.chunk_rows), b)
+    chunked = _doctor_checks_stream(path, b)
+
+    assert [f["code"] for f in chunked] == [f["code"] for f in exact]
+    for x, y in zip(exact, chunked):
+        #Small inputs fit in the sketches, so even quantiles and outlier counts are exact here
+        assert (y["severity"], y["count"], y["message"]) == (x["severity"], x["count"], x["message"])
+        if x["code"] != "DISTRIBUTION_SUMMARY":
+            pd.testing.assert_frame_equal(pd.DataFrame(y["examples"]), pd.DataFrame(x["examples"]), check_dtype=False)
+
+
+def test_kll_sketch_merge_is_close_to_exact_quantiles():
+    x = np.random.default_rng(0).lognormal(2, 1, 200_000)
+    parts = [KLLSketch(rng=np.random.default_rng(i)) for i in range(4)]
+    for i, chunk in enumerate(np.array_split(x, 400)):
+        parts[i % 4].update(chunk)
+    sk = parts[0]
+    for other in parts[1:]:
+        sk.merge(other)
+
+    assert sk.n == len(x) and not sk.exact
+    for q in (0.25, 0.5, 0.75, 0.9):
+        assert abs((x < sk.quantile(q)).mean() - q) < 0.01
+
+
+def test_user_hash_collisions_are_verified(tmp_path, monkeypatch, doctor_args):
+    df = _df()
+    #Give distinct ids the same 64-bit hash: counts and examples must stay exact
+    seen = df["user_id"].value_counts()
+    single = [u for u in seen.index if seen[u] == 1][:20]
+    collide = dict(zip(single[1::2], single[::2]))
+    hash_object = pd.util.hash_pandas_object
+    monkeypatch.setattr(pd.util, "hash_pandas_object", lambda s, index=False: hash_object(s.replace(collide), index=index))
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    df = pd.read_csv(path)
+
+    a = doctor_args(_OPTIONS, check="integrity")
+    _doctor_defaults(df, a)
+    exact = {f["code"]: f for f in _doctor_checks(df, a)}
+    b = doctor_args(_OPTIONS, check="integrity")
+    _doctor_defaults(_read_head(path, b.chunk_rows), b)
+    chunked = {f["code"]: f for f in _doctor_checks_stream(path, b)}
+
+    assert chunked["INTEGRITY_DUP_USER"]["meta"] == exact["INTEGRITY_DUP_USER"]["meta"]
+    assert chunked["INTEGRITY_DUP_USER"]["examples"] == exact["INTEGRITY_DUP_USER"]["examples"]
+    assert chunked["INTEGRITY_SUMMARY"]["meta"]["n_users"] == df["user_id"].nunique()
+
+
+def test_chunked_outlier_examples_keep_low_side_outliers(tmp_path, doctor_args):
+    #Values around 100 with zeros every 33rd row: the zeros are the farthest outliers even though |x| is smallest
+    value = 100 + np.tile([-1.0, -0.5, 0.0, 0.5, 1.0], 60)
+    value[::33] = 0.0
+    value[[50, 140]] = [104.0, 130.0]
+    df = pd.DataFrame({"user_id": [f"u{i}" for i in range(300)], "variant": ["control", "treatment"] * 150, "value": value})
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+
+    a = doctor_args(metrics="value", check="distribution")
+    _doctor_defaults(df, a)
+    exact = next(f for f in _doctor_checks(pd.read_csv(path), a) if f["code"] == "METRIC_OUTLIERS")
+    b = doctor_args(metrics="value", check="distribution", chunk_rows=40)
+    _doctor_defaults(_read_head(path, b.chunk_rows), b)
+    chunked = next(f for f in _doctor_checks_stream(path, b) if f["code"] == "METRIC_OUTLIERS")
+
+    assert exact["count"] == chunked["count"] == 12
+    assert chunked["examples"] == exact["examples"]
+    assert [r["value"] for r in chunked["examples"]][:4] == [0.0, 0.0, 0.0, 0.0]
+    assert chunked["examples"][-1]["value"] == 104.0
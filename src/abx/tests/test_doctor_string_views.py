@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from abx.cli.doctor_cmd import _StringViews, _allocation_counts, _consistency_summary, _integrity_summary, _variant_summary
+
+
+def test_distinct_value_checks_match_rowwise_strings():
+    #Every user id repeats (2000 rows over 904 values); variants cycle through clean, dirty, blank and missing values
+    df = pd.DataFrame({
+        "user_id": np.resize(np.array([f"u{i}" for i in range(900)] + [" u1", "u2 ", "", None], dtype=object), 2000),
+        "variant": np.resize(np.array(["control", "treatment", " Control", "TREATMENT ", "null", "", None], dtype=object), 2000),
+    })
+    views = _StringViews(df)
+    u = df["user_id"].astype("string")
+    v = df["variant"].astype("string")
+    v_clean = v.str.strip().str.lower()
+
+    s = _integrity_summary(df, "user_id", "variant", views)
+    assert s["n_users"] == df["user_id"].nunique()
+    assert s["bad_user"] == int((u.isna() | (u.str.strip() == "")).sum())
+    assert s["bad_variant"] == int((v.isna() | (v.str.strip() == "")).sum())
+
+    c = _consistency_summary(df, "user_id", "variant", views)
+    assert c["variant_needs_cleaning"] == int((v.notna() & (v != v_clean)).fillna(False).sum())
+    assert c["variant_suspicious"] == int(v_clean.isin(["null"]).fillna(False).sum())
+    assert c["user_needs_cleaning"] == int((u.notna() & (u != u.str.strip())).fillna(False).sum())
+    assert (c["variant_needs_cleaning_examples"](5)["variant"].str.strip().str.lower() != c["variant_needs_cleaning_examples"](5)["variant"]).all()
+
+    pd.testing.assert_series_equal(_variant_summary(df, "user_id", "variant", views)["counts"], v.str.strip().value_counts(dropna=False))
+    clean = v_clean.mask(v_clean == "").dropna()
+    pd.testing.assert_series_equal(_allocation_counts(df, "variant", views), clean.value_counts())
+
+    #One view per column, shared by every check
+    assert views["variant"] is views["variant"] and len(views["variant"]) == 6
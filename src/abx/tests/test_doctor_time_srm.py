@@ -0,0 +1,81 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+
+from abx.cli.doctor_cmd import _doctor_checks, _doctor_defaults
+from abx.cli.doctor_stream import _doctor_checks_stream, _read_head
+
+
+def _df(days=14, per_day=3000):
+    rng = np.random.default_rng(2)
+    n = days * per_day
+    t = pd.Timestamp("2024-03-01", tz="UTC") + pd.to_timedelta(rng.integers(0, days * 86400, n), unit="s")
+    df = pd.DataFrame({
+        "user_id": [f"u{i}" for i in range(n)],
+        "variant": rng.choice(["control", "treatment"], n),
+        "exposure_time": t,
+        "revenue": rng.lognormal(1, 1, n),
+    })
+    #A deployment on 2024-03-10 loses 30% of treatment exposures for the rest of the test
+    lost = (df["exposure_time"] >= pd.Timestamp("2024-03-10", tz="UTC")) & (df["variant"] == "treatment") & (rng.random(n) < 0.3)
+    df = df[~lost].reset_index(drop=True)
+    df.loc[5, "exposure_time"] = pd.NaT
+    return df
+
+
+_OPTIONS = {"allocation": "equal"}
+
+
+def test_time_srm_finds_the_first_broken_day(doctor_args):
+    df = _df()
+    args = doctor_args(_OPTIONS, check="allocation,time_srm")
+    _doctor_defaults(df, args)
+    assert args.time_col == "exposure_time" and args.segments == []
+    found = {f["code"]: f for f in _doctor_checks(df, args)}
+
+    summary = found["TIME_SRM_SUMMARY"]
+    assert summary["meta"]["buckets"] == 14 and summary["meta"]["missing_time"] == 1
+    assert summary["meta"]["first_flagged"] == "2024-03-10"
+    assert [r["bucket"] for r in found["TIME_SRM"]["examples"]] == [f"2024-03-{d}" for d in range(10, 15)]
+    assert summary["meta"]["cumulative_since"] >= "2024-03-10"
+
+    day = df["exposure_time"].dt.strftime("%Y-%m-%d")
+    for r in summary["examples"]:
+        sub = df.loc[day == r["bucket"], "variant"].value_counts().reindex(["control", "treatment"])
+        o = sub.to_numpy()
+        chi = ((o - o.mean()) ** 2 / o.mean()).sum()
+        #Two equal arms: df=1, P(X > x) = erfc(sqrt(x / 2))
+        assert r["p_value"] == pytest.approx(math.erfc(math.sqrt(chi / 2)), rel=1e-9)
+
+
+def test_time_srm_is_opt_in(doctor_args):
+    df = _df()
+    #Default suite: exposure_time alone does not turn it on
+    args = doctor_args(_OPTIONS)
+    _doctor_defaults(df, args)
+    assert "time_srm" not in args.check
+    assert not [f for f in _doctor_checks(df, args) if f["code"].startswith("TIME_SRM")]
+
+    #Naming the time column does
+    args = doctor_args(_OPTIONS, time_col="exposure_time")
+    _doctor_defaults(df, args)
+    assert [f["code"] for f in _doctor_checks(df, args) if f["code"].startswith("TIME_SRM")] == ["TIME_SRM_SUMMARY", "TIME_SRM"]
+
+
+def test_chunked_time_srm_matches_in_memory(tmp_path, doctor_args):
+    path = tmp_path / "users.csv"
+    _df().to_csv(path, index=False)
+    a = doctor_args(_OPTIONS, check="time_srm", time_bucket="hour")
+    df = pd.read_csv(path)
+    _doctor_defaults(df, a)
+    exact = _doctor_checks(df, a)
+    b = doctor_args(_OPTIONS, check="time_srm", time_bucket="hour", chunk_rows=4999)
+    _doctor_defaults(_read_head(path, b.chunk_rows), b)
+    chunked = _doctor_checks_stream(path, b)
+
+    assert [f["code"] for f in exact] == ["TIME_SRM_SUMMARY", "TIME_SRM"]
+    assert exact[0]["meta"]["buckets"] == 14 * 24
+    for x, y in zip(exact, chunked):
+        assert (x["code"], x["count"], x["message"], x["meta"]) == (y["code"], y["count"], y["message"], y["meta"])
+        pd.testing.assert_frame_equal(pd.DataFrame(x["examples"]), pd.DataFrame(y["examples"]))
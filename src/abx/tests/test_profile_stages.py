@@ -0,0 +1,114 @@
+import argparse
+import json
+import pandas as pd
+
+from abx.cli.convert_cmd import _run_events
+from abx.cli.doctor_cmd import _run_doctor
+from abx.cli.profiling import Profiler
+
+
+def test_profiler_nests_stages_and_counts_rows():
+    prof = Profiler("test", trace_memory=True)
+    prof.start("outer", rows_in=10)
+    with prof.stage("inner", rows_in=10) as st:
+        st.rows_out = 4
+    prof.stop(rows_out=4)
+    prof.close()
+
+    d = prof.to_dict()
+    assert [(s["stage"], s["depth"]) for s in d["stages"]] == [("outer", 0), ("inner", 1)]
+    assert d["stages"][1]["rows_out"] == 4
+    assert d["stages"][0]["mem_delta_mb"] is not None
+    assert "inner" in prof.format_table()
+
+
+def test_events_profile_writes_stage_json(tmp_path):
+    df = pd.DataFrame(
+        {
+            "user": ["u1", "u1", "u2", "u2"],
+            "variant": ["a", "a", "b", "b"],
+            "ts": ["2025-01-01 00:00:00Z", "2025-01-01 01:00:00Z", "2025-01-01 00:00:00Z", "2025-01-01 02:00:00Z"],
+            "event": ["exposed", "purchase", "exposed", "view"],
+        }
+    )
+    in_path = tmp_path / "events.csv"
+    df.to_csv(in_path, index=False)
+    prof_path = tmp_path / "profile.json"
+
+    args = argparse.Namespace(
+        data=str(in_path),
+        user="user",
+        variant="variant",
+        time="ts",
+        event="event",
+        value=None,
+        exposure="exposed",
+        window=None,
+        multiexposure="first",
+        multivariant="error",
+        unassigned="error",
+        metric=["conversion=binary:event_exists(purchase)", "views=count:count_event(view)"],
+        segment=None,
+        out=str(tmp_path / "out.csv"),
+        preview=False,
+        save_config=None,
+        config=None,
+        profile=str(prof_path),
+    )
+    _run_events(args)
+
+    payload = json.loads(prof_path.read_text(encoding="utf-8"))
+    names = [s["stage"] for s in payload["stages"]]
+    for expected in ["load", "clean", "timestamp_parse", "sort", "variant_resolution", "exposure", "scoping", "metrics", "metric:conversion", "metric:views", "write"]:
+        assert expected in names
+    load = payload["stages"][names.index("load")]
+    assert load["rows_out"] == 4
+    assert payload["command"] == "convert events"
+
+
+def test_doctor_profile_prints_table(tmp_path, capsys):
+    df = pd.DataFrame({"user_id": ["u1", "u2", "u3"], "variant": ["a", "a", "b"], "conversion": [1, 0, 1]})
+    in_path = tmp_path / "converted.csv"
+    df.to_csv(in_path, index=False)
+
+    args = argparse.Namespace(
+        data=str(in_path), user=None, variant=None, check="integrity,metrics", metrics=None, ignore=None,
+        report=None, only=None, min_n=None, min_n_metric=None, allocation=None, alpha=None, fail_on=None,
+        skip=None, config=None, save_config=None, preview=False, profile="-",
+    )
+    _run_doctor(args)
+
+    out = capsys.readouterr().out
+    assert "=== profile: doctor ===" in out
+    assert "check:integrity" in out
+    assert "check:metrics" in out
+
+
+def test_trace_export_is_chrome_trace_event_json(tmp_path):
+    import threading
+
+    prof = Profiler("test")
+    with prof.stage("outer", rows_in=3):
+        with prof.stage("metric:m1", rows_in=3) as st:
+            st.rows_out = 2
+
+        def worker():
+            with prof.stage("check:w", rows_in=1):
+                pass
+
+        th = threading.Thread(target=worker, name="worker-1")
+        th.start()
+        th.join()
+
+    trace = prof.to_trace()
+    spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    by_name = {e["name"]: e for e in spans}
+    assert {"test", "outer", "metric:m1", "check:w"} <= set(by_name)
+    outer, inner = by_name["outer"], by_name["metric:m1"]
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert inner["args"]["rows_out"] == 2
+    assert inner["cat"] == "metric"
+    assert by_name["check:w"]["tid"] != outer["tid"]
+    thread_names = {e["args"]["name"] for e in trace["traceEvents"] if e["name"] == "thread_name"}
+    assert "worker-1" in thread_names
+    json.dumps(trace)
@@ -0,0 +1,85 @@
+import argparse
+import json
+import pandas as pd
+import pytest
+
+from abx.cli.convert_cmd import _run_events
+from abx.cli.doctor_cmd import _run_doctor
+from abx.cli.run_cmd import _run_pipeline
+
+
+def _write_events(tmp_path):
+    df = pd.DataFrame(
+        {
+            "user": ["u1", "u1", "u2", "u2", "u3", "u4"],
+            "variant": ["A", "A", "B", "B", "A", "B"],
+            "ts": ["2025-01-01 00:00:00Z", "2025-01-01 01:00:00Z", "2025-01-01 00:00:00Z", "2025-01-02 00:00:00Z", "2025-01-01 00:00:00Z", "2025-01-01 00:00:00Z"],
+            "event": ["exposed", "purchase", "exposed", "view", "exposed", "exposed"],
+        }
+    )
+    path = tmp_path / "events.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def _events_args(**kwargs):
+    args = argparse.Namespace(
+        data=None, user=None, variant=None, time=None, event=None, value=None, exposure=None, window=None,
+        multiexposure=None, multivariant=None, unassigned=None, metric=None, segment=None, segment_rule="error",
+        segment_fix=False, segment_fix_opt=None, sample_users=None, save_config=None, config=None,
+    )
+    for k, v in kwargs.items():
+        setattr(args, k, v)
+    return args
+
+
+def _run_args(**kwargs):
+    args = _events_args(
+        run_cmd="events", out=None, doctor_config=None, metrics=None, ignore=None, allocation=None, alpha=None, min_n=None,
+        min_n_metric=None, only=None, fail_on=None, no_exit=False, report=None, check=None, skip=None, workers=None, cache=None, segments=None,
+        time_col=None, time_bucket=None,
+    )
+    for k, v in kwargs.items():
+        setattr(args, k, v)
+    return args
+
+
+def test_run_matches_convert_then_doctor(tmp_path):
+    data = _write_events(tmp_path)
+    cfg = tmp_path / "events.json"
+    _run_events(_events_args(
+        data=str(data), user="user", variant="variant", time="ts", event="event", exposure="exposed",
+        metric=["conversion=binary:event_exists(purchase)"], out=str(tmp_path / "two_step.csv"), preview=False, save_config=str(cfg),
+    ))
+    _run_doctor(argparse.Namespace(
+        data=str(tmp_path / "two_step.csv"), user=None, variant=None, metrics=None, ignore=None, allocation=None, alpha=None,
+        min_n=None, min_n_metric=None, only=None, fail_on=None, no_exit=True, preview=False, report=str(tmp_path / "two_step.json"),
+        check="integrity,variants,missingness,metrics", skip=None, save_config=None, config=None,
+    ))
+
+    #Same conversion from the saved config, doctor on the in-memory table
+    _run_pipeline(_run_args(config=str(cfg), out=str(tmp_path / "run.csv"), report=str(tmp_path / "run.json"), check="integrity,variants,missingness,metrics"))
+
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "run.csv"), pd.read_csv(tmp_path / "two_step.csv"))
+    run_codes = [f["code"] for f in json.loads((tmp_path / "run.json").read_text(encoding="utf-8"))["findings"]]
+    two_step_codes = [f["code"] for f in json.loads((tmp_path / "two_step.json").read_text(encoding="utf-8"))["findings"]]
+    assert run_codes == two_step_codes
+
+
+def test_run_without_out_writes_nothing_and_exits_on_errors(tmp_path, capsys):
+    data = _write_events(tmp_path)
+    doctor_cfg = tmp_path / "doctor.json"
+    doctor_cfg.write_text(json.dumps({"user": "user_id", "check": "variants", "min_n": 5, "fail_on": "warn"}), encoding="utf-8")
+
+    args = _run_args(
+        data=str(data), user="user", variant="variant", time="ts", event="event", exposure="exposed",
+        metric=["conversion=binary:event_exists(purchase)"], doctor_config=str(doctor_cfg),
+    )
+    with pytest.raises(SystemExit) as e:
+        _run_pipeline(args)
+    assert e.value.code == 2
+
+    out = capsys.readouterr().out
+    assert "(preview only)" in out
+    assert "=== ab doctor ===" in out
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["doctor.json", "events.csv"]
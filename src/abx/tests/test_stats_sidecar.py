@@ -0,0 +1,81 @@
+import argparse
+import json
+import numpy as np
+import pandas as pd
+
+from abx.cli.doctor_cmd import _run_doctor
+from abx.cli.stats_sidecar import _sidecar_path, _write_stats_sidecar
+
+
+def _write(tmp_path):
+    rng = np.random.default_rng(1)
+    n = 2000
+    rev = rng.lognormal(2, 1, n)
+    rev[rng.random(n) < 0.2] = np.nan
+    rev[5] = np.inf
+    conv = (rng.random(n) < 0.1).astype(float)
+    conv[9] = 3
+    df = pd.DataFrame({
+        "user_id": [f"u{i}" for i in rng.integers(0, n - 50, n)],
+        "variant": rng.choice(["control", "treatment"], n, p=[0.53, 0.47]),
+        "country": rng.choice(["us", "de"], n),
+        "revenue": rev,
+        "conv": conv,
+    })
+    path = tmp_path / "users.csv"
+    df.to_csv(path, index=False)
+    _write_stats_sidecar(pd.read_csv(path), path, argparse.Namespace(func=print, out=str(path), input="events.csv"))
+    return path
+
+
+_OPTIONS = {"allocation": "equal", "no_exit": True}
+
+
+def _findings(report):
+    return json.loads(report.read_text(encoding="utf-8"))["findings"]
+
+
+def test_use_stats_gives_the_scan_report_without_metric_columns(tmp_path, doctor_args):
+    path = _write(tmp_path)
+    sidecar = json.loads(_sidecar_path(path).read_text(encoding="utf-8"))
+    assert sidecar["config"] == {"out": str(path), "input": "events.csv"}
+    assert [o["metric"] for o in sidecar["overall"]] == ["revenue", "conv"]
+
+    _run_doctor(doctor_args(_OPTIONS, data=str(path), report=str(tmp_path / "scan.json")))
+    _run_doctor(doctor_args(_OPTIONS, data=str(path), report=str(tmp_path / "stats.json"), use_stats=True))
+    scan, stats = _findings(tmp_path / "scan.json"), _findings(tmp_path / "stats.json")
+
+    assert stats[-1]["code"] == "STATS_SIDECAR"
+    assert [(f["code"], f["severity"], f["count"], f["message"]) for f in stats[:-1]] == [
+        (f["code"], f["severity"], f["count"], f["message"]) for f in scan
+    ]
+    assert {f["code"] for f in scan} >= {"METRIC_NONFINITE", "METRIC_OUTLIERS", "INTEGRITY_DUP_USER"}
+
+
+def test_stale_sidecar_falls_back_to_a_scan(tmp_path, capsys, doctor_args):
+    path = _write(tmp_path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("u_new,control,us,1.0,0.0\n")
+
+    _run_doctor(doctor_args(_OPTIONS, data=str(path), report=str(tmp_path / "stats.json"), use_stats=True))
+    assert "stale statistics sidecar" in capsys.readouterr().out
+    assert "STATS_SIDECAR" not in [f["code"] for f in _findings(tmp_path / "stats.json")]
+
+
+def test_sidecar_hash_only_when_size_matches_but_mtime_differs(tmp_path, monkeypatch):
+    import os
+    import abx.cli.stats_sidecar as stats_sidecar
+
+    path = _write(tmp_path)
+    calls = []
+    file_sha256 = stats_sidecar._file_sha256
+    monkeypatch.setattr(stats_sidecar, "_file_sha256", lambda p: calls.append(p) or file_sha256(p))
+
+    assert stats_sidecar._load_stats_sidecar(path, "user_id", "variant")[0] is not None
+    assert calls == []
+
+    #Same bytes, new mtime: hashed once, still valid
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert stats_sidecar._load_stats_sidecar(path, "user_id", "variant")[0] is not None
+    assert calls == [path]
@@ -0,0 +1,72 @@
+import argparse
+import pandas as pd
+
+from abx.cli.synth_cmd import _run_synth_events, _run_synth_unit
+
+
+def _synth_args(out_path, **kwargs):
+    args = argparse.Namespace(
+        out=str(out_path),
+        users=None,
+        variants="control,treatment",
+        allocation="equal",
+        srm=None,
+        value_dist="lognormal",
+        value_mean=40.0,
+        value_format="currency",
+        segment_cardinality=10,
+        dirty_segments=0.0,
+        seed=1,
+        chunk_users=300,
+        rows=None,
+        events_per_user=8.0,
+        events_sigma=1.0,
+        event_skew=1.2,
+        exposure_event="exposed",
+        multi_exposure_rate=0.05,
+        days=14,
+        time_format="iso_z",
+        conversion_rate=0.1,
+        duplicate_rate=0.0,
+    )
+    for k, v in kwargs.items():
+        setattr(args, k, v)
+    return args
+
+
+def test_synth_events_streams_chunks_and_is_reproducible(tmp_path):
+    p1, p2 = tmp_path / "a.csv", tmp_path / "b.csv"
+    _run_synth_events(_synth_args(p1, users=1000))
+    _run_synth_events(_synth_args(p2, users=1000))
+
+    df = pd.read_csv(p1)
+    assert list(df.columns) == ["user", "variant", "ts", "event", "amount", "country", "device"]
+    assert df["user"].nunique() == 1000
+    assert p1.read_bytes() == p2.read_bytes()
+
+    #Every user starts with the exposure event
+    first = df.groupby("user", sort=False)["event"].first()
+    assert (first == "exposed").all()
+    assert df["ts"].str.endswith("Z").all()
+    assert df.loc[df["event"] == "purchase", "amount"].str.startswith("$").all()
+
+
+def test_synth_events_srm_and_dirty_segments(tmp_path):
+    out = tmp_path / "events.parquet"
+    _run_synth_events(_synth_args(out, users=4000, srm=["treatment=0.3"], dirty_segments=0.3, time_format="mixed"))
+
+    df = pd.read_parquet(out)
+    users = df.drop_duplicates("user")["variant"].value_counts()
+    assert users["treatment"] < 0.85 * users["control"]
+    assert (df["country"] != df["country"].str.strip().str.lower().str.replace(" ", "_")).any()
+    assert df["ts"].str.endswith("Z").any() and df["ts"].str.endswith("+00:00").any()
+
+
+def test_synth_unit_duplicates(tmp_path):
+    out = tmp_path / "unit.csv"
+    _run_synth_unit(_synth_args(out, users=2000, duplicate_rate=0.05, value_format="plain"))
+
+    df = pd.read_csv(out)
+    assert df["user"].duplicated().sum() > 0
+    assert set(df["converted"]) <= {"yes", "no"}
+    assert pd.to_numeric(df["revenue"]).ge(0).all()